@@ -0,0 +1,324 @@
+"""
+Columnar Data Store for Business Dashboard
+Stores each dataset as a directory of typed NPY column files plus a JSON manifest
+Dates keep their native datetime64 type and text columns are dictionary-encoded
+"""
+
+import json
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+META_FILE = "_meta.json"
+FORMAT_VERSION = 1
+
+# Code used for missing values in dictionary-encoded columns
+MISSING_CODE = -1
+
+def _column_kind(values: pd.Series) -> str:
+    """Storage kind for a column: datetime, bool, numeric or category"""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return 'datetime'
+    if pd.api.types.is_bool_dtype(values):
+        return 'bool'
+    if pd.api.types.is_numeric_dtype(values):
+        return 'numeric'
+    return 'category'
+
+def _column_file(name: str) -> str:
+    """File name for one column"""
+    return f"{name}.npy"
+
+def exists(path: str) -> bool:
+    """True if ``path`` holds a complete table (the manifest is written last)"""
+    return os.path.exists(os.path.join(path, META_FILE))
+
+def read_meta(path: str) -> Dict:
+    """Table manifest: row count and per-column kind, dtype and categories"""
+    with open(os.path.join(path, META_FILE)) as f:
+        meta = json.load(f)
+    if meta.get('version') != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported column store version {meta.get('version')}")
+    return meta
+
+def table_columns(path: str) -> List[str]:
+    """Column names stored in a table, in order"""
+    return [spec['name'] for spec in read_meta(path)['columns']]
+
+class TableWriter:
+    """Write a table chunk by chunk into preallocated per-column NPY files
+
+    The total row count is fixed up front so every column file can be
+    allocated once; each chunk only maps its own row window. Dictionaries
+    for text columns grow as new values appear and are stored in the
+    manifest when the writer is closed.
+    """
+
+    def __init__(self, path: str, total_rows: int):
+        self.path = path
+        self.total_rows = total_rows
+        self.rows_written = 0
+        self.columns = None
+
+        # Clear out any previous version of the table, manifest first
+        os.makedirs(path, exist_ok=True)
+        for file_name in [META_FILE] + sorted(os.listdir(path)):
+            file_path = os.path.join(path, file_name)
+            if os.path.exists(file_path) and (file_name == META_FILE or file_name.endswith('.npy')):
+                os.remove(file_path)
+
+    def _allocate(self, chunk: pd.DataFrame):
+        """Create the column files from the first chunk's columns and types"""
+        self.columns = []
+        for name in chunk.columns:
+            kind = _column_kind(chunk[name])
+            if kind == 'category':
+                dtype = np.dtype(np.int32)
+            elif kind == 'datetime':
+                # Keep the source unit (pandas 3 defaults to microseconds, pandas 2 to nanoseconds)
+                dtype = chunk[name].dtype if isinstance(chunk[name].dtype, np.dtype) else np.dtype('datetime64[ns]')
+            else:
+                dtype = chunk[name].to_numpy().dtype
+            column_path = os.path.join(self.path, _column_file(name))
+            preallocated = np.lib.format.open_memmap(column_path, mode='w+', dtype=dtype, shape=(self.total_rows,))
+            self.columns.append({'name': name, 'kind': kind, 'dtype': dtype,
+                                 'offset': preallocated.offset, 'lookup': {}})
+            del preallocated
+
+    def _encode(self, spec: Dict, values: pd.Series) -> np.ndarray:
+        """Column values in their stored form"""
+        if spec['kind'] == 'category':
+            codes, uniques = pd.factorize(values)
+            lookup = spec['lookup']
+            mapping = np.array([lookup.setdefault(str(value), len(lookup)) for value in uniques], dtype=np.int32)
+            encoded = np.full(len(codes), MISSING_CODE, dtype=np.int32)
+            present = codes != MISSING_CODE
+            encoded[present] = mapping[codes[present]]
+            return encoded
+        return values.to_numpy(dtype=spec['dtype'])
+
+    def append(self, chunk: pd.DataFrame):
+        """Write the next ``len(chunk)`` rows"""
+        if self.rows_written + len(chunk) > self.total_rows:
+            raise ValueError(f"{self.path}: more than {self.total_rows} rows appended")
+        if self.columns is None:
+            self._allocate(chunk)
+        for spec in self.columns:
+            window = np.memmap(os.path.join(self.path, _column_file(spec['name'])), dtype=spec['dtype'],
+                               mode='r+', shape=(len(chunk),),
+                               offset=spec['offset'] + self.rows_written * spec['dtype'].itemsize)
+            window[:] = self._encode(spec, chunk[spec['name']])
+            window.flush()
+            del window
+        self.rows_written += len(chunk)
+
+    def close(self):
+        """Write the manifest, which marks the table as complete"""
+        if self.rows_written != self.total_rows:
+            raise ValueError(f"{self.path}: expected {self.total_rows} rows, got {self.rows_written}")
+        meta = {
+            'version': FORMAT_VERSION,
+            'rows': self.total_rows,
+            'columns': [
+                {
+                    'name': spec['name'],
+                    'kind': spec['kind'],
+                    'dtype': spec['dtype'].str,
+                    **({'categories': list(spec['lookup'])} if spec['kind'] == 'category' else {})
+                }
+                for spec in (self.columns or [])
+            ]
+        }
+        with open(os.path.join(self.path, META_FILE), 'w') as f:
+            json.dump(meta, f, indent=2)
+
+def write_table(df: pd.DataFrame, path: str):
+    """Write a whole DataFrame as a columnar table"""
+    writer = TableWriter(path, len(df))
+    if len(df.columns):
+        writer.append(df)
+    writer.close()
+
+def read_column(path: str, name: str, mmap: bool = False) -> np.ndarray:
+    """Raw stored values for one column (codes for text columns), optionally memory-mapped"""
+    return np.load(os.path.join(path, _column_file(name)), mmap_mode='r' if mmap else None)
+
+def read_table(path: str, columns: Optional[List[str]] = None, mmap: bool = False) -> pd.DataFrame:
+    """Read a table, loading only the requested columns
+
+    Text columns come back as pandas categoricals over their stored
+    dictionary; dates come back as datetime64 without any parsing.
+    """
+    meta = read_meta(path)
+    specs = {spec['name']: spec for spec in meta['columns']}
+    wanted = list(specs) if columns is None else list(columns)
+    missing = [name for name in wanted if name not in specs]
+    if missing:
+        raise KeyError(f"{path}: no column(s) {', '.join(missing)}")
+
+    data = {}
+    for name in wanted:
+        spec = specs[name]
+        values = read_column(path, name, mmap=mmap)
+        if spec['kind'] == 'category':
+            values = pd.Categorical.from_codes(values, categories=spec['categories'])
+        data[name] = values
+    return pd.DataFrame(data, index=pd.RangeIndex(meta['rows']))
+
+# Self-describing NPY arrays: the value array keeps its plain NPY layout while
+# its row index (dates, ids, codes) and a small JSON description sit next to it
+ARRAY_FORMAT_VERSION = 1
+
+def array_meta_file(path: str) -> str:
+    """Description file for an NPY array: ``x.npy`` -> ``x.json``"""
+    return f"{os.path.splitext(path)[0]}.json"
+
+def array_index_file(path: str, name: str) -> str:
+    """Index file for one index column: ``x.npy`` -> ``x.<name>.npy``"""
+    return f"{os.path.splitext(path)[0]}.{name}.npy"
+
+def array_files(path: str) -> List[str]:
+    """The value array plus every sidecar file listed in its description"""
+    files = [path]
+    meta_path = array_meta_file(path)
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        files += [array_index_file(path, spec['name']) for spec in meta['index']] + [meta_path]
+    return files
+
+class ArrayWriter:
+    """Write value columns stacked into one NPY array plus its index sidecars, chunk by chunk
+
+    Like ``TableWriter`` every file is preallocated from the total row
+    count and each chunk maps only its own row window. Dates in the index
+    are stored as datetime64[D], text as int32 dictionary codes; a text
+    index can carry a label column (e.g. state name per state code).
+    """
+
+    def __init__(self, path: str, total_rows: int, columns: List[str], index: List[str],
+                 labels: Optional[Dict[str, str]] = None):
+        self.path = path
+        self.total_rows = total_rows
+        self.columns = columns
+        self.index = [{'name': name, 'label_column': (labels or {}).get(name), 'lookup': {}, 'labels': {}}
+                      for name in index]
+        self.rows_written = 0
+        self.layouts = None
+        
+        # The description goes first so a half-written array is never trusted
+        if os.path.exists(array_meta_file(path)):
+            os.remove(array_meta_file(path))
+
+    def _values(self, chunk: pd.DataFrame) -> np.ndarray:
+        """Value columns: a single column, or several stacked side by side"""
+        if len(self.columns) == 1:
+            return chunk[self.columns[0]].values
+        return np.column_stack([chunk[column].values for column in self.columns])
+
+    def _index_values(self, spec: Dict, chunk: pd.DataFrame) -> np.ndarray:
+        """One index column in its stored form"""
+        values = chunk[spec['name']]
+        kind = _column_kind(values)
+        spec.setdefault('kind', kind)
+        if kind == 'datetime':
+            return values.to_numpy(dtype='datetime64[D]')
+        if kind != 'category':
+            return values.to_numpy()
+        codes, uniques = pd.factorize(values)
+        lookup = spec['lookup']
+        mapping = np.array([lookup.setdefault(str(value), len(lookup)) for value in uniques], dtype=np.int32)
+        if spec['label_column'] is not None:
+            label_values = chunk[spec['label_column']].to_numpy()
+            first_rows = pd.Series(np.arange(len(codes))).groupby(codes).first()
+            for code, row in first_rows.items():
+                if code != MISSING_CODE:
+                    spec['labels'].setdefault(str(uniques[code]), str(label_values[row]))
+        encoded = np.full(len(codes), MISSING_CODE, dtype=np.int32)
+        present = codes != MISSING_CODE
+        encoded[present] = mapping[codes[present]]
+        return encoded
+
+    def _write_window(self, file_path: str, values: np.ndarray):
+        """Copy ``values`` into rows [rows_written, rows_written + len) of a preallocated file"""
+        if file_path not in self.layouts:
+            preallocated = np.lib.format.open_memmap(file_path, mode='w+', dtype=values.dtype,
+                                                     shape=(self.total_rows,) + values.shape[1:])
+            self.layouts[file_path] = (values.dtype, values.shape[1:], preallocated.offset)
+            del preallocated
+        dtype, row_shape, header_size = self.layouts[file_path]
+        row_bytes = dtype.itemsize * int(np.prod(row_shape, dtype=np.int64))
+        window = np.memmap(file_path, dtype=dtype, mode='r+', shape=(len(values),) + row_shape,
+                           offset=header_size + self.rows_written * row_bytes)
+        window[:] = values
+        window.flush()
+        del window
+
+    def append(self, chunk: pd.DataFrame):
+        """Write the next ``len(chunk)`` rows"""
+        if self.rows_written + len(chunk) > self.total_rows:
+            raise ValueError(f"{self.path}: more than {self.total_rows} rows appended")
+        if self.layouts is None:
+            self.layouts = {}
+        self._write_window(self.path, self._values(chunk))
+        for spec in self.index:
+            self._write_window(array_index_file(self.path, spec['name']), self._index_values(spec, chunk))
+        self.rows_written += len(chunk)
+
+    def close(self):
+        """Write the description, which marks the array as complete"""
+        if self.rows_written != self.total_rows:
+            raise ValueError(f"{self.path}: expected {self.total_rows} rows, got {self.rows_written}")
+        if self.layouts is None:
+            # No chunk ever arrived: zero-row files, so the array still opens
+            self.layouts = {}
+            row_shape = () if len(self.columns) == 1 else (len(self.columns),)
+            self._write_window(self.path, np.empty((0,) + row_shape, dtype=np.float64))
+            for spec in self.index:
+                spec.setdefault('kind', 'numeric')
+                self._write_window(array_index_file(self.path, spec['name']), np.empty(0, dtype=np.int64))
+        meta = {
+            'version': ARRAY_FORMAT_VERSION,
+            'rows': self.total_rows,
+            'columns': self.columns,
+            'index': [
+                {
+                    'name': spec['name'],
+                    'kind': spec.get('kind'),
+                    **({'categories': list(spec['lookup'])} if spec.get('kind') == 'category' else {}),
+                    **({'labels': [spec['labels'].get(value) for value in spec['lookup']]}
+                       if spec['label_column'] is not None else {})
+                }
+                for spec in self.index
+            ]
+        }
+        with open(array_meta_file(self.path), 'w') as f:
+            json.dump(meta, f, indent=2)
+
+def write_array(df: pd.DataFrame, path: str, columns: List[str], index: List[str],
+                labels: Optional[Dict[str, str]] = None):
+    """Write ``columns`` of a whole DataFrame as one NPY array with its index sidecars"""
+    writer = ArrayWriter(path, len(df), columns, index, labels)
+    writer.append(df)
+    writer.close()
+
+def open_array(path: str) -> Dict:
+    """Memory-map an NPY array and its index sidecars
+
+    Returns ``{'values', 'columns', 'index', 'meta'}`` where ``index``
+    maps each index column to its memory-mapped values (dates as
+    datetime64[D], text as codes into ``meta`` categories).
+    """
+    with open(array_meta_file(path)) as f:
+        meta = json.load(f)
+    if meta.get('version') != ARRAY_FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported array description version {meta.get('version')}")
+    return {
+        'values': np.load(path, mmap_mode='r'),
+        'columns': meta['columns'],
+        'index': {spec['name']: np.load(array_index_file(path, spec['name']), mmap_mode='r')
+                  for spec in meta['index']},
+        'meta': meta,
+    }
@@ -0,0 +1,185 @@
+"""
+Packed User Coordinates for Business Dashboard
+Stores user map points in one small binary file: lat/lon quantized to 16-bit
+fixed point over the US bounds, state as a one-byte code and implicit user IDs
+"""
+
+import json
+import struct
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+MAGIC = b'QCRD'
+FORMAT_VERSION = 1
+
+# Fixed-point resolution: 16 bits spread over the bounding box (~40 m of
+# latitude and ~90 m of longitude per step over the US bounds)
+COORD_DTYPE = np.dtype('<u2')
+COORD_STEPS = np.iinfo(COORD_DTYPE).max
+STATE_DTYPE = np.dtype('u1')
+
+# Column order in the file; every column is stored contiguously
+COLUMNS = [('lat', COORD_DTYPE), ('lon', COORD_DTYPE), ('state', STATE_DTYPE)]
+
+# Prefix: magic, then the length of the JSON header that follows it
+PREFIX = struct.Struct('<4sI')
+ALIGNMENT = 16
+
+def quantize(values: np.ndarray, bounds: Tuple[float, float]) -> np.ndarray:
+    """Map values within ``bounds`` onto 0..COORD_STEPS"""
+    low, high = bounds
+    scaled = (np.asarray(values, dtype=np.float64) - low) * (COORD_STEPS / (high - low))
+    return np.clip(np.rint(scaled), 0, COORD_STEPS).astype(COORD_DTYPE)
+
+def dequantize(codes: np.ndarray, bounds: Tuple[float, float]) -> np.ndarray:
+    """Inverse of ``quantize`` (to within half a step)"""
+    low, high = bounds
+    return low + codes.astype(np.float64) * ((high - low) / COORD_STEPS)
+
+def _layout(total_rows: int, header: bytes) -> Dict[str, int]:
+    """Byte offset of every column for a file with the given header"""
+    offset = PREFIX.size + len(header)
+    offsets = {}
+    for name, dtype in COLUMNS:
+        offsets[name] = offset
+        offset += total_rows * dtype.itemsize
+    return offsets
+
+def _header(total_rows: int, lat_bounds: Tuple[float, float], lon_bounds: Tuple[float, float],
+            states: Dict[str, str]) -> bytes:
+    """JSON header, padded so the first column starts aligned"""
+    header = json.dumps({
+        'version': FORMAT_VERSION,
+        'rows': total_rows,
+        'lat_bounds': list(lat_bounds),
+        'lon_bounds': list(lon_bounds),
+        'states': list(states),
+        'state_names': list(states.values())
+    }).encode('utf-8')
+    padding = -(PREFIX.size + len(header)) % ALIGNMENT
+    return header + b' ' * padding
+
+class CoordinateWriter:
+    """Write user coordinates chunk by chunk into a preallocated packed file
+
+    ``states`` maps state codes to names; its order fixes the one-byte
+    state codes. User IDs are not stored: row ``i`` is user ``i + 1``.
+    """
+
+    def __init__(self, path: str, total_rows: int, lat_bounds: Tuple[float, float],
+                 lon_bounds: Tuple[float, float], states: Dict[str, str]):
+        if len(states) > np.iinfo(STATE_DTYPE).max + 1:
+            raise ValueError(f"{path}: at most {np.iinfo(STATE_DTYPE).max + 1} states fit in a one-byte code")
+        self.path = path
+        self.total_rows = total_rows
+        self.lat_bounds = tuple(lat_bounds)
+        self.lon_bounds = tuple(lon_bounds)
+        self.state_codes = {code: index for index, code in enumerate(states)}
+        self.rows_written = 0
+
+        header = _header(total_rows, self.lat_bounds, self.lon_bounds, states)
+        self.offsets = _layout(total_rows, header)
+        with open(path, 'wb') as f:
+            f.write(PREFIX.pack(MAGIC, len(header)))
+            f.write(header)
+            f.truncate(self.offsets[COLUMNS[-1][0]] + total_rows * COLUMNS[-1][1].itemsize)
+
+    def append(self, chunk: pd.DataFrame):
+        """Write the next ``len(chunk)`` users (columns lat, lon, state)"""
+        if self.rows_written + len(chunk) > self.total_rows:
+            raise ValueError(f"{self.path}: more than {self.total_rows} rows appended")
+        states = chunk['state'].astype(object).map(self.state_codes)
+        if states.isna().any():
+            raise ValueError(f"{self.path}: unknown state code(s) {sorted(set(chunk['state'][states.isna()]))}")
+        encoded = {
+            'lat': quantize(chunk['lat'].to_numpy(), self.lat_bounds),
+            'lon': quantize(chunk['lon'].to_numpy(), self.lon_bounds),
+            'state': states.to_numpy(dtype=STATE_DTYPE)
+        }
+        for name, dtype in COLUMNS:
+            if len(chunk) == 0:
+                continue
+            window = np.memmap(self.path, dtype=dtype, mode='r+', shape=(len(chunk),),
+                               offset=self.offsets[name] + self.rows_written * dtype.itemsize)
+            window[:] = encoded[name]
+            window.flush()
+            del window
+        self.rows_written += len(chunk)
+
+    def close(self):
+        """Check that every row was written"""
+        if self.rows_written != self.total_rows:
+            raise ValueError(f"{self.path}: expected {self.total_rows} rows, got {self.rows_written}")
+
+def write_coordinates(df: pd.DataFrame, path: str, lat_bounds: Tuple[float, float],
+                      lon_bounds: Tuple[float, float], states: Dict[str, str]):
+    """Write a whole user coordinates frame as a packed file"""
+    writer = CoordinateWriter(path, len(df), lat_bounds, lon_bounds, states)
+    writer.append(df)
+    writer.close()
+
+class PackedCoordinates:
+    """Lazy view of a packed coordinates file
+
+    The columns are memory-mapped on open; each property decodes its
+    whole column with array operations only when it is first used.
+    """
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            magic, header_size = PREFIX.unpack(f.read(PREFIX.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path}: not a packed coordinates file")
+            meta = json.loads(f.read(header_size))
+        if meta.get('version') != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported packed coordinates version {meta.get('version')}")
+
+        self.path = path
+        self.meta = meta
+        self.rows = meta['rows']
+        offsets = _layout(self.rows, b' ' * header_size)
+        self.codes = {
+            name: np.memmap(path, dtype=dtype, mode='r', shape=(self.rows,), offset=offsets[name])
+            if self.rows else np.empty(0, dtype=dtype)
+            for name, dtype in COLUMNS
+        }
+        self._decoded = {}
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def _decode(self, name: str, decoder) -> np.ndarray:
+        if name not in self._decoded:
+            self._decoded[name] = decoder()
+        return self._decoded[name]
+
+    @property
+    def lat(self) -> np.ndarray:
+        return self._decode('lat', lambda: dequantize(self.codes['lat'], self.meta['lat_bounds']))
+
+    @property
+    def lon(self) -> np.ndarray:
+        return self._decode('lon', lambda: dequantize(self.codes['lon'], self.meta['lon_bounds']))
+
+    @property
+    def user_id(self) -> np.ndarray:
+        return self._decode('user_id', lambda: np.arange(1, self.rows + 1, dtype=np.int32))
+
+    @property
+    def state(self) -> np.ndarray:
+        return self._decode('state', lambda: np.array(self.meta['states'], dtype=object)[self.codes['state']])
+
+    @property
+    def state_name(self) -> np.ndarray:
+        return self._decode('state_name', lambda: np.array(self.meta['state_names'], dtype=object)[self.codes['state']])
+
+    def to_frame(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Decode the requested columns (default: all) into a DataFrame"""
+        columns = columns if columns is not None else ['user_id', 'lat', 'lon', 'state', 'state_name']
+        return pd.DataFrame({name: getattr(self, name) for name in columns})
+
+def read_coordinates(path: str) -> PackedCoordinates:
+    """Open a packed coordinates file without decoding anything yet"""
+    return PackedCoordinates(path)
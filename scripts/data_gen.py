@@ -6,26 +6,53 @@ Creates CSV and NPY files for various dashboard components
 
 import pandas as pd
 import numpy as np
-import random
+import argparse
+import copy
+import hashlib
+import inspect
+import json
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
 import os
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
-# Set random seed for reproducibility
-np.random.seed(42)
-random.seed(42)
+import colstore
+import coordpack
+import dealparts
+import feedindex
+import kpi
+import rollup
+import schema
+import spatial
+import sqlstore
 
 # Configuration
 DATA_DIR = "data"
 START_DATE = datetime(2024, 1, 1)
 END_DATE = datetime(2024, 12, 31)
 
+# Root seed for reproducibility; every dataset draws from its own child stream
+ROOT_SEED = 42
+
+# Order fixes each dataset's spawned stream, so only ever append to this list
+RNG_STREAMS = [
+    'sales', 'deals', 'social', 'website', 'nps',
+    'feedback', 'geo', 'user_coords'
+]
+
 # Sales representatives
 SALES_REPS = [
     "Alice", "Jared", "Heather", "Shaun", "Marsha", 
     "Polly", "Dalisu", "Marcus", "Sarah", "Kevin"
 ]
 
+# Deal amount (mean, std) per rep; reps not listed use DEFAULT_DEAL_TIER
+REP_DEAL_TIERS = {
+    "Alice": (7000, 2000), "Jared": (7000, 2000),
+    "Heather": (6000, 1500), "Shaun": (6000, 1500),
+}
+DEFAULT_DEAL_TIER = (4000, 1000)
+
 # US States and their coordinates (for map visualization)
 US_STATES = {
     'CA': {'name': 'California', 'lat': 36.7783, 'lon': -119.4179, 'pop_weight': 0.12},
@@ -79,185 +106,403 @@ US_STATES = {
     'AK': {'name': 'Alaska', 'lat': 61.0700, 'lon': -165.4048, 'pop_weight': 0.002},
 }
 
+def dataset_rng(name: str, root_seed: int = ROOT_SEED) -> np.random.Generator:
+    """Independent random generator for one dataset, spawned from the root seed"""
+    children = np.random.SeedSequence(root_seed).spawn(len(RNG_STREAMS))
+    return np.random.default_rng(children[RNG_STREAMS.index(name)])
+
 def create_data_directory():
     """Create data directory if it doesn't exist"""
     if not os.path.exists(DATA_DIR):
         os.makedirs(DATA_DIR)
         print(f"Created {DATA_DIR} directory")
 
-def generate_sales_data() -> pd.DataFrame:
+def _seasonal_factor(date_range: pd.DatetimeIndex) -> np.ndarray:
+    """Yearly seasonality multiplier for each date in the range"""
+    day_of_year = date_range.dayofyear.values
+    return 1 + 0.3 * np.sin(2 * np.pi * day_of_year / 365)
+
+def _weekend_mask(date_range: pd.DatetimeIndex) -> np.ndarray:
+    """Boolean array that is True for Saturdays and Sundays"""
+    return date_range.weekday.values >= 5
+
+def _clamped_cumsum(start: float, increments: np.ndarray, floor: float) -> np.ndarray:
+    """Running total along the last axis of ``start`` plus increments clamped at ``floor``
+
+    The start value is prepended before summing so the additions happen in
+    the same order as a day-by-day loop.
+    """
+    steps = np.maximum(floor, increments)
+    initial = np.full(steps.shape[:-1] + (1,), start, dtype=np.float64)
+    return np.cumsum(np.concatenate([initial, steps], axis=-1), axis=-1)[..., 1:]
+
+def _series_frame(date_range: pd.DatetimeIndex, n_series: int, columns: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """Build a long-format frame from per-series (n_series, n_days) and per-day (n_days) arrays
+
+    A single series keeps the original schema; multiple series are stacked
+    series by series with a leading ``unit_id`` column.
+    """
+    n_days = len(date_range)
+    frame = {}
+    if n_series > 1:
+        frame['unit_id'] = np.repeat(np.arange(1, n_series + 1), n_days)
+    frame['date'] = np.tile(date_range.values, n_series)
+    for name, values in columns.items():
+        values = np.asarray(values)
+        frame[name] = values.ravel() if values.ndim == 2 else np.tile(values, n_series)
+    return pd.DataFrame(frame)
+
+def _sales_columns(date_range: pd.DatetimeIndex, random_factor: np.ndarray) -> Dict[str, np.ndarray]:
+    """Daily sales columns for the dates, given one random factor per series per day"""
+    base_daily_sales = 8000  # Base daily sales
+    
+    # Seasonality and weekly patterns (lower on weekends) are shared by every series
+    seasonal_factor = _seasonal_factor(date_range)
+    weekly_factor = np.where(_weekend_mask(date_range), 0.7, 1.0)
+    
+    daily_sales = base_daily_sales * seasonal_factor * weekly_factor * random_factor
+    daily_sales = np.maximum(1000, daily_sales)  # Ensure minimum sales
+    
+    return {
+        'daily_sales': np.round(daily_sales, 2),
+        'day_of_week': date_range.day_name().values,
+        'month': date_range.month_name().values,
+        'year': date_range.year.values.astype(np.int64)
+    }
+
+def generate_sales_data(start_date: datetime = START_DATE, end_date: datetime = END_DATE,
+                        n_series: int = 1, rng: Optional[np.random.Generator] = None) -> pd.DataFrame:
     """Generate sales data for the dashboard"""
     print("Generating sales data...")
+    rng = rng if rng is not None else dataset_rng('sales')
     
-    # Generate daily sales data for the past year
-    date_range = pd.date_range(start=START_DATE, end=END_DATE, freq='D')
+    # Generate daily sales data for the requested range
+    date_range = pd.date_range(start=start_date, end=end_date, freq='D')
     
-    sales_data = []
-    base_daily_sales = 8000  # Base daily sales
+    # Random variation, one draw per series per day
+    random_factor = rng.normal(1.0, 0.3, size=(n_series, len(date_range)))
     
-    for date in date_range:
-        # Add seasonality and trends
-        day_of_year = date.timetuple().tm_yday
-        seasonal_factor = 1 + 0.3 * np.sin(2 * np.pi * day_of_year / 365)
-        
-        # Add weekly patterns (lower on weekends)
-        weekly_factor = 0.7 if date.weekday() >= 5 else 1.0
-        
-        # Add random variation
-        random_factor = np.random.normal(1.0, 0.3)
-        
-        daily_sales = base_daily_sales * seasonal_factor * weekly_factor * random_factor
-        daily_sales = max(1000, daily_sales)  # Ensure minimum sales
-        
-        sales_data.append({
-            'date': date,
-            'daily_sales': round(daily_sales, 2),
-            'day_of_week': date.strftime('%A'),
-            'month': date.strftime('%B'),
-            'year': date.year
-        })
-    
-    df = pd.DataFrame(sales_data)
+    df = _series_frame(date_range, n_series, _sales_columns(date_range, random_factor))
     
     # Calculate running totals and metrics
-    df['monthly_sales'] = df.groupby([df['date'].dt.year, df['date'].dt.month])['daily_sales'].cumsum()
-    df['sales_growth'] = df['daily_sales'].pct_change().fillna(0)
+    series_keys = [df['unit_id']] if n_series > 1 else []
+    df['monthly_sales'] = df.groupby(series_keys + [df['date'].dt.year, df['date'].dt.month])['daily_sales'].cumsum()
+    if n_series > 1:
+        df['sales_growth'] = df.groupby('unit_id')['daily_sales'].pct_change().fillna(0)
+    else:
+        df['sales_growth'] = df['daily_sales'].pct_change().fillna(0)
     
-    return df
+    return schema.apply_schema(df, 'sales')
+
+def _day_blocks(date_range: pd.DatetimeIndex, n_series: int, chunk_rows: int) -> Iterator[Tuple[int, pd.DatetimeIndex]]:
+    """(unit_id, dates) blocks of at most ``chunk_rows`` days, series by series"""
+    for unit_id in range(1, n_series + 1):
+        for first in range(0, len(date_range), chunk_rows):
+            yield unit_id, date_range[first:first + chunk_rows]
+
+def _with_unit_id(chunk: pd.DataFrame, unit_id: int, n_series: int) -> pd.DataFrame:
+    """Add the leading unit_id column that multi-series output carries"""
+    if n_series > 1:
+        chunk.insert(0, 'unit_id', unit_id)
+    return chunk
+
+def stream_sales_data(chunk_rows: int, start_date: datetime = START_DATE, end_date: datetime = END_DATE,
+                      n_series: int = 1, rng: Optional[np.random.Generator] = None) -> Tuple[int, Iterator[pd.DataFrame]]:
+    """Sales data as (total rows, iterator of chunks) for bounded-memory writing
+
+    Random draws follow the same order as ``generate_sales_data``, so rows
+    match it; running monthly totals are carried between chunks.
+    """
+    rng = rng if rng is not None else dataset_rng('sales')
+    date_range = pd.date_range(start=start_date, end=end_date, freq='D')
+    
+    def chunks():
+        print("Generating sales data (streaming)...")
+        month_carry, previous_sales = None, None
+        for unit_id, dates in _day_blocks(date_range, n_series, chunk_rows):
+            if dates[0] == date_range[0]:
+                month_carry, previous_sales = None, None
+            columns = _sales_columns(dates, rng.normal(1.0, 0.3, size=len(dates)))
+            daily_sales = columns['daily_sales']
+            columns['monthly_sales'], month_carry = _running_monthly_total(dates, daily_sales, month_carry)
+            previous = np.concatenate([[np.nan if previous_sales is None else previous_sales], daily_sales[:-1]])
+            columns['sales_growth'] = np.nan_to_num(daily_sales / previous - 1, nan=0.0)
+            previous_sales = daily_sales[-1]
+            yield schema.apply_schema(_with_unit_id(_series_frame(dates, 1, columns), unit_id, n_series), 'sales')
+    
+    return len(date_range) * n_series, chunks()
+
+def _running_monthly_total(dates: pd.DatetimeIndex, values: np.ndarray,
+                           carry: Optional[Tuple[int, float]]) -> Tuple[np.ndarray, Tuple[int, float]]:
+    """Month-to-date running totals, continuing from the (month key, total) carried from the previous chunk"""
+    month_key = dates.year.values * 12 + dates.month.values
+    totals = np.empty(len(values), dtype=np.float64)
+    boundaries = np.flatnonzero(np.diff(month_key)) + 1
+    for first, last in zip(np.concatenate([[0], boundaries]), np.concatenate([boundaries, [len(values)]])):
+        opening = carry[1] if carry is not None and carry[0] == month_key[first] else 0.0
+        totals[first:last] = np.cumsum(np.concatenate([[opening], values[first:last]]))[1:]
+        carry = (month_key[first], totals[last - 1])
+    return totals, carry
 
-def generate_deals_data() -> pd.DataFrame:
-    """Generate individual deals data"""
+def _sequential_ids(prefix: str, count: int, width: int = 4, start: int = 1) -> np.ndarray:
+    """Build ``prefix`` plus zero-padded ids start..start+count-1 without formatting each row in Python"""
+    ids_out = np.empty(count, dtype=object)
+    prefix_bytes = np.frombuffer(prefix.encode('ascii'), dtype=np.uint8)
+    
+    # Ids are ascending, so each digit count is one contiguous block
+    num_digits = max(width, len(str(start)))
+    first, stop = start, start + count - 1
+    while first <= stop:
+        last = min(stop, 10 ** num_digits - 1)
+        ids = np.arange(first, last + 1)
+        powers = 10 ** np.arange(num_digits - 1, -1, -1)
+        digits = (ids[:, None] // powers % 10 + ord('0')).astype(np.uint8)
+        chars = np.hstack([np.broadcast_to(prefix_bytes, (len(ids), len(prefix_bytes))), digits])
+        ids_out[first - start:last - start + 1] = chars.view(f'S{chars.shape[1]}').ravel().astype(str)
+        first = last + 1
+        num_digits += 1
+    return ids_out
+
+def _deal_tiers(sales_reps: List[str], rep_tiers: Dict[str, Tuple[float, float]]) -> np.ndarray:
+    """(mean, std) deal amount row per rep; some reps are better performers"""
+    return np.array([rep_tiers.get(rep, DEFAULT_DEAL_TIER) for rep in sales_reps], dtype=np.float64)
+
+def _deals_frame(months: pd.PeriodIndex, month_index: np.ndarray, rep_index: np.ndarray,
+                 amounts: np.ndarray, days: np.ndarray, sales_reps: List[str], first_id: int = 1) -> pd.DataFrame:
+    """Assemble deal rows from sampled month, rep, amount and day arrays"""
+    amounts = np.maximum(1000, amounts)  # Minimum deal size
+    
+    # Random date in the month
+    deal_dates = months.to_timestamp().values[month_index] + (days - 1).astype('timedelta64[D]')
+    
+    month_numbers = months.month.values.astype(np.int64)[month_index]
+    quarter_labels = np.array(['Q1', 'Q2', 'Q3', 'Q4'], dtype=object)
+    
+    df = pd.DataFrame({
+        'date': deal_dates,
+        'sales_rep': np.array(sales_reps, dtype=object)[rep_index],
+        'amount': np.round(amounts, 2),
+        'month': month_numbers,
+        'quarter': quarter_labels[(month_numbers - 1) // 3],
+        'deal_id': _sequential_ids('DEAL_', len(month_index), start=first_id),
+        'year': months.year.values.astype(np.int64)[month_index]
+    })
+    return schema.apply_schema(df, 'deals')
+
+def generate_deals_data(start_date: datetime = START_DATE, end_date: datetime = END_DATE,
+                        sales_reps: Optional[List[str]] = None,
+                        rep_tiers: Optional[Dict[str, Tuple[float, float]]] = None,
+                        deals_per_month: Tuple[int, int] = (15, 35),
+                        sort_by_amount: bool = False,
+                        rng: Optional[np.random.Generator] = None) -> pd.DataFrame:
+    """Generate individual deals data
+
+    ``sales_reps`` and ``rep_tiers`` override the default roster and the
+    (mean, std) deal amount per rep. Deals stay in month order; the
+    biggest deals per month are kept in the partition sidecars (see
+    dealparts.py), so ``sort_by_amount`` is only needed for a CSV sorted
+    by amount.
+    """
     print("Generating deals data...")
+    rng = rng if rng is not None else dataset_rng('deals')
     
-    deals_data = []
+    sales_reps = list(SALES_REPS if sales_reps is None else sales_reps)
+    tiers = _deal_tiers(sales_reps, REP_DEAL_TIERS if rep_tiers is None else rep_tiers)
     
-    # Generate deals for each month
-    for month in range(1, 13):
-        # Number of deals per month (varies)
-        num_deals = np.random.randint(15, 35)
-        
-        for _ in range(num_deals):
-            rep = random.choice(SALES_REPS)
-            
-            # Deal amounts vary by rep (some are better performers)
-            if rep in ['Alice', 'Jared']:
-                amount = np.random.normal(7000, 2000)
-            elif rep in ['Heather', 'Shaun']:
-                amount = np.random.normal(6000, 1500)
-            else:
-                amount = np.random.normal(4000, 1000)
-            
-            amount = max(1000, amount)  # Minimum deal size
-            
-            # Random date in the month
-            day = np.random.randint(1, 29)
-            deal_date = datetime(2024, month, day)
-            
-            deals_data.append({
-                'date': deal_date,
-                'sales_rep': rep,
-                'amount': round(amount, 2),
-                'month': month,
-                'quarter': f"Q{(month-1)//3 + 1}",
-                'deal_id': f"DEAL_{len(deals_data)+1:04d}"
-            })
+    # Number of deals per month (varies)
+    months = pd.period_range(start=start_date, end=end_date, freq='M')
+    num_deals = rng.integers(deals_per_month[0], deals_per_month[1], size=len(months))
+    month_index = np.repeat(np.arange(len(months)), num_deals)
+    total_deals = len(month_index)
     
-    df = pd.DataFrame(deals_data)
+    rep_index = rng.integers(0, len(sales_reps), size=total_deals)
+    amounts = rng.normal(tiers[rep_index, 0], tiers[rep_index, 1])
+    days = rng.integers(1, 29, size=total_deals)
+    
+    df = _deals_frame(months, month_index, rep_index, amounts, days, sales_reps)
     
     # Sort by amount to get biggest deals
-    df = df.sort_values('amount', ascending=False).reset_index(drop=True)
+    if sort_by_amount:
+        df = df.sort_values('amount', ascending=False).reset_index(drop=True)
     
     return df
 
-def generate_social_media_data() -> pd.DataFrame:
+def stream_deals_data(chunk_rows: int, start_date: datetime = START_DATE, end_date: datetime = END_DATE,
+                      sales_reps: Optional[List[str]] = None,
+                      rep_tiers: Optional[Dict[str, Tuple[float, float]]] = None,
+                      deals_per_month: Tuple[int, int] = (15, 35),
+                      sort_by_amount: bool = False,
+                      rng: Optional[np.random.Generator] = None) -> Tuple[int, Iterator[pd.DataFrame]]:
+    """Deals data in month order as (total rows, iterator of chunks) for bounded-memory writing
+
+    Per-month counts are drawn up front. Reps, amounts and days each come
+    from their own copy of the generator, advanced past the fields drawn
+    before them, so rows match ``generate_deals_data`` for any chunk size.
+    A global sort by amount is not possible when streaming.
+    """
+    if sort_by_amount:
+        raise ValueError("Streamed deals stay in month order; sort_by_amount is not supported")
+    rng = rng if rng is not None else dataset_rng('deals')
+    
+    sales_reps = list(SALES_REPS if sales_reps is None else sales_reps)
+    tiers = _deal_tiers(sales_reps, REP_DEAL_TIERS if rep_tiers is None else rep_tiers)
+    months = pd.period_range(start=start_date, end=end_date, freq='M')
+    month_ends = np.cumsum(rng.integers(deals_per_month[0], deals_per_month[1], size=len(months)))
+    total_deals = int(month_ends[-1]) if len(month_ends) else 0
+    
+    def draw_reps(field_rng, size):
+        return field_rng.integers(0, len(sales_reps), size=size)
+    
+    def chunks():
+        print("Generating deals data (streaming)...")
+        # The batch generator draws all reps, then all amounts, then all days
+        rep_rng, amount_rng, day_rng = rng, copy.deepcopy(rng), copy.deepcopy(rng)
+        for first in range(0, total_deals, chunk_rows):
+            size = min(chunk_rows, total_deals - first)
+            draw_reps(amount_rng, size)
+            draw_reps(day_rng, size)
+        for first in range(0, total_deals, chunk_rows):
+            day_rng.standard_normal(size=min(chunk_rows, total_deals - first))
+        
+        for first in range(0, total_deals, chunk_rows):
+            rows = np.arange(first, min(first + chunk_rows, total_deals))
+            month_index = np.searchsorted(month_ends, rows, side='right')
+            rep_index = draw_reps(rep_rng, len(rows))
+            amounts = amount_rng.normal(tiers[rep_index, 0], tiers[rep_index, 1])
+            days = day_rng.integers(1, 29, size=len(rows))
+            yield _deals_frame(months, month_index, rep_index, amounts, days, sales_reps, first_id=first + 1)
+    
+    return total_deals, chunks()
+
+# Starting follower counts
+LINKEDIN_START_FOLLOWERS = 18000
+TWITTER_START_FOLLOWERS = 9800
+
+def _social_columns(growth: np.ndarray, linkedin_start: float, twitter_start: float) -> Dict[str, np.ndarray]:
+    """Follower columns from (..., days, 2) growth draws and the counts before the first day
+
+    Follower counts are clamped running sums; Twitter can lose followers.
+    The running float totals are returned too so streams can continue them.
+    """
+    linkedin_growth = growth[..., 0]
+    twitter_growth = growth[..., 1]
+    linkedin_counts = _clamped_cumsum(linkedin_start, linkedin_growth, 0)
+    twitter_counts = _clamped_cumsum(twitter_start, twitter_growth, -5)
+    return {
+        'linkedin_followers': linkedin_counts.astype(np.int64),
+        'twitter_followers': twitter_counts.astype(np.int64),
+        'linkedin_growth': np.round(linkedin_growth, 1),
+        'twitter_growth': np.round(twitter_growth, 1)
+    }, (linkedin_counts[..., -1], twitter_counts[..., -1])
+
+def generate_social_media_data(start_date: datetime = START_DATE, end_date: datetime = END_DATE,
+                               n_series: int = 1, rng: Optional[np.random.Generator] = None) -> pd.DataFrame:
     """Generate social media followers data"""
     print("Generating social media data...")
+    rng = rng if rng is not None else dataset_rng('social')
     
     # Generate daily follower counts
-    date_range = pd.date_range(start=START_DATE, end=END_DATE, freq='D')
+    date_range = pd.date_range(start=start_date, end=end_date, freq='D')
     
-    # Starting follower counts
-    linkedin_followers = 18000
-    twitter_followers = 9800
+    # LinkedIn growth (steady, average 15 per day) and Twitter growth (more
+    # volatile, average 8 per day), drawn as interleaved pairs per day
+    growth = rng.normal([15, 8], [5, 10], size=(n_series, len(date_range), 2))
+    columns, _ = _social_columns(growth, LINKEDIN_START_FOLLOWERS, TWITTER_START_FOLLOWERS)
     
-    social_data = []
+    df = _series_frame(date_range, n_series, columns)
+    return schema.apply_schema(df, 'social')
+
+def stream_social_media_data(chunk_rows: int, start_date: datetime = START_DATE, end_date: datetime = END_DATE,
+                             n_series: int = 1, rng: Optional[np.random.Generator] = None) -> Tuple[int, Iterator[pd.DataFrame]]:
+    """Social media data as (total rows, iterator of chunks); rows match ``generate_social_media_data``"""
+    rng = rng if rng is not None else dataset_rng('social')
+    date_range = pd.date_range(start=start_date, end=end_date, freq='D')
     
-    for date in date_range:
-        # LinkedIn growth (steady)
-        linkedin_growth = np.random.normal(15, 5)  # Average 15 followers per day
-        linkedin_followers += max(0, linkedin_growth)
-        
-        # Twitter growth (more volatile)
-        twitter_growth = np.random.normal(8, 10)  # Average 8 followers per day
-        twitter_followers += max(-5, twitter_growth)  # Can lose followers
-        
-        social_data.append({
-            'date': date,
-            'linkedin_followers': int(linkedin_followers),
-            'twitter_followers': int(twitter_followers),
-            'linkedin_growth': round(linkedin_growth, 1),
-            'twitter_growth': round(twitter_growth, 1)
-        })
+    def chunks():
+        print("Generating social media data (streaming)...")
+        for unit_id, dates in _day_blocks(date_range, n_series, chunk_rows):
+            if dates[0] == date_range[0]:
+                running = (LINKEDIN_START_FOLLOWERS, TWITTER_START_FOLLOWERS)
+            growth = rng.normal([15, 8], [5, 10], size=(len(dates), 2))
+            columns, running = _social_columns(growth, *running)
+            yield schema.apply_schema(_with_unit_id(_series_frame(dates, 1, columns), unit_id, n_series), 'social')
     
-    df = pd.DataFrame(social_data)
-    return df
+    return len(date_range) * n_series, chunks()
+
+def _website_columns(date_range: pd.DatetimeIndex, noise: np.ndarray) -> Dict[str, np.ndarray]:
+    """Website columns for the dates from (..., days, 2) (users, enquiries) noise draws"""
+    # Base metrics
+    base_users = 800
+    base_enquiries = 4
+    
+    # Add day-of-week effects
+    weekend_factor = np.where(_weekend_mask(date_range), 0.6, 1.0)
+    
+    daily_users = (base_users * weekend_factor * noise[..., 0]).astype(np.int64)
+    daily_enquiries = (base_enquiries * weekend_factor * noise[..., 1]).astype(np.int64)
+    
+    # Ensure minimum values
+    daily_users = np.maximum(100, daily_users)
+    daily_enquiries = np.maximum(0, daily_enquiries)
+    
+    return {
+        'daily_users': daily_users,
+        'daily_enquiries': daily_enquiries,
+        'conversion_rate': np.round(daily_enquiries / daily_users * 100, 2),
+        'day_of_week': date_range.day_name().values
+    }
 
-def generate_website_analytics() -> pd.DataFrame:
+def generate_website_analytics(start_date: datetime = START_DATE, end_date: datetime = END_DATE,
+                               n_series: int = 1, rng: Optional[np.random.Generator] = None) -> pd.DataFrame:
     """Generate website analytics data"""
     print("Generating website analytics data...")
+    rng = rng if rng is not None else dataset_rng('website')
     
-    date_range = pd.date_range(start=START_DATE, end=END_DATE, freq='D')
+    date_range = pd.date_range(start=start_date, end=end_date, freq='D')
     
-    analytics_data = []
+    # Add some randomness, drawn as interleaved (users, enquiries) pairs per day
+    noise = rng.normal([1.0, 1.0], [0.3, 0.4], size=(n_series, len(date_range), 2))
     
-    for date in date_range:
-        # Base metrics
-        base_users = 800
-        base_enquiries = 4
-        
-        # Add seasonality and day-of-week effects
-        day_of_week = date.weekday()
-        weekend_factor = 0.6 if day_of_week >= 5 else 1.0
-        
-        # Add some randomness
-        daily_users = int(base_users * weekend_factor * np.random.normal(1.0, 0.3))
-        daily_enquiries = int(base_enquiries * weekend_factor * np.random.normal(1.0, 0.4))
-        
-        # Ensure minimum values
-        daily_users = max(100, daily_users)
-        daily_enquiries = max(0, daily_enquiries)
-        
-        analytics_data.append({
-            'date': date,
-            'daily_users': daily_users,
-            'daily_enquiries': daily_enquiries,
-            'conversion_rate': round(daily_enquiries / daily_users * 100, 2),
-            'day_of_week': date.strftime('%A')
-        })
+    df = _series_frame(date_range, n_series, _website_columns(date_range, noise))
+    return schema.apply_schema(df, 'website')
+
+def stream_website_analytics(chunk_rows: int, start_date: datetime = START_DATE, end_date: datetime = END_DATE,
+                             n_series: int = 1, rng: Optional[np.random.Generator] = None) -> Tuple[int, Iterator[pd.DataFrame]]:
+    """Website analytics as (total rows, iterator of chunks); rows match ``generate_website_analytics``"""
+    rng = rng if rng is not None else dataset_rng('website')
+    date_range = pd.date_range(start=start_date, end=end_date, freq='D')
     
-    df = pd.DataFrame(analytics_data)
-    return df
+    def chunks():
+        print("Generating website analytics data (streaming)...")
+        for unit_id, dates in _day_blocks(date_range, n_series, chunk_rows):
+            noise = rng.normal([1.0, 1.0], [0.3, 0.4], size=(len(dates), 2))
+            yield schema.apply_schema(_with_unit_id(_series_frame(dates, 1, _website_columns(dates, noise)), unit_id, n_series),
+                                      'website')
+    
+    return len(date_range) * n_series, chunks()
 
-def generate_nps_data() -> pd.DataFrame:
-    """Generate Net Promoter Score data"""
+def generate_nps_data(start_date: datetime = START_DATE, end_date: datetime = END_DATE,
+                      rng: Optional[np.random.Generator] = None) -> pd.DataFrame:
+    """Generate Net Promoter Score data, one row per month end in the date range"""
     print("Generating NPS data...")
+    rng = rng if rng is not None else dataset_rng('nps')
     
     # Generate monthly NPS scores
-    months = pd.date_range(start=START_DATE, end=END_DATE, freq='M')
+    months = pd.date_range(start=start_date, end=end_date, freq='ME')
     
     nps_data = []
     base_nps = 55  # Starting NPS score
     
     for month in months:
         # NPS tends to improve over time with some volatility
-        nps_change = np.random.normal(1, 8)  # Monthly change
+        nps_change = rng.normal(1, 8)  # Monthly change
         base_nps += nps_change
         
         # Keep NPS in realistic range
         current_nps = max(0, min(100, base_nps))
         
         # Generate individual responses
-        num_responses = np.random.randint(80, 150)
+        num_responses = rng.integers(80, 150)
         
         # Calculate promoters, passives, detractors based on NPS
         promoter_rate = (current_nps + 100) / 200  # Rough conversion
@@ -280,11 +525,18 @@ def generate_nps_data() -> pd.DataFrame:
         })
     
     df = pd.DataFrame(nps_data)
-    return df
+    return schema.apply_schema(df, 'nps')
+
+def generate_feedback_data(reference_time: Optional[datetime] = None, days: int = 90, per_day: float = 2.0,
+                           rng: Optional[np.random.Generator] = None) -> pd.DataFrame:
+    """Generate customer feedback data dated back from ``reference_time`` (default: now)
 
-def generate_feedback_data() -> pd.DataFrame:
-    """Generate customer feedback data"""
+    Covers the last ``days`` days with a Poisson(``per_day``) number of
+    entries per day, all drawn in bulk, newest first.
+    """
     print("Generating feedback data...")
+    rng = rng if rng is not None else dataset_rng('feedback')
+    reference_time = reference_time if reference_time is not None else datetime.now()
     
     feedback_texts = [
         "OK",
@@ -309,41 +561,32 @@ def generate_feedback_data() -> pd.DataFrame:
         "Impressed with the service"
     ]
     
-    feedback_data = []
+    # Random number of feedback entries per day, newest day first
+    days_ago = np.repeat(np.arange(days), rng.poisson(per_day, size=days))
     
-    # Generate feedback over the past few months
-    for days_ago in range(0, 90):
-        # Random number of feedback entries per day
-        num_feedback = np.random.poisson(2)  # Average 2 feedback per day
-        
-        for _ in range(num_feedback):
-            feedback_date = datetime.now() - timedelta(days=days_ago)
-            
-            # Random rating (1-5 stars) with bias toward higher ratings
-            rating = np.random.choice([1, 2, 3, 4, 5], p=[0.05, 0.1, 0.2, 0.35, 0.3])
-            
-            feedback_data.append({
-                'date': feedback_date,
-                'feedback_text': random.choice(feedback_texts),
-                'rating': rating,
-                'days_ago': days_ago,
-                'sentiment': 'positive' if rating >= 4 else 'negative' if rating <= 2 else 'neutral'
-            })
+    # Random rating (1-5 stars) with bias toward higher ratings
+    ratings = rng.choice([1, 2, 3, 4, 5], size=len(days_ago), p=[0.05, 0.1, 0.2, 0.35, 0.3])
+    text_index = rng.integers(len(feedback_texts), size=len(days_ago))
     
-    df = pd.DataFrame(feedback_data)
-    df = df.sort_values('date', ascending=False).reset_index(drop=True)
+    df = pd.DataFrame({
+        'date': np.datetime64(reference_time, 'ns') - days_ago.astype('timedelta64[D]'),
+        'feedback_text': pd.Categorical.from_codes(text_index, feedback_texts),
+        'rating': ratings,
+        'days_ago': days_ago,
+        'sentiment': np.select([ratings >= 4, ratings <= 2], ['positive', 'negative'], 'neutral')
+    })
     
-    return df
+    return schema.apply_schema(df, 'feedback')
 
-def generate_geographic_data() -> pd.DataFrame:
+def generate_geographic_data(total_active_users: int = 15000,
+                             rng: Optional[np.random.Generator] = None) -> pd.DataFrame:
     """Generate geographic data for active users map"""
     print("Generating geographic data...")
+    rng = rng if rng is not None else dataset_rng('geo')
     
     geo_data = []
     
     # Generate active user locations based on population weights
-    total_active_users = 15000
-    
     for state_code, state_info in US_STATES.items():
         # Number of users in this state based on population weight
         num_users = int(total_active_users * state_info['pop_weight'])
@@ -352,18 +595,18 @@ def generate_geographic_data() -> pd.DataFrame:
             # Generate random locations within the state (simplified)
             for _ in range(max(1, num_users // 100)):  # Cluster users into ~100 user groups
                 # Add some randomness to coordinates
-                lat_offset = np.random.normal(0, 1.0)
-                lon_offset = np.random.normal(0, 1.0)
+                lat_offset = rng.normal(0, 1.0)
+                lon_offset = rng.normal(0, 1.0)
                 
                 geo_data.append({
                     'state': state_code,
                     'state_name': state_info['name'],
                     'lat': state_info['lat'] + lat_offset,
                     'lon': state_info['lon'] + lon_offset,
-                    'user_count': np.random.randint(50, 200),
-                    'active_sessions': np.random.randint(5, 50),
-                    'avg_session_duration': np.random.normal(5.5, 2.0),  # minutes
-                    'bounce_rate': np.random.normal(0.35, 0.15)
+                    'user_count': rng.integers(50, 200),
+                    'active_sessions': rng.integers(5, 50),
+                    'avg_session_duration': rng.normal(5.5, 2.0),  # minutes
+                    'bounce_rate': rng.normal(0.35, 0.15)
                 })
     
     df = pd.DataFrame(geo_data)
@@ -372,157 +615,173 @@ def generate_geographic_data() -> pd.DataFrame:
     df['avg_session_duration'] = df['avg_session_duration'].clip(1, 15)
     df['bounce_rate'] = df['bounce_rate'].clip(0.1, 0.8)
     
-    return df
+    return schema.apply_schema(df, 'geo')
+
+def _scale_user_counts(geo_df: pd.DataFrame, total_active_users: int) -> np.ndarray:
+    """Distribute exactly ``total_active_users`` across cluster rows
 
-def generate_individual_user_coordinates():
-    """Generate individual user coordinates based on geographic data for map visualization"""
+    Each state receives its ``US_STATES`` population weight share, split
+    between that state's clusters in proportion to their ``user_count``.
+    Rounding leftovers go to the rows with the largest remainders.
+    """
+    pop_weight = geo_df['state'].astype(object).map({code: info['pop_weight'] for code, info in US_STATES.items()})
+    state_totals = geo_df.groupby('state', observed=True)['user_count'].transform('sum')
+    row_weight = (pop_weight * geo_df['user_count'] / state_totals).to_numpy(dtype=np.float64)
+    
+    exact = total_active_users * row_weight / row_weight.sum()
+    counts = np.floor(exact).astype(np.int64)
+    leftover = int(total_active_users - counts.sum())
+    if leftover > 0:
+        counts[np.argsort(counts - exact, kind='stable')[:leftover]] += 1
+    return counts
+
+def _cluster_user_counts(geo_df: pd.DataFrame, total_active_users: Optional[int]) -> np.ndarray:
+    """Users per cluster row, either as generated or rescaled to the requested total"""
+    if total_active_users is None:
+        return geo_df['user_count'].to_numpy(dtype=np.int64)
+    return _scale_user_counts(geo_df, total_active_users)
+
+def _user_coords_frame(geo_df: pd.DataFrame, row_index: np.ndarray, offsets: np.ndarray,
+                       first_id: int = 1) -> pd.DataFrame:
+    """User rows for the given cluster rows and (lat, lon) offsets"""
+    user_lat = geo_df['lat'].to_numpy()[row_index] + offsets[:, 0]
+    user_lon = geo_df['lon'].to_numpy()[row_index] + offsets[:, 1]
+    
+    # Keep within reasonable US bounds
+    np.clip(user_lat, *schema.US_LAT_BOUNDS, out=user_lat)
+    np.clip(user_lon, *schema.US_LON_BOUNDS, out=user_lon)
+    
+    df = pd.DataFrame({
+        'user_id': np.arange(first_id, first_id + len(row_index)),
+        'lat': user_lat,
+        'lon': user_lon,
+        'state': geo_df['state'].to_numpy()[row_index],
+        'state_name': geo_df['state_name'].to_numpy()[row_index]
+    })
+    return schema.apply_schema(df, 'user_coords')
+
+def generate_individual_user_coordinates(geo_df: Optional[pd.DataFrame] = None,
+                                         total_active_users: Optional[int] = None,
+                                         rng: Optional[np.random.Generator] = None) -> pd.DataFrame:
+    """Generate individual user coordinates based on geographic data for map visualization
+
+    ``geo_df`` is the frame from ``generate_geographic_data``; when omitted
+    the saved geographic_data.csv is read instead.
+    """
     print("Generating individual user coordinates...")
+    rng = rng if rng is not None else dataset_rng('user_coords')
+    geo_df = geo_df if geo_df is not None else _load_dataset('geo')
     
-    # Read the geographic data
-    geo_df = pd.read_csv(f'{DATA_DIR}/geographic_data.csv')
+    # Expand every cluster row into one entry per user
+    user_counts = _cluster_user_counts(geo_df, total_active_users)
+    row_index = np.repeat(np.arange(len(geo_df)), user_counts)
+    num_users = len(row_index)
     
-    user_points = []
-    user_id = 1
+    # Add much more variation for rural spread (~165km, within ~200km radius),
+    # drawn as (lat, lon) pairs per user
+    offsets = rng.normal(0, 1.5, size=(num_users, 2))
     
-    np.random.seed(42)  # For reproducible results
+    user_coords_df = _user_coords_frame(geo_df, row_index, offsets)
     
-    for _, row in geo_df.iterrows():
-        state = row['state']
-        state_name = row['state_name']
-        base_lat = row['lat']
-        base_lon = row['lon']
-        user_count = row['user_count']
-        
-        # Generate individual users for this state/region
-        for i in range(user_count):
-            # Add much more variation for rural spread (within ~200km radius)
-            lat_offset = np.random.normal(0, 1.5)  # ~165km variation for rural areas
-            lon_offset = np.random.normal(0, 1.5)  # ~165km variation for rural areas
-            
-            user_lat = base_lat + lat_offset
-            user_lon = base_lon + lon_offset
-            
-            # Keep within reasonable US bounds
-            user_lat = np.clip(user_lat, 25.0, 49.0)
-            user_lon = np.clip(user_lon, -125.0, -66.0)
-            
-            user_points.append({
-                'user_id': user_id,
-                'lat': user_lat,
-                'lon': user_lon,
-                'state': state,
-                'state_name': state_name
-            })
-            user_id += 1
-    
-    # Create DataFrame and save as CSV
-    user_coords_df = pd.DataFrame(user_points)
-    user_coords_df.to_csv(f'{DATA_DIR}/user_coordinates.csv', index=False)
-    
-    print(f"Generated {len(user_points)} individual user coordinates")
+    print(f"Generated {num_users} individual user coordinates")
     return user_coords_df
 
-def save_data_files():
-    """Save all generated data to CSV and NPY files"""
-    print("Saving data files...")
+def stream_individual_user_coordinates(chunk_rows: int, geo_df: Optional[pd.DataFrame] = None,
+                                       total_active_users: Optional[int] = None,
+                                       rng: Optional[np.random.Generator] = None) -> Tuple[int, Iterator[pd.DataFrame]]:
+    """User coordinates as (total rows, iterator of chunks); rows match ``generate_individual_user_coordinates``"""
+    rng = rng if rng is not None else dataset_rng('user_coords')
+    geo_df = geo_df if geo_df is not None else _load_dataset('geo')
+    row_ends = np.cumsum(_cluster_user_counts(geo_df, total_active_users))
+    num_users = int(row_ends[-1]) if len(row_ends) else 0
     
-    # Generate all datasets
-    sales_df = generate_sales_data()
-    deals_df = generate_deals_data()
-    social_df = generate_social_media_data()
-    website_df = generate_website_analytics()
-    nps_df = generate_nps_data()
-    feedback_df = generate_feedback_data()
-    geo_df = generate_geographic_data()
-    
-    # Generate individual user coordinates based on geographic data
-    user_coords_df = generate_individual_user_coordinates()
-    
-    # Save as CSV files
-    sales_df.to_csv(f'{DATA_DIR}/sales_data.csv', index=False)
-    deals_df.to_csv(f'{DATA_DIR}/deals_data.csv', index=False)
-    social_df.to_csv(f'{DATA_DIR}/social_media_data.csv', index=False)
-    website_df.to_csv(f'{DATA_DIR}/website_analytics.csv', index=False)
-    nps_df.to_csv(f'{DATA_DIR}/nps_data.csv', index=False)
-    feedback_df.to_csv(f'{DATA_DIR}/feedback_data.csv', index=False)
-    geo_df.to_csv(f'{DATA_DIR}/geographic_data.csv', index=False)
-    
-    # Save as NPY files (for numerical data)
-    np.save(f'{DATA_DIR}/sales_amounts.npy', sales_df['daily_sales'].values)
-    np.save(f'{DATA_DIR}/deal_amounts.npy', deals_df['amount'].values)
-    np.save(f'{DATA_DIR}/social_followers.npy', 
-            np.column_stack([social_df['linkedin_followers'].values, 
-                           social_df['twitter_followers'].values]))
-    np.save(f'{DATA_DIR}/website_metrics.npy', 
-            np.column_stack([website_df['daily_users'].values, 
-                           website_df['daily_enquiries'].values]))
-    np.save(f'{DATA_DIR}/nps_scores.npy', nps_df['nps_score'].values)
-    np.save(f'{DATA_DIR}/geo_coordinates.npy', 
-            np.column_stack([geo_df['lat'].values, geo_df['lon'].values]))
-    
-    print(f"Data files saved to {DATA_DIR}/ directory")
-    print("CSV files created:")
-    print("- sales_data.csv")
-    print("- deals_data.csv") 
-    print("- social_media_data.csv")
-    print("- website_analytics.csv")
-    print("- nps_data.csv")
-    print("- feedback_data.csv")
-    print("- geographic_data.csv")
-    print("- user_coordinates.csv")
-    print("\nNPY files created:")
-    print("- sales_amounts.npy")
-    print("- deal_amounts.npy")
-    print("- social_followers.npy")
-    print("- website_metrics.npy")
-    print("- nps_scores.npy")
-    print("- geo_coordinates.npy")
-
-def generate_summary_stats():
-    """Generate summary statistics that match the dashboard"""
-    print("\nGenerating summary statistics...")
+    def chunks():
+        print("Generating individual user coordinates (streaming)...")
+        for first in range(0, num_users, chunk_rows):
+            users = np.arange(first, min(first + chunk_rows, num_users))
+            row_index = np.searchsorted(row_ends, users, side='right')
+            offsets = rng.normal(0, 1.5, size=(len(users), 2))
+            yield _user_coords_frame(geo_df, row_index, offsets, first_id=first + 1)
+        print(f"Generated {num_users} individual user coordinates")
     
-    # Load the data we just created
-    deals_df = pd.read_csv(f'{DATA_DIR}/deals_data.csv')
-    social_df = pd.read_csv(f'{DATA_DIR}/social_media_data.csv')
-    website_df = pd.read_csv(f'{DATA_DIR}/website_analytics.csv')
-    nps_df = pd.read_csv(f'{DATA_DIR}/nps_data.csv')
+    return num_users, chunks()
+
+# Generators that do not depend on each other, keyed by their RNG stream name
+INDEPENDENT_GENERATORS = {
+    'sales': generate_sales_data,
+    'deals': generate_deals_data,
+    'social': generate_social_media_data,
+    'website': generate_website_analytics,
+    'nps': generate_nps_data,
+    'feedback': generate_feedback_data,
+    'geo': generate_geographic_data,
+}
+
+def _run_generator(name: str, kwargs: Dict) -> pd.DataFrame:
+    """Run one registered generator on its own RNG stream (process pool entry point)"""
+    return INDEPENDENT_GENERATORS[name](rng=dataset_rng(name), **kwargs)
+
+def generate_independent_datasets(params: Optional[Dict[str, Dict]] = None,
+                                  max_workers: Optional[int] = None) -> Dict[str, pd.DataFrame]:
+    """Run the independent generators named in ``params`` in a process pool
+
+    Each generator owns a fixed RNG stream and receives all of its inputs
+    (including any reference time) from ``params``, so results are
+    identical for any worker count or order. ``max_workers=1`` runs
+    everything in this process.
+    """
+    jobs = params if params is not None else default_generator_params()
+    jobs = {name: kwargs for name, kwargs in jobs.items() if name in INDEPENDENT_GENERATORS}
     
-    # Calculate current month statistics
-    current_month = datetime.now().month
-    this_month_deals = deals_df[deals_df['month'] == current_month]
+    if max_workers == 1 or len(jobs) <= 1:
+        return {name: _run_generator(name, kwargs) for name, kwargs in jobs.items()}
     
-    # Top deals this month
-    top_deals = this_month_deals.nlargest(10, 'amount')
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {name: pool.submit(_run_generator, name, kwargs) for name, kwargs in jobs.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+def generate_summary_stats(frames: Optional[Dict[str, pd.DataFrame]] = None,
+                           reference_time: Optional[datetime] = None) -> Dict:
+    """Generate summary statistics that match the dashboard
+
+    ``frames`` holds the sales, deals, social, website and NPS frames handed
+    over by the pipeline; any that are missing are read from the saved CSVs.
+    The frames are only read, never modified. Figures are the dashboard's
+    KPIs (see kpi.py), taken as of the last date in the data (but not after
+    ``reference_time``).
+    """
+    print("\nGenerating summary statistics...")
+    reference_time = reference_time if reference_time is not None else datetime.now()
+    frames = frames if frames is not None else {}
     
-    # Current social media followers (latest values)
-    latest_social = social_df.iloc[-1]
+    loaded = {name: frames[name] if name in frames else _load_dataset(name)
+              for name in ('sales', 'deals', 'social', 'website', 'nps')}
+    series = kpi.series_from_frames({spec['frame']: loaded[spec['dataset']] for spec in kpi.SERIES.values()})
+    anchor = min(kpi.latest_date(series), np.datetime64(reference_time, 'D'))
+    metrics = kpi.compute(series, anchor)
     
-    # Website stats for past 7 days
-    website_df['date'] = pd.to_datetime(website_df['date'])
-    past_7_days = website_df[website_df['date'] >= (datetime.now() - timedelta(days=7))]
+    # Top deals for the latest month with deals
+    deals_df = loaded['deals']
+    deals_anchor = min(deals_df['date'].max(), pd.Timestamp(reference_time)) if len(deals_df) else reference_time
+    this_month_deals = deals_df[(deals_df['year'] == deals_anchor.year) & (deals_df['month'] == deals_anchor.month)]
+    top_deals = this_month_deals.nlargest(10, 'amount')
     
-    # Current NPS score
-    latest_nps = nps_df.iloc[-1]
+    def thousands(value: Optional[float]) -> Optional[float]:
+        return None if value is None else round(value / 1000, 1)
     
     # Create summary dictionary
     summary = {
-        'sales_this_month': round(this_month_deals['amount'].sum() / 1000, 1),  # in thousands
-        'sales_today': round(np.random.normal(9600, 1000), 1),
-        'sales_yesterday': round(np.random.normal(20600, 2000), 1),
-        'linkedin_followers': f"{latest_social['linkedin_followers'] / 1000:.1f}k",
-        'twitter_followers': f"{latest_social['twitter_followers'] / 1000:.1f}k",
-        'website_users_7days': f"{past_7_days['daily_users'].sum() / 1000:.1f}k",
-        'website_enquiries_7days': past_7_days['daily_enquiries'].sum(),
-        'current_nps': round(latest_nps['nps_score']),
+        'sales_this_month': thousands(metrics['total_sales']),
+        'sales_today': thousands(metrics['today_sales']),
+        'sales_yesterday': thousands(metrics['yesterday_sales']),
+        'linkedin_followers': f"{thousands(metrics['linkedin_followers'])}k",
+        'twitter_followers': f"{thousands(metrics['twitter_followers'])}k",
+        'website_users_7days': f"{thousands(metrics['website_users'])}k",
+        'website_enquiries_7days': metrics['website_enquiries'],
+        'current_nps': metrics['nps_score'],
         'top_deals_this_month': top_deals[['sales_rep', 'amount']].head(10).to_dict('records')
     }
     
-    # Save summary
-    import json
-    with open(f'{DATA_DIR}/dashboard_summary.json', 'w') as f:
-        json.dump(summary, f, indent=2)
-    
     print("Dashboard Summary:")
     print(f"Sales this month: ${summary['sales_this_month']}k")
     print(f"Sales today: ${summary['sales_today']}k")
@@ -533,20 +792,499 @@ def generate_summary_stats():
     print(f"Website enquiries (7 days): {summary['website_enquiries_7days']}")
     print(f"Current NPS: {summary['current_nps']}")
     print(f"Top deals this month: {len(summary['top_deals_this_month'])} deals")
+    return summary
+
+def generate_rollups(frames: Optional[Dict[str, pd.DataFrame]] = None) -> Dict[str, pd.DataFrame]:
+    """Build day, week, month, quarter and year rollups of the dashboard metrics (see rollup.py)
+
+    Like the summary, ``frames`` holds the source frames handed over by the
+    pipeline; any that are missing are read back from disk.
+    """
+    print("\nBuilding calendar rollups...")
+    frames = frames if frames is not None else {}
+    sources = {spec['dataset'] for spec in rollup.ROLLUPS.values()}
+    rollups = rollup.build_rollups({name: frames[name] if name in frames else _load_dataset(name)
+                                    for name in sorted(sources)})
+    print(f"Rollups: {len(rollups)} tables, {sum(len(df) for df in rollups.values()):,} rows")
+    return rollups
+
+# Dataset dependency graph: the files each dataset writes and the datasets it
+# reads (column types live in schema.py). Each table is written both as CSV
+# and as a typed columnar store (.cols directory).
+DATASETS = {
+    'sales': {'outputs': ['sales_data.csv', 'sales_data.cols', 'sales_amounts.npy'], 'deps': []},
+    'deals': {'outputs': ['deals_data.csv', 'deals_data.cols', 'deal_amounts.npy', dealparts.PARTITION_DIR],
+              'deps': []},
+    'social': {'outputs': ['social_media_data.csv', 'social_media_data.cols', 'social_followers.npy'], 'deps': []},
+    'website': {'outputs': ['website_analytics.csv', 'website_analytics.cols', 'website_metrics.npy'], 'deps': []},
+    'nps': {'outputs': ['nps_data.csv', 'nps_data.cols', 'nps_scores.npy'], 'deps': []},
+    'feedback': {'outputs': ['feedback_data.csv', 'feedback_data.cols', 'feedback_data.fidx'], 'deps': []},
+    'geo': {'outputs': ['geographic_data.csv', 'geographic_data.cols', 'geo_coordinates.npy'], 'deps': []},
+    'user_coords': {'outputs': ['user_coordinates.csv', 'user_coordinates.cols', 'user_coordinates.npy',
+                                'user_coordinates.qcoords', 'user_coordinates.sidx'], 'deps': ['geo']},
+    'summary': {'outputs': ['dashboard_summary.json'], 'deps': ['sales', 'deals', 'social', 'website', 'nps']},
+    'rollups': {'outputs': [rollup.ROLLUP_DIR], 'deps': ['sales', 'deals', 'social', 'website', 'nps']},
+}
+
+# NPY exports (for numerical data): the columns stacked into each array and the
+# index columns saved next to it, so every array can be used on its own
+NPY_EXPORTS = {
+    'sales_amounts.npy': {'columns': ['daily_sales'], 'index': ['date']},
+    'deal_amounts.npy': {'columns': ['amount'], 'index': ['date']},
+    'social_followers.npy': {'columns': ['linkedin_followers', 'twitter_followers'], 'index': ['date']},
+    'website_metrics.npy': {'columns': ['daily_users', 'daily_enquiries'], 'index': ['date']},
+    'nps_scores.npy': {'columns': ['nps_score'], 'index': ['month']},
+    'geo_coordinates.npy': {'columns': ['lat', 'lon'], 'index': ['state'], 'labels': {'state': 'state_name'}},
+    'user_coordinates.npy': {'columns': ['lat', 'lon'], 'index': ['user_id', 'state'], 'labels': {'state': 'state_name'}},
+}
+
+# Packed user coordinates (16-bit fixed point over the US bounds, see coordpack.py)
+PACKED_COORDS_FILE = 'user_coordinates.qcoords'
+
+# Search index over the feedback texts, ratings and sentiments (see feedindex.py)
+FEEDBACK_INDEX_DIR = 'feedback_data.fidx'
+
+# Spatial index over the user coordinates, built from their NPY export (see spatial.py)
+SPATIAL_INDEX_DIR = 'user_coordinates.sidx'
+SPATIAL_INDEX_SOURCE = 'user_coordinates.npy'
+
+ALL_GENERATORS = {
+    **INDEPENDENT_GENERATORS,
+    'user_coords': generate_individual_user_coordinates,
+    'summary': generate_summary_stats,
+    'rollups': generate_rollups,
+}
+
+MANIFEST_FILE = ".build_manifest.json"
+
+def default_generator_params(start_date: datetime = START_DATE, end_date: datetime = END_DATE,
+                             n_series: int = 1, total_active_users: Optional[int] = None,
+                             deals_per_month: Tuple[int, int] = (15, 35), feedback_days: int = 90,
+                             feedback_per_day: float = 2.0) -> Dict[str, Dict]:
+    """Keyword arguments for every generator, used both to run and to fingerprint them
+
+    Time-dependent datasets are anchored to the start of today so they are
+    rebuilt at most once a day.
+    """
+    today = datetime.combine(datetime.now().date(), datetime.min.time())
+    date_range = {'start_date': start_date, 'end_date': end_date}
+    return {
+        'sales': {**date_range, 'n_series': n_series},
+        'deals': {**date_range, 'deals_per_month': deals_per_month},
+        'social': {**date_range, 'n_series': n_series},
+        'website': {**date_range, 'n_series': n_series},
+        'nps': {**date_range},
+        'feedback': {'reference_time': today, 'days': feedback_days, 'per_day': feedback_per_day},
+        'geo': {} if total_active_users is None else {'total_active_users': total_active_users},
+        'user_coords': {'total_active_users': total_active_users},
+        'summary': {'reference_time': today},
+        'rollups': {},
+    }
+
+def dataset_levels() -> List[List[str]]:
+    """Group datasets into waves; every dataset comes after all of its dependencies"""
+    depth = {}
+    def resolve(name):
+        if name not in depth:
+            depth[name] = 1 + max((resolve(dep) for dep in DATASETS[name]['deps']), default=-1)
+        return depth[name]
+    for name in DATASETS:
+        resolve(name)
+    return [[name for name in DATASETS if depth[name] == level] for level in range(max(depth.values()) + 1)]
+
+def downstream_of(targets: List[str]) -> List[str]:
+    """Named datasets plus everything that depends on them, in dependency order"""
+    selected = set(targets)
+    for level in dataset_levels():
+        for name in level:
+            if any(dep in selected for dep in DATASETS[name]['deps']):
+                selected.add(name)
+    return [name for level in dataset_levels() for name in level if name in selected]
+
+def _file_hash(path: str) -> Optional[str]:
+    """SHA-256 of a file's content (or of every file in a directory), or None if it does not exist
+
+    NPY exports are hashed together with their index and description sidecars.
+    """
+    if not os.path.exists(path):
+        return None
+    if os.path.isdir(path):
+        files = [os.path.join(path, name) for name in sorted(os.listdir(path))]
+    elif path.endswith('.npy'):
+        files = colstore.array_files(path)
+    else:
+        files = [path]
+    digest = hashlib.sha256()
+    for file_path in files:
+        digest.update(os.path.basename(file_path).encode('utf-8'))
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+def _code_dependencies(function, found: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Source of a function and of every module-level function and setting it uses, directly or through others
+
+    Names are read from the compiled code (nested functions included), so
+    editing a helper or a constant such as REP_DEAL_TIERS changes the result.
+    DATA_DIR is left out: it says where outputs go, not what they hold.
+    """
+    found = {} if found is None else found
+    found[function.__name__] = inspect.getsource(function)
+    codes = [function.__code__]
+    while codes:
+        code = codes.pop()
+        codes.extend(const for const in code.co_consts if inspect.iscode(const))
+        for name in code.co_names:
+            value = function.__globals__.get(name)
+            if name in found or name == 'DATA_DIR' or value is None:
+                continue
+            if inspect.isfunction(value):
+                _code_dependencies(value, found)
+            elif isinstance(value, (bool, int, float, str, tuple, list, dict, datetime)):
+                found[name] = repr(value)
+    return found
+
+def _dataset_fingerprint(name: str, params: Dict, chunk_rows: Optional[int] = None) -> str:
+    """Hash of a dataset's generator code (with the helpers it calls), parameters, seed, column types and input file contents"""
+    streamed = bool(chunk_rows) and name in STREAM_GENERATORS
+    generators = [ALL_GENERATORS[name]] + ([STREAM_GENERATORS[name]] if streamed else [])
+    code = {}
+    for generator in generators:
+        _code_dependencies(generator, code)
+    input_hashes = {
+        output: _file_hash(os.path.join(DATA_DIR, output))
+        for dep in DATASETS[name]['deps'] for output in DATASETS[dep]['outputs']
+    }
+    payload = {
+        'generator': code,
+        'params': params,
+        'chunk_rows': chunk_rows if streamed else None,
+        'root_seed': ROOT_SEED,
+        'schema': schema.describe(name),
+        'inputs': input_hashes,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+def _load_manifest() -> Dict:
+    """Read the build manifest written by previous runs"""
+    path = os.path.join(DATA_DIR, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def _save_manifest(manifest: Dict):
+    """Write the build manifest"""
+    with open(os.path.join(DATA_DIR, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+def _is_up_to_date(name: str, fingerprint: str, manifest: Dict) -> bool:
+    """True if the last build used the same fingerprint and its outputs are untouched"""
+    entry = manifest.get(name)
+    if entry is None or entry.get('fingerprint') != fingerprint:
+        return False
+    return all(_file_hash(os.path.join(DATA_DIR, output)) == entry['outputs'].get(output)
+               for output in DATASETS[name]['outputs'])
+
+def _save_dataset(name: str, result):
+    """Write one generated dataset to its CSV, NPY and packed outputs (JSON for the summary, NPY arrays for the rollups)"""
+    if name == 'summary':
+        with open(os.path.join(DATA_DIR, 'dashboard_summary.json'), 'w') as f:
+            json.dump(result, f, indent=2)
+        return
+    if name == 'rollups':
+        rollup.write_rollups(result, os.path.join(DATA_DIR, rollup.ROLLUP_DIR))
+        return
+    csv_file, cols_dir, *extra_files = DATASETS[name]['outputs']
+    result.to_csv(os.path.join(DATA_DIR, csv_file), index=False)
+    colstore.write_table(result, os.path.join(DATA_DIR, cols_dir))
+    for npy_file in _npy_files(extra_files):
+        colstore.write_array(result, os.path.join(DATA_DIR, npy_file), **_npy_layout(result, npy_file))
+    if PACKED_COORDS_FILE in extra_files:
+        packed = _packed_coords_writer(len(result))
+        packed.append(result)
+        packed.close()
+    if dealparts.PARTITION_DIR in extra_files:
+        _deal_partitions_writer().add(result)
+    if FEEDBACK_INDEX_DIR in extra_files:
+        feedindex.build_index(result, os.path.join(DATA_DIR, FEEDBACK_INDEX_DIR))
+    if SPATIAL_INDEX_DIR in extra_files:
+        _build_spatial_index()
+
+def _load_dataset(name: str) -> pd.DataFrame:
+    """Read a previously saved dataset back, from its columnar store when present"""
+    csv_file, cols_dir = DATASETS[name]['outputs'][:2]
+    if colstore.exists(os.path.join(DATA_DIR, cols_dir)):
+        return schema.apply_schema(colstore.read_table(os.path.join(DATA_DIR, cols_dir)), name)
+    return pd.read_csv(os.path.join(DATA_DIR, csv_file), dtype=schema.csv_dtypes(name),
+                       parse_dates=schema.date_columns(name))
+
+# Chunked variants of the generators whose output grows with the scale options;
+# the remaining datasets are small and are written in one piece
+STREAM_GENERATORS = {
+    'sales': stream_sales_data,
+    'deals': stream_deals_data,
+    'social': stream_social_media_data,
+    'website': stream_website_analytics,
+    'user_coords': stream_individual_user_coordinates,
+}
+
+def _npy_files(outputs: List[str]) -> List[str]:
+    """The NPY exports among a dataset's outputs"""
+    return [output for output in outputs if output.endswith('.npy')]
+
+def _packed_coords_writer(total_rows: int) -> coordpack.CoordinateWriter:
+    """Writer for the packed user coordinates, with state codes in US_STATES order"""
+    return coordpack.CoordinateWriter(os.path.join(DATA_DIR, PACKED_COORDS_FILE), total_rows,
+                                      schema.US_LAT_BOUNDS, schema.US_LON_BOUNDS,
+                                      {code: info['name'] for code, info in US_STATES.items()})
+
+def _deal_partitions_writer() -> dealparts.PartitionWriter:
+    """Writer for the per-month deal partitions and their top deals sidecars, starting empty"""
+    return dealparts.PartitionWriter(os.path.join(DATA_DIR, dealparts.PARTITION_DIR), reset=True)
+
+def _build_spatial_index():
+    """Index the user coordinates NPY export (lat/lon values, state codes) for spatial queries"""
+    coords = colstore.open_array(os.path.join(DATA_DIR, SPATIAL_INDEX_SOURCE))
+    lat = coords['values'][:, coords['columns'].index('lat')]
+    lon = coords['values'][:, coords['columns'].index('lon')]
+    states = next(spec['categories'] for spec in coords['meta']['index'] if spec['name'] == 'state')
+    spatial.build_index(lat, lon, coords['index']['state'], states, os.path.join(DATA_DIR, SPATIAL_INDEX_DIR))
+
+def _npy_layout(df: pd.DataFrame, npy_file: str) -> Dict:
+    """Value and index columns for one NPY export; multi-series frames are also indexed by unit"""
+    spec = NPY_EXPORTS[npy_file]
+    index = (['unit_id'] if 'unit_id' in df.columns else []) + spec['index']
+    return {'columns': spec['columns'], 'index': index, 'labels': spec.get('labels')}
+
+def _empty_frame(name: str) -> pd.DataFrame:
+    """Dataset with no rows but its schema's columns and types (single-series layout, without unit_id)"""
+    return pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in schema.SCHEMAS[name].items()
+                         if column != 'unit_id'})
+
+def _stream_dataset(name: str, total_rows: int, chunks: Iterator[pd.DataFrame]) -> int:
+    """Append chunks to the dataset's CSV and columnar store and copy their numeric columns into preallocated NPY memmaps
+
+    Each NPY file is allocated at full size up front; every chunk maps
+    only its own row window, so peak memory stays at about one chunk no
+    matter how many rows are written.
+    """
+    csv_file, cols_dir, *extra_files = DATASETS[name]['outputs']
+    table = colstore.TableWriter(os.path.join(DATA_DIR, cols_dir), total_rows)
+    packed = _packed_coords_writer(total_rows) if PACKED_COORDS_FILE in extra_files else None
+    partitions = _deal_partitions_writer() if dealparts.PARTITION_DIR in extra_files else None
+    arrays = {}
+    rows_written = 0
+    chunks_written = 0
+    
+    with open(os.path.join(DATA_DIR, csv_file), 'w', newline='') as f:
+        def write(chunk):
+            chunk.to_csv(f, header=(chunks_written == 0), index=False)
+            table.append(chunk)
+            if packed is not None:
+                packed.append(chunk)
+            if partitions is not None:
+                partitions.add(chunk)
+            for npy_file in _npy_files(extra_files):
+                if npy_file not in arrays:
+                    arrays[npy_file] = colstore.ArrayWriter(os.path.join(DATA_DIR, npy_file), total_rows,
+                                                            **_npy_layout(chunk, npy_file))
+                arrays[npy_file].append(chunk)
+        
+        for chunk in chunks:
+            write(chunk)
+            chunks_written += 1
+            rows_written += len(chunk)
+        
+        # No chunks: write an empty frame, so every output exists with its columns (the CSV with its header)
+        if chunks_written == 0:
+            write(_empty_frame(name))
+    table.close()
+    for array in arrays.values():
+        array.close()
+    if packed is not None:
+        packed.close()
+    
+    if rows_written != total_rows:
+        raise RuntimeError(f"{name}: expected {total_rows} rows but the stream produced {rows_written}")
+    if SPATIAL_INDEX_DIR in extra_files:
+        _build_spatial_index()
+    return rows_written
+
+def _run_stream_generator(name: str, kwargs: Dict, chunk_rows: int) -> int:
+    """Stream one dataset straight to disk on its own RNG stream (process pool entry point)"""
+    total_rows, chunks = STREAM_GENERATORS[name](chunk_rows, rng=dataset_rng(name), **kwargs)
+    return _stream_dataset(name, total_rows, chunks)
+
+def _stream_datasets(params: Dict[str, Dict], chunk_rows: int, max_workers: Optional[int] = None):
+    """Stream the datasets named in ``params`` to disk, in a process pool when there are several"""
+    if max_workers == 1 or len(params) <= 1:
+        for name, kwargs in params.items():
+            _run_stream_generator(name, kwargs, chunk_rows)
+        return
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(_run_stream_generator, name, kwargs, chunk_rows) for name, kwargs in params.items()]
+        for future in futures:
+            future.result()
+
+def save_data_files(targets: Optional[List[str]] = None, force: bool = False,
+                    max_workers: Optional[int] = None, params: Optional[Dict[str, Dict]] = None,
+                    chunk_rows: Optional[int] = None) -> List[str]:
+    """Regenerate the named datasets (default: all) and everything downstream of them
+
+    Targets whose fingerprint matches the manifest and whose outputs are
+    untouched are skipped unless ``force`` is set. Missing upstream outputs
+    are built as well. With ``chunk_rows`` set, the large datasets are
+    streamed to disk in chunks instead of being built in memory. Returns
+    the datasets that were rebuilt.
+
+    Stages hand their frames to downstream stages in memory; files are
+    written on a background thread and only read back for upstream
+    datasets that were not rebuilt in this run (or were streamed).
+    """
+    print("Saving data files...")
+    params = params if params is not None else default_generator_params()
+    selected = set(downstream_of(targets if targets else list(DATASETS)))
+    manifest = _load_manifest()
+    results = {}
+    rebuilt = []
+    
+    with ThreadPoolExecutor(max_workers=2) as writer:
+        writes = []
+        for level in dataset_levels():
+            stale = []
+            for name in level:
+                missing = any(not os.path.exists(os.path.join(DATA_DIR, output)) for output in DATASETS[name]['outputs'])
+                needed = name in selected or (missing and any(name in DATASETS[other]['deps'] for other in selected))
+                if not needed:
+                    continue
+                # A rebuilt upstream means new inputs; its files may still be in flight
+                if force or any(dep in rebuilt for dep in DATASETS[name]['deps']):
+                    stale.append(name)
+                elif _is_up_to_date(name, _dataset_fingerprint(name, params[name], chunk_rows), manifest):
+                    print(f"- {name}: up to date, skipped")
+                else:
+                    stale.append(name)
+            
+            streamed = [name for name in stale if chunk_rows and name in STREAM_GENERATORS]
+            stream_jobs = {name: dict(params[name]) for name in streamed}
+            if 'user_coords' in stream_jobs and 'geo' in results:
+                stream_jobs['user_coords']['geo_df'] = results['geo']
+            _stream_datasets(stream_jobs, chunk_rows, max_workers)
+            
+            in_memory = {name: params[name] for name in stale if name not in streamed}
+            results.update(generate_independent_datasets(in_memory, max_workers=max_workers))
+            if 'user_coords' in in_memory:
+                results['user_coords'] = generate_individual_user_coordinates(
+                    geo_df=results.get('geo'), rng=dataset_rng('user_coords'), **params['user_coords'])
+            if 'summary' in in_memory:
+                results['summary'] = generate_summary_stats(frames=results, **params['summary'])
+            if 'rollups' in in_memory:
+                results['rollups'] = generate_rollups(frames=results, **params['rollups'])
+            
+            for name in stale:
+                if name not in streamed:
+                    writes.append(writer.submit(_save_dataset, name, results[name]))
+                rebuilt.append(name)
+        
+        for write in writes:
+            write.result()
+    
+    # Fingerprints read upstream files, so record them once everything is on disk
+    for name in rebuilt:
+        manifest[name] = {
+            'fingerprint': _dataset_fingerprint(name, params[name], chunk_rows),
+            'outputs': {output: _file_hash(os.path.join(DATA_DIR, output)) for output in DATASETS[name]['outputs']},
+        }
+        print(f"- {name}: wrote {', '.join(DATASETS[name]['outputs'])}")
+    _save_manifest(manifest)
+    
+    print(f"Data files saved to {DATA_DIR}/ directory ({len(rebuilt)} rebuilt)")
+    return rebuilt
+
+def save_sqlite_store() -> List[str]:
+    """Load every dataset whose table is missing or older than its last build into the SQLite store
+
+    Returns the datasets whose tables were (re)loaded.
+    """
+    manifest = _load_manifest()
+    conn = sqlstore.connect(os.path.join(DATA_DIR, sqlstore.DB_FILE), create=True)
+    stored = sqlstore.stored_fingerprints(conn)
+    loaded = []
+    try:
+        for name in DATASETS:
+            if name in ('summary', 'rollups'):
+                continue
+            fingerprint = manifest.get(name, {}).get('fingerprint')
+            if fingerprint is not None and stored.get(name) == fingerprint:
+                continue
+            sqlstore.write_dataset(conn, name, _load_dataset(name), fingerprint)
+            for (table, date_column), columns in kpi.store_tables().items():
+                if table == name:
+                    sqlstore.write_daily_sums(conn, table, date_column, columns)
+            loaded.append(name)
+    finally:
+        conn.close()
+    print(f"SQLite store {DATA_DIR}/{sqlstore.DB_FILE}: {len(loaded)} table(s) loaded"
+          + (f" ({', '.join(loaded)})" if loaded else ""))
+    return loaded
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Command line options for selective regeneration"""
+    parser = argparse.ArgumentParser(description="Generate business dashboard datasets")
+    parser.add_argument('targets', nargs='*', metavar='DATASET',
+                        help=f"datasets to regenerate along with everything downstream (default: all of {', '.join(DATASETS)})")
+    parser.add_argument('--force', action='store_true', help="rebuild even if inputs and parameters are unchanged")
+    parser.add_argument('--workers', type=int, default=None, help="process pool size (1 runs serially)")
+    parser.add_argument('--start-date', type=datetime.fromisoformat, default=START_DATE, help="first day of daily data")
+    parser.add_argument('--end-date', type=datetime.fromisoformat, default=END_DATE, help="last day of daily data")
+    parser.add_argument('--series', type=int, default=1, help="number of business units for daily series")
+    parser.add_argument('--users', type=int, default=None, help="total active users for the coordinate map")
+    parser.add_argument('--deals-per-month', type=int, nargs=2, default=(15, 35), metavar=('MIN', 'MAX'),
+                        help="range for the number of deals per month")
+    parser.add_argument('--feedback-days', type=int, default=90, help="days of feedback history")
+    parser.add_argument('--feedback-per-day', type=float, default=2.0, help="mean feedback entries per day")
+    parser.add_argument('--chunk-rows', type=int, default=None,
+                        help="stream large datasets to disk in chunks of this many rows (bounded memory)")
+    parser.add_argument('--sqlite', action='store_true',
+                        help=f"also load the datasets into an indexed SQLite store ({sqlstore.DB_FILE})")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.targets if name not in DATASETS]
+    if unknown:
+        parser.error(f"unknown dataset(s): {', '.join(unknown)}")
+    return args
 
 if __name__ == "__main__":
+    args = parse_args()
+    
     print("🚀 Starting Business Dashboard Data Generation")
     print("=" * 50)
     
     # Create data directory
     create_data_directory()
     
-    # Generate and save all data
-    save_data_files()
+    # Generate and save the requested datasets (summary statistics included)
+    save_data_files(
+        targets=args.targets,
+        force=args.force,
+        max_workers=args.workers,
+        chunk_rows=args.chunk_rows,
+        params=default_generator_params(
+            start_date=args.start_date,
+            end_date=args.end_date,
+            n_series=args.series,
+            total_active_users=args.users,
+            deals_per_month=tuple(args.deals_per_month),
+            feedback_days=args.feedback_days,
+            feedback_per_day=args.feedback_per_day
+        )
+    )
     
-    # Generate summary statistics
-    generate_summary_stats()
+    # Refresh the optional SQLite store from the files just written
+    if args.sqlite:
+        save_sqlite_store()
     
     print("\n✅ Data generation complete!")
     print("Files are ready for dashboard visualization.")
-    print("=" * 50) 
\ No newline at end of file
+    print("=" * 50)
@@ -0,0 +1,161 @@
+"""
+Deal Partitions for Business Dashboard
+Deals stored as one CSV per year/month partition, each with a small sidecar holding
+its largest deals, kept current as deals are appended, so the "Biggest deals" card
+reads a few rows instead of scanning every deal
+"""
+
+import heapq
+import json
+import os
+import shutil
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import schema
+
+PARTITION_DIR = "deals.parts"
+
+# Leaders kept per partition (the card shows 8, the summary 10)
+TOP_K = 10
+
+# Rows per chunk when a partition has to be scanned
+SCAN_CHUNK_ROWS = 100000
+
+# Columns kept for each leader
+TOP_COLUMNS = ['sales_rep', 'amount', 'deal_id', 'date']
+
+def partition_name(year: int, month: int) -> str:
+    """File stem of a partition, e.g. ``2024-03``"""
+    return f"{int(year):04d}-{int(month):02d}"
+
+def partition_file(directory: str, year: int, month: int) -> str:
+    """Deals CSV of one partition"""
+    return os.path.join(directory, f"{partition_name(year, month)}.csv")
+
+def top_file(directory: str, year: int, month: int) -> str:
+    """Leaders sidecar of one partition"""
+    return os.path.join(directory, f"{partition_name(year, month)}.top.json")
+
+def _merge_top(top: List[Dict], candidates: List[Dict], k: int) -> List[Dict]:
+    """Largest ``k`` of two leader lists; equal amounts keep partition order (as DataFrame.nlargest)"""
+    return sorted(top + candidates, key=lambda deal: (-deal['amount'], deal['row']))[:k]
+
+class PartitionWriter:
+    """Append deals to their year/month partitions and keep every partition's leaders sidecar up to date
+
+    Each ``add`` appends rows to the partition CSVs and merges at most
+    ``k`` candidates per partition into its sidecar, so memory depends on
+    the chunk size and ``k`` only.
+    """
+
+    def __init__(self, directory: str, k: int = TOP_K, reset: bool = False):
+        self.directory = directory
+        self.k = k
+        if reset and os.path.isdir(directory):
+            shutil.rmtree(directory)
+        os.makedirs(directory, exist_ok=True)
+        self.sidecars = {}
+
+    def _sidecar(self, year: int, month: int) -> Dict:
+        key = (year, month)
+        if key not in self.sidecars:
+            path = top_file(self.directory, year, month)
+            if os.path.exists(path):
+                with open(path) as f:
+                    self.sidecars[key] = json.load(f)
+            else:
+                self.sidecars[key] = {'year': year, 'month': month, 'k': self.k, 'rows': 0, 'total': 0.0, 'top': []}
+        return self.sidecars[key]
+
+    def add(self, deals: pd.DataFrame):
+        """Append deals (any mix of months) to their partitions"""
+        if len(deals) == 0:
+            return
+        keys = deals['year'].to_numpy().astype(np.int64) * 12 + deals['month'].to_numpy().astype(np.int64) - 1
+        order = np.argsort(keys, kind='stable')
+        bounds = np.flatnonzero(np.diff(keys[order])) + 1
+        for rows in np.split(order, bounds):
+            year, month = divmod(int(keys[rows[0]]), 12)
+            month += 1
+            part = deals.iloc[rows]
+            sidecar = self._sidecar(year, month)
+
+            path = partition_file(self.directory, year, month)
+            part.to_csv(path, mode='a', header=not os.path.exists(path), index=False)
+
+            # Only this chunk's own leaders can enter the partition's top k
+            leaders = part['amount'].reset_index(drop=True).nlargest(self.k, keep='first')
+            candidates = [{
+                'sales_rep': str(part['sales_rep'].iloc[position]),
+                'amount': float(amount),
+                'deal_id': str(part['deal_id'].iloc[position]),
+                'date': f"{part['date'].iloc[position]:%Y-%m-%d}",
+                'row': sidecar['rows'] + int(position),
+            } for position, amount in leaders.items()]
+            sidecar['top'] = _merge_top(sidecar['top'], candidates, self.k)
+            sidecar['rows'] += len(part)
+            sidecar['total'] = round(sidecar['total'] + float(part['amount'].sum()), 2)
+            with open(top_file(self.directory, year, month), 'w') as f:
+                json.dump(sidecar, f, indent=2)
+
+def write_partitions(deals: pd.DataFrame, directory: str, k: int = TOP_K):
+    """Replace the partition directory with a whole deals frame"""
+    PartitionWriter(directory, k, reset=True).add(deals)
+
+def partitions(directory: str) -> List[Tuple[int, int]]:
+    """(year, month) of every partition, oldest first"""
+    if not os.path.isdir(directory):
+        return []
+    names = sorted(name[:-len('.csv')] for name in os.listdir(directory) if name.endswith('.csv'))
+    return [(int(name[:4]), int(name[5:7])) for name in names]
+
+def latest_partition(directory: str, until: Optional[Tuple[int, int]] = None) -> Optional[Tuple[int, int]]:
+    """Most recent (year, month) with deals, optionally not after ``until``; None if there is none"""
+    found = [key for key in partitions(directory) if until is None or key <= until]
+    return found[-1] if found else None
+
+def scan_top_deals(path: str, n: int, chunk_rows: int = SCAN_CHUNK_ROWS) -> pd.DataFrame:
+    """Largest ``n`` deals of a partition CSV, read chunk by chunk through a bounded heap
+
+    Fallback for partitions without a usable sidecar; memory stays at one
+    chunk plus ``n`` deals however large the partition is.
+    """
+    heap = []
+    first_row = 0
+    reader = pd.read_csv(path, usecols=TOP_COLUMNS, chunksize=chunk_rows,
+                         dtype=schema.csv_dtypes('deals', TOP_COLUMNS))
+    for chunk in reader:
+        amounts = chunk['amount'].reset_index(drop=True)
+        for position, amount in amounts.nlargest(n, keep='first').items():
+            # Heap order: smallest amount first, later rows first among equals
+            entry = (float(amount), -(first_row + int(position)), chunk['sales_rep'].iloc[position])
+            if len(heap) < n:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+        first_row += len(chunk)
+    leaders = sorted(heap, key=lambda entry: (-entry[0], -entry[1]))
+    return pd.DataFrame({'sales_rep': [entry[2] for entry in leaders],
+                         'amount': [entry[0] for entry in leaders]})
+
+def top_deals(directory: str, year: int, month: int, n: int = 8) -> pd.DataFrame:
+    """Largest ``n`` deals of a partition (columns sales_rep, amount); empty if it has no deals
+
+    Read from the sidecar when it holds at least ``n`` leaders (or the whole
+    partition), otherwise by scanning the partition.
+    """
+    sidecar_path = top_file(directory, year, month)
+    if os.path.exists(sidecar_path):
+        with open(sidecar_path) as f:
+            sidecar = json.load(f)
+        if n <= sidecar['k'] or sidecar['rows'] <= sidecar['k']:
+            leaders = sidecar['top'][:n]
+            return pd.DataFrame({'sales_rep': [deal['sales_rep'] for deal in leaders],
+                                 'amount': [deal['amount'] for deal in leaders]})
+    path = partition_file(directory, year, month)
+    if not os.path.exists(path):
+        return pd.DataFrame({'sales_rep': [], 'amount': []})
+    return scan_top_deals(path, n)
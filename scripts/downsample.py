@@ -0,0 +1,71 @@
+"""
+Series Downsampling for Business Dashboard
+Reduces long x/y series to about one point per pixel of the chart drawing them:
+largest-triangle-three-buckets (LTTB) keeps the visual shape, min/max bucketing keeps
+every peak and trough of each pixel column
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+METHODS = ('lttb', 'minmax')
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of ``threshold`` points chosen by largest-triangle-three-buckets (first and last always kept)
+
+    The points between the ends are split into ``threshold - 2`` buckets of
+    consecutive points; each bucket keeps the point forming the largest
+    triangle with the point kept before it and the average of the next bucket.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x, next_y = x[end:next_end].mean(), y[end:next_end].mean()
+        area = np.abs((x[previous] - next_x) * (y[start:end] - y[previous])
+                      - (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        selected[bucket + 1] = previous
+    return selected
+
+def minmax(x: np.ndarray, y: np.ndarray, buckets: int) -> np.ndarray:
+    """Indices of the lowest and highest point in each of ``buckets`` equal ranges of ascending ``x``, plus both ends"""
+    n = len(x)
+    if n <= 2 * buckets or buckets < 1:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y)
+    span = x[-1] - x[0]
+    if span <= 0:
+        return np.array([0, n - 1])
+    bucket = np.minimum(((x - x[0]) / span * buckets).astype(np.int64), buckets - 1)
+    
+    # Ascending x keeps each bucket contiguous: reduce every run, then find the first point at its extreme
+    first = np.r_[True, bucket[1:] != bucket[:-1]]
+    run = np.cumsum(first) - 1
+    starts = np.flatnonzero(first)
+    keep = [[0, n - 1]]
+    for extremes in (np.minimum.reduceat(y, starts), np.maximum.reduceat(y, starts)):
+        hits = np.flatnonzero(y == extremes[run])
+        keep.append(hits[np.unique(run[hits], return_index=True)[1]])
+    return np.unique(np.concatenate(keep))
+
+def downsample(x: np.ndarray, y: np.ndarray, width: int, method: str = 'lttb') -> Tuple[np.ndarray, np.ndarray]:
+    """Series reduced for a chart ``width`` pixels wide: at most ``width`` points, any series length"""
+    if method == 'lttb':
+        keep = lttb(x, y, width)
+    elif method == 'minmax':
+        keep = minmax(x, y, max((width - 2) // 2, 1))
+    else:
+        raise ValueError(f"unknown downsampling method {method!r}, expected one of {METHODS}")
+    return np.asarray(x)[keep], np.asarray(y)[keep]
@@ -0,0 +1,156 @@
+"""
+Feedback Search Index for Business Dashboard
+Inverted index over the feedback table built by data_gen.py: feedback texts are
+dictionary-coded phrases, terms point to the phrases containing them, and each
+phrase, rating and sentiment has a sorted postings list of rows (file order, newest first)
+"""
+
+import json
+import os
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+META_FILE = "_meta.json"
+FORMAT_VERSION = 1
+
+# Facets with a postings list per value: the feedback column each one codes
+FACETS = {
+    'text': 'feedback_text',
+    'rating': 'rating',
+    'sentiment': 'sentiment',
+}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric terms of a text (the page tokenizes queries the same way)"""
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+def _postings(codes: np.ndarray, n_keys: int):
+    """CSR postings: rows grouped by code, ascending within each code, with per-code offsets"""
+    rows = np.argsort(codes, kind='stable').astype(np.uint32)
+    starts = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=n_keys))]).astype(np.int64)
+    return rows, starts
+
+def build_index(df: pd.DataFrame, path: str):
+    """Index a feedback frame (rows in file order) and write it to ``path``"""
+    os.makedirs(path, exist_ok=True)
+    meta_path = os.path.join(path, META_FILE)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    
+    # Dictionary-code every facet; phrases and sentiments keep their category order
+    keys = {}
+    for facet, column in FACETS.items():
+        codes, uniques = pd.factorize(df[column], sort=True)
+        keys[facet] = [value.item() if isinstance(value, np.generic) else str(value) for value in np.asarray(uniques)]
+        rows, starts = _postings(codes, len(uniques))
+        np.save(os.path.join(path, f'{facet}_rows.npy'), rows)
+        np.save(os.path.join(path, f'{facet}_starts.npy'), starts)
+    
+    # Terms point at phrases, not rows: the corpus repeats a small set of phrases
+    phrase_terms = [sorted(set(tokenize(phrase))) for phrase in keys['text']]
+    terms = sorted({term for phrase in phrase_terms for term in phrase})
+    term_codes = {term: code for code, term in enumerate(terms)}
+    pairs = sorted((term_codes[term], phrase) for phrase, phrase_term in enumerate(phrase_terms) for term in phrase_term)
+    term_phrases = np.array([phrase for _, phrase in pairs], dtype=np.uint32)
+    term_starts = np.concatenate([[0], np.cumsum(np.bincount([term for term, _ in pairs], minlength=len(terms)))])
+    np.save(os.path.join(path, 'term_phrases.npy'), term_phrases)
+    np.save(os.path.join(path, 'term_starts.npy'), term_starts.astype(np.int64))
+    
+    # The manifest goes last and marks the index as complete
+    meta = {
+        'version': FORMAT_VERSION,
+        'rows': int(len(df)),
+        'terms': terms,
+        'keys': keys,
+    }
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f, indent=2)
+
+class FeedbackIndex:
+    """Read-only view of a persisted index; postings are memory-mapped"""
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, META_FILE)) as f:
+            self.meta = json.load(f)
+        if self.meta.get('version') != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported feedback index version {self.meta.get('version')}")
+        self.rows = self.meta['rows']
+        self.terms = self.meta['terms']
+        self.keys = self.meta['keys']
+        self.arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+                       for name in ['term_phrases', 'term_starts']
+                       + [f'{facet}_{part}' for facet in FACETS for part in ('rows', 'starts')]}
+
+    def postings(self, facet: str, code: int) -> np.ndarray:
+        """Rows with one facet value (by its position in ``keys[facet]``), ascending"""
+        starts = self.arrays[f'{facet}_starts']
+        return self.arrays[f'{facet}_rows'][starts[code]:starts[code + 1]]
+
+    def matching_phrases(self, query: str) -> List[int]:
+        """Phrases containing every query term, each term matched as a prefix (so typing finds whole words)"""
+        starts = self.arrays['term_starts']
+        phrases = None
+        for token in tokenize(query):
+            first = int(np.searchsorted(self.terms, token))
+            found = set()
+            for term in range(first, len(self.terms)):
+                if not self.terms[term].startswith(token):
+                    break
+                found.update(int(phrase) for phrase in self.arrays['term_phrases'][starts[term]:starts[term + 1]])
+            phrases = found if phrases is None else phrases & found
+        return sorted(phrases) if phrases is not None else list(range(len(self.keys['text'])))
+
+    def search(self, query: str = '', rating: Optional[int] = None, sentiment: Optional[str] = None) -> np.ndarray:
+        """Rows whose text matches ``query`` and with the given rating and sentiment, in file order"""
+        selected = [[self.postings('text', phrase) for phrase in self.matching_phrases(query)]] if query.strip() else []
+        for facet, value in (('rating', rating), ('sentiment', sentiment)):
+            if value is not None:
+                selected.append([self.postings(facet, self.keys[facet].index(value))] if value in self.keys[facet] else [])
+        if not selected:
+            return np.arange(self.rows, dtype=np.uint32)
+        hits = np.zeros(self.rows, dtype=np.uint8)
+        for lists in selected:
+            for rows in lists:
+                hits[rows] += 1
+        return np.flatnonzero(hits == len(selected)).astype(np.uint32)
+
+def load_index(path: str) -> FeedbackIndex:
+    """Open a persisted feedback index"""
+    return FeedbackIndex(path)
+
+def varint_deltas(rows: np.ndarray) -> np.ndarray:
+    """Ascending rows as LEB128 varints of their gaps (the first gap counts from row 0)"""
+    gaps = np.diff(np.asarray(rows, dtype=np.int64), prepend=0).astype(np.uint64)
+    sizes = np.ones(len(gaps), dtype=np.int64)
+    for shift in (7, 14, 21, 28):
+        sizes += gaps >= (1 << shift)
+    ends = np.cumsum(sizes)
+    out = np.zeros(int(ends[-1]) if len(ends) else 0, dtype=np.uint8)
+    for byte in range(5):
+        sel = sizes > byte
+        more = np.where(sizes[sel] > byte + 1, 0x80, 0).astype(np.uint8)
+        out[(ends - sizes)[sel] + byte] = ((gaps[sel] >> np.uint64(7 * byte)) & np.uint64(0x7f)).astype(np.uint8) | more
+    return out
+
+def client_payload(index: FeedbackIndex) -> Dict:
+    """Index for the page: terms, facet keys, and per facet the varint postings with byte offsets per key"""
+    facets = {}
+    for facet in FACETS:
+        encoded = [varint_deltas(index.postings(facet, code)) for code in range(len(index.keys[facet]))]
+        facets[facet] = {
+            'keys': index.keys[facet],
+            'offsets': np.concatenate([[0], np.cumsum([len(part) for part in encoded])]).astype(np.uint32),
+            'bytes': np.concatenate(encoded) if encoded else np.empty(0, dtype=np.uint8),
+        }
+    return {
+        'rows': index.rows,
+        'terms': index.terms,
+        'termStarts': np.asarray(index.arrays['term_starts'], dtype=np.uint32),
+        'termPhrases': np.asarray(index.arrays['term_phrases'], dtype=np.uint32),
+        'facets': facets,
+    }
@@ -0,0 +1,115 @@
+"""
+Feedback Pages for Business Dashboard
+The whole feedback history, newest first, written next to the dashboard as fixed-size
+JSONP pages (dictionary-coded texts, day numbers as typed arrays) that the feedback
+card's virtual list loads while scrolling, so the page itself stays the same size
+"""
+
+import json
+import os
+import shutil
+from typing import Dict, Iterable
+
+import numpy as np
+import pandas as pd
+
+import payload
+
+PAGE_ROWS = 500
+
+def day_numbers(dates) -> np.ndarray:
+    """Calendar day of each date as days since 1970-01-01"""
+    return np.asarray(dates).astype('datetime64[D]').astype(np.int64)
+
+def relative_time_labels(days_ago: np.ndarray) -> np.ndarray:
+    """'today', 'N days ago' or 'N months ago' for each age in whole days
+
+    Labels are formatted once per distinct age, so the cost hardly depends on
+    the number of rows. The page's ``feedbackAge`` applies the same buckets.
+    """
+    ages, inverse = np.unique(np.maximum(np.asarray(days_ago, dtype=np.int64), 0), return_inverse=True)
+    labels = []
+    for age in ages:
+        if age == 0:
+            labels.append("today")
+        elif age == 1:
+            labels.append("1 day ago")
+        elif age < 30:
+            labels.append(f"{age} days ago")
+        elif age < 60:
+            labels.append("1 month ago")
+        else:
+            labels.append(f"{age // 30} months ago")
+    return np.array(labels, dtype=object)[inverse.reshape(-1)]
+
+class PageWriter:
+    """Write feedback rows (chunks of date and feedback_text, newest first) as numbered pages
+
+    Texts are coded against a vocabulary built in order of first appearance,
+    so chunks of any size (frames or query results) give the same pages.
+    """
+
+    def __init__(self, directory: str, callback: str, page_rows: int = PAGE_ROWS):
+        self.directory = directory
+        self.callback = callback
+        self.page_rows = page_rows
+        if os.path.isdir(directory):
+            shutil.rmtree(directory)
+        os.makedirs(directory)
+        self.texts = []
+        self.text_codes = {}
+        self.pending = []
+        self.rows = 0
+        self.pages = 0
+
+    def _codes(self, texts: pd.Series) -> np.ndarray:
+        """Vocabulary codes of a chunk's texts"""
+        codes, uniques = pd.factorize(texts)
+        lookup = np.empty(len(uniques), dtype=np.int64)
+        for position, text in enumerate(np.asarray(uniques, dtype=object)):
+            if text not in self.text_codes:
+                self.text_codes[text] = len(self.texts)
+                self.texts.append(str(text))
+            lookup[position] = self.text_codes[text]
+        return lookup[codes]
+
+    def _write_page(self, text: np.ndarray, day: np.ndarray):
+        # Sized by the page's own codes: the vocabulary so far depends on how rows were chunked
+        largest = int(text.max()) if len(text) else 0
+        dtype = 'uint8' if largest < 256 else 'uint16' if largest < 65536 else 'int32'
+        page = {'text': payload.typed_array(text, dtype), 'day': payload.typed_array(day, 'int32')}
+        with open(os.path.join(self.directory, f"{self.pages}.js"), 'w') as f:
+            f.write(f"{self.callback}({self.pages}, {json.dumps(page, separators=(',', ':'))});\n")
+        self.pages += 1
+
+    def add(self, chunk: pd.DataFrame):
+        """Append a chunk of rows"""
+        self.pending.append((self._codes(chunk['feedback_text']), day_numbers(chunk['date'])))
+        buffered = sum(len(text) for text, _ in self.pending)
+        if buffered < self.page_rows:
+            return
+        text = np.concatenate([text for text, _ in self.pending])
+        day = np.concatenate([day for _, day in self.pending])
+        full = len(text) - len(text) % self.page_rows
+        for start in range(0, full, self.page_rows):
+            self._write_page(text[start:start + self.page_rows], day[start:start + self.page_rows])
+        self.pending = [(text[full:], day[full:])]
+        self.rows += full
+
+    def close(self) -> Dict:
+        """Write the last partial page; returns the list settings the page needs"""
+        text = np.concatenate([text for text, _ in self.pending]) if self.pending else np.empty(0, np.int64)
+        day = np.concatenate([day for _, day in self.pending]) if self.pending else np.empty(0, np.int64)
+        if len(text):
+            self._write_page(text, day)
+        self.rows += len(text)
+        self.pending = []
+        return {'pageRows': self.page_rows, 'pages': self.pages, 'rows': self.rows, 'texts': self.texts}
+
+def write_pages(chunks: Iterable[pd.DataFrame], directory: str, callback: str,
+                page_rows: int = PAGE_ROWS) -> Dict:
+    """Write every chunk as pages; returns the list settings (see PageWriter.close)"""
+    writer = PageWriter(directory, callback, page_rows)
+    for chunk in chunks:
+        writer.add(chunk)
+    return writer.close()
@@ -0,0 +1,233 @@
+"""
+Geographic Grid Pyramid for Business Dashboard
+Aggregates user coordinates into square lat/lon cells at several zoom levels so the
+map ships a bounded number of cells instead of one point per user
+"""
+
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import schema
+
+# Level 0 cells are 1 degree and shown up to map zoom 4.5; each further level
+# halves the cell size and takes over one zoom step later
+BASE_CELL_DEGREES = 1.0
+BASE_ZOOM = 3.5
+LEVELS = 6
+
+# Finer levels are cut into square tiles of this many cells per side, loaded on demand
+TILE_CELLS = 64
+
+# Points are binned in slices of this many rows, merged in slice order, so the
+# cells come out the same whatever the number of worker processes
+BIN_SLICE_ROWS = 1 << 21
+
+# Below this many points binning stays in the calling process
+PARALLEL_MIN_ROWS = 4 * BIN_SLICE_ROWS
+
+# Marker diameter range in pixels, scaled by log(count)
+MIN_MARKER_SIZE = 6
+MAX_MARKER_SIZE = 30
+
+def cell_degrees(level: int) -> float:
+    """Cell side length of a level"""
+    return BASE_CELL_DEGREES / 2 ** level
+
+def grid_shape(level: int) -> Tuple[int, int]:
+    """Rows and columns of cells covering the US bounds (see schema.py) at a level"""
+    size = cell_degrees(level)
+    n_rows = int(np.ceil((schema.US_LAT_BOUNDS[1] - schema.US_LAT_BOUNDS[0]) / size))
+    n_cols = int(np.ceil((schema.US_LON_BOUNDS[1] - schema.US_LON_BOUNDS[0]) / size))
+    return n_rows, n_cols
+
+def _cell_index(lat: np.ndarray, lon: np.ndarray, level: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Row and column of each point's cell at a level"""
+    n_rows, n_cols = grid_shape(level)
+    scale = 1 / cell_degrees(level)
+    rows = np.clip(np.floor((lat - schema.US_LAT_BOUNDS[0]) * scale).astype(np.int64), 0, n_rows - 1)
+    cols = np.clip(np.floor((lon - schema.US_LON_BOUNDS[0]) * scale).astype(np.int64), 0, n_cols - 1)
+    return rows, cols
+
+def _coarsen(cells: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Merge each 2x2 block of cells into one cell of the next coarser level"""
+    rows, cols = cells['row'] >> 1, cells['col'] >> 1
+    keys, inverse = np.unique(rows * (1 << 32) + cols, return_inverse=True)
+    return {
+        'row': keys >> 32,
+        'col': keys & ((1 << 32) - 1),
+        'count': np.bincount(inverse, weights=cells['count']).astype(np.int64),
+        'lat_sum': np.bincount(inverse, weights=cells['lat_sum']),
+        'lon_sum': np.bincount(inverse, weights=cells['lon_sum']),
+    }
+
+def _bin_slice(lat: np.ndarray, lon: np.ndarray, level: int) -> Tuple[np.ndarray, ...]:
+    """Histogram of one slice of points at a level: occupied flat cells, counts, lat sums and lon sums"""
+    n_rows, n_cols = grid_shape(level)
+    rows, cols = _cell_index(lat, lon, level)
+    flat = rows * n_cols + cols
+    counts = np.bincount(flat, minlength=n_rows * n_cols)
+    occupied = np.flatnonzero(counts)
+    return (occupied, counts[occupied],
+            np.bincount(flat, weights=lat, minlength=n_rows * n_cols)[occupied],
+            np.bincount(flat, weights=lon, minlength=n_rows * n_cols)[occupied])
+
+# Worker-side view of the points, attached once per process by _attach_points
+_shared_points = {}
+
+def _attach_points(name: str, n_points: int):
+    """Map the parent's shared lat/lon block (process pool initializer)"""
+    block = shared_memory.SharedMemory(name=name)
+    _shared_points['block'] = block
+    _shared_points['coords'] = np.ndarray((2, n_points), dtype=np.float64, buffer=block.buf)
+
+def _bin_shared_slice(start: int, end: int, level: int) -> Tuple[np.ndarray, ...]:
+    """Bin rows ``start:end`` of the shared points (process pool entry point)"""
+    coords = _shared_points['coords']
+    return _bin_slice(coords[0, start:end], coords[1, start:end], level)
+
+def _bin_points(lat: np.ndarray, lon: np.ndarray, level: int, workers: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """Non-empty cells of a level with their counts and coordinate sums
+
+    Points are binned in BIN_SLICE_ROWS slices and the partial histograms
+    summed in slice order, so any ``workers`` gives identical cells. With
+    more than one worker the points are copied once into shared memory and
+    every process bins its slices in place.
+    """
+    n_rows, n_cols = grid_shape(level)
+    n_points = len(lat)
+    slices = [(start, min(start + BIN_SLICE_ROWS, n_points)) for start in range(0, n_points, BIN_SLICE_ROWS)]
+    if workers is None:
+        workers = (os.cpu_count() or 1) if n_points >= PARALLEL_MIN_ROWS else 1
+    workers = max(1, min(workers, len(slices)))
+    
+    counts = np.zeros(n_rows * n_cols, dtype=np.int64)
+    lat_sum = np.zeros(n_rows * n_cols)
+    lon_sum = np.zeros(n_rows * n_cols)
+    def merge(partials):
+        for occupied, slice_counts, slice_lat, slice_lon in partials:
+            counts[occupied] += slice_counts
+            lat_sum[occupied] += slice_lat
+            lon_sum[occupied] += slice_lon
+    
+    if workers == 1:
+        merge(_bin_slice(lat[start:end], lon[start:end], level) for start, end in slices)
+    else:
+        block = shared_memory.SharedMemory(create=True, size=max(2 * n_points * 8, 1))
+        try:
+            coords = np.ndarray((2, n_points), dtype=np.float64, buffer=block.buf)
+            coords[0], coords[1] = lat, lon
+            with ProcessPoolExecutor(max_workers=workers, initializer=_attach_points,
+                                     initargs=(block.name, n_points)) as pool:
+                merge(pool.map(_bin_shared_slice, *zip(*slices), [level] * len(slices)))
+            del coords
+        finally:
+            block.close()
+            block.unlink()
+    
+    occupied = np.flatnonzero(counts)
+    return {
+        'row': occupied // n_cols,
+        'col': occupied % n_cols,
+        'count': counts[occupied],
+        'lat_sum': lat_sum[occupied],
+        'lon_sum': lon_sum[occupied],
+    }
+
+def build_pyramid(lat: np.ndarray, lon: np.ndarray, levels: int = LEVELS,
+                  workers: Optional[int] = None) -> List[Dict[str, np.ndarray]]:
+    """Non-empty cells of every level, coarsest first: cell row/col, user count and the users' mean position
+
+    Points are binned once at the finest level (on ``workers`` processes,
+    by default all cores for large inputs); every coarser level is built
+    from the one below it, since each cell is exactly four finer ones.
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    finest = levels - 1
+    cells = _bin_points(lat, lon, finest, workers)
+    
+    pyramid = [cells]
+    for _ in range(finest):
+        pyramid.append(_coarsen(pyramid[-1]))
+    pyramid.reverse()
+    
+    return [{
+        'row': cells['row'],
+        'col': cells['col'],
+        'count': cells['count'],
+        'lat': cells['lat_sum'] / np.maximum(cells['count'], 1),
+        'lon': cells['lon_sum'] / np.maximum(cells['count'], 1),
+    } for cells in pyramid]
+
+def marker_sizes(counts: np.ndarray, max_count: int) -> np.ndarray:
+    """Marker diameter per cell, growing with log(count) up to the busiest cell of the pyramid"""
+    scale = np.log1p(counts) / np.log1p(max(int(max_count), 1))
+    return np.round(MIN_MARKER_SIZE + (MAX_MARKER_SIZE - MIN_MARKER_SIZE) * scale, 1)
+
+def cell_payload(cells: Dict[str, np.ndarray], max_count: int, selection: Optional[np.ndarray] = None) -> Dict[str, list]:
+    """JSON-ready lists for a set of cells (optionally a subset, given as indices)"""
+    if selection is not None:
+        cells = {name: values[selection] for name, values in cells.items()}
+    return {
+        'lat': np.round(cells['lat'], 4).tolist(),
+        'lon': np.round(cells['lon'], 4).tolist(),
+        'count': cells['count'].tolist(),
+        'size': marker_sizes(cells['count'], max_count).tolist(),
+    }
+
+def pyramid_max_count(pyramid: List[Dict[str, np.ndarray]]) -> int:
+    """Largest cell count at any level (the coarsest level holds it)"""
+    return max((int(cells['count'].max()) for cells in pyramid if len(cells['count'])), default=1)
+
+def write_tiles(pyramid: List[Dict[str, np.ndarray]], tile_dir: str, callback: str) -> Dict[int, List[str]]:
+    """Write every non-empty tile of levels 1+ as a JSONP script ``<level>/<tile_row>_<tile_col>.js``
+
+    Scripts call ``callback(level, tile_row, tile_col, cells)`` so they load
+    with a plain <script> tag, which also works for pages opened from disk.
+    Returns the tiles written per level as ``"<tile_row>_<tile_col>"``.
+    """
+    if os.path.isdir(tile_dir):
+        shutil.rmtree(tile_dir)
+    max_count = pyramid_max_count(pyramid)
+    written = {}
+    for level, cells in enumerate(pyramid[1:], start=1):
+        level_dir = os.path.join(tile_dir, str(level))
+        os.makedirs(level_dir, exist_ok=True)
+        written[level] = []
+        if len(cells['count']) == 0:
+            continue
+        
+        # Group cells by tile: sort once, then slice each tile's run
+        tile_rows = cells['row'] // TILE_CELLS
+        tile_cols = cells['col'] // TILE_CELLS
+        order = np.lexsort((tile_cols, tile_rows))
+        tile_keys = np.stack([tile_rows[order], tile_cols[order]], axis=1)
+        starts = np.flatnonzero(np.r_[True, np.any(tile_keys[1:] != tile_keys[:-1], axis=1)])
+        ends = np.r_[starts[1:], len(order)]
+        
+        for start, end in zip(starts, ends):
+            tile_row, tile_col = (int(value) for value in tile_keys[start])
+            payload = cell_payload(cells, max_count, order[start:end])
+            with open(os.path.join(level_dir, f"{tile_row}_{tile_col}.js"), 'w') as f:
+                f.write(f"{callback}({level}, {tile_row}, {tile_col}, {json.dumps(payload, separators=(',', ':'))});\n")
+            written[level].append(f"{tile_row}_{tile_col}")
+    return written
+
+def grid_config(tile_url: str, tiles: Dict[int, List[str]]) -> Dict:
+    """Grid parameters the page needs to pick a level and the tiles in view"""
+    return {
+        'latOrigin': schema.US_LAT_BOUNDS[0],
+        'lonOrigin': schema.US_LON_BOUNDS[0],
+        'baseCell': BASE_CELL_DEGREES,
+        'baseZoom': BASE_ZOOM,
+        'levels': LEVELS,
+        'tileCells': TILE_CELLS,
+        'tileUrl': tile_url,
+        'tiles': {str(level): keys for level, keys in tiles.items()},
+    }
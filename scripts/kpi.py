@@ -0,0 +1,210 @@
+"""
+KPI Engine for Business Dashboard
+Builds one value per calendar day for each metric series once, then answers every
+KPI window (day, 7 days, month to date) with O(1) lookups into prefix sums
+KPIs are declared in the KPIS registry; the HTML builder only reads the results
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import schema
+import sqlstore
+
+# Metric series: where each is read from (frame for loaded tables, dataset for
+# NPY exports and SQLite tables), its date and value columns, and whether days
+# add up ('flow', e.g. sales) or each day holds a current total ('level', e.g.
+# followers; days without data keep the last value)
+SERIES = {
+    'sales': {'frame': 'sales_df', 'dataset': 'sales', 'date': 'date', 'column': 'daily_sales', 'kind': 'flow'},
+    'linkedin_followers': {'frame': 'social_df', 'dataset': 'social', 'date': 'date',
+                           'column': 'linkedin_followers', 'kind': 'level'},
+    'twitter_followers': {'frame': 'social_df', 'dataset': 'social', 'date': 'date',
+                          'column': 'twitter_followers', 'kind': 'level'},
+    'website_users': {'frame': 'website_df', 'dataset': 'website', 'date': 'date',
+                      'column': 'daily_users', 'kind': 'flow'},
+    'website_enquiries': {'frame': 'website_df', 'dataset': 'website', 'date': 'date',
+                          'column': 'daily_enquiries', 'kind': 'flow'},
+    'nps': {'frame': 'nps_df', 'dataset': 'nps', 'date': 'month', 'column': 'nps_score', 'kind': 'level'},
+}
+
+# Dashboard KPIs: a series, a window ending at the anchor date ('day', 'week'
+# for 7 days, 'month' for the month to date; level series read the value on
+# the anchor day) and optional settings:
+# - 'offset': move the window back by that many whole windows (1 = yesterday)
+# - 'change': report the difference from the previous window instead
+# New KPIs only need an entry here (or register_kpi) to appear in the metrics.
+KPIS = {
+    'total_sales': {'series': 'sales', 'window': 'month'},
+    'sales_change': {'series': 'sales', 'window': 'month', 'change': True},
+    'today_sales': {'series': 'sales', 'window': 'day'},
+    'yesterday_sales': {'series': 'sales', 'window': 'day', 'offset': 1},
+    'linkedin_followers': {'series': 'linkedin_followers', 'window': 'day'},
+    'twitter_followers': {'series': 'twitter_followers', 'window': 'day'},
+    'linkedin_growth': {'series': 'linkedin_followers', 'window': 'day', 'change': True},
+    'twitter_growth': {'series': 'twitter_followers', 'window': 'day', 'change': True},
+    'website_users': {'series': 'website_users', 'window': 'week'},
+    'website_enquiries': {'series': 'website_enquiries', 'window': 'week'},
+    'user_change': {'series': 'website_users', 'window': 'week', 'change': True},
+    'enquiry_change': {'series': 'website_enquiries', 'window': 'week', 'change': True},
+    'nps_score': {'series': 'nps', 'window': 'day'},
+}
+
+WINDOWS = ('day', 'week', 'month')
+
+class DailySeries:
+    """One value per calendar day from ``start``, with prefix sums for window totals"""
+
+    def __init__(self, start: np.datetime64, values: np.ndarray, kind: str, integer: bool = False):
+        self.start = np.datetime64(start, 'D')
+        self.values = values
+        self.kind = kind
+        self.integer = integer
+        self.cumulative = np.concatenate([[0], np.cumsum(values)])
+
+    @property
+    def end(self) -> np.datetime64:
+        """Last day with data"""
+        return self.start + max(len(self.values) - 1, 0)
+
+    def _position(self, day: np.datetime64) -> int:
+        return int((np.datetime64(day, 'D') - self.start).astype(np.int64))
+
+    def total(self, first: np.datetime64, last: np.datetime64) -> float:
+        """Sum over the days ``first``..``last`` (days outside the data count as zero)"""
+        first = min(max(self._position(first), 0), len(self.values))
+        last = min(max(self._position(last) + 1, 0), len(self.values))
+        return float(self.cumulative[last] - self.cumulative[first]) if last > first else 0.0
+
+    def level(self, day: np.datetime64) -> Optional[float]:
+        """Value on a day: the latest value up to it (None before the first, as there is none yet)"""
+        position = self._position(day)
+        if position < 0 or len(self.values) == 0:
+            return None
+        return float(self.values[min(position, len(self.values) - 1)])
+
+def daily_series(dates: np.ndarray, values: np.ndarray, kind: str, integer: bool = False) -> DailySeries:
+    """Per-day series from (date, value) rows; several rows on one day (business units) are summed"""
+    days = np.asarray(dates).astype('datetime64[D]')
+    if len(days) == 0:
+        return DailySeries(np.datetime64('1970-01-01'), np.zeros(0), kind, integer)
+    start = days.min()
+    positions = (days - start).astype(np.int64)
+    totals = np.bincount(positions, weights=np.asarray(values, dtype=np.float64))
+    if kind == 'level':
+        # Carry the last reported value over days without rows
+        present = np.bincount(positions, minlength=len(totals)) > 0
+        totals = totals[np.maximum.accumulate(np.where(present, np.arange(len(totals)), 0))]
+    return DailySeries(start, totals, kind, integer)
+
+def _is_integer(spec: Dict) -> bool:
+    """True if the series counts whole units (an integer column in its schema)"""
+    return np.dtype(schema.SCHEMAS[spec['dataset']][spec['column']]).kind in 'iu'
+
+def series_from_frames(data: Dict[str, pd.DataFrame]) -> Dict[str, DailySeries]:
+    """Per-day series from the loaded frames"""
+    return {name: daily_series(data[spec['frame']][spec['date']].to_numpy(),
+                               data[spec['frame']][spec['column']].to_numpy(), spec['kind'], _is_integer(spec))
+            for name, spec in SERIES.items()}
+
+def _array_series(arrays: Dict[str, Dict], date_column: Optional[str] = None) -> Dict[str, DailySeries]:
+    """Per-day series from NPY arrays keyed by dataset (see colstore.open_array)"""
+    series = {}
+    for name, spec in SERIES.items():
+        array = arrays[spec['dataset']]
+        values = array['values']
+        if values.ndim > 1:
+            values = values[:, array['columns'].index(spec['column'])]
+        series[name] = daily_series(array['index'][date_column or spec['date']], values, spec['kind'], _is_integer(spec))
+    return series
+
+def series_from_arrays(arrays: Dict[str, Dict]) -> Dict[str, DailySeries]:
+    """Per-day series from the memory-mapped NPY exports"""
+    return _array_series(arrays)
+
+def series_from_rollups(rollups: Dict[str, Dict]) -> Dict[str, DailySeries]:
+    """Per-day series from the day-grain rollups (see rollup.load_rollups), already summed over business units"""
+    return _array_series(rollups, 'period')
+
+def store_tables() -> Dict[Tuple[str, str], List[str]]:
+    """Value columns the series read from each (SQLite table, date column)"""
+    tables = {}
+    for spec in SERIES.values():
+        tables.setdefault((spec['dataset'], spec['date']), []).append(spec['column'])
+    return tables
+
+def series_from_store(conn, until: Optional[datetime] = None) -> Dict[str, DailySeries]:
+    """Per-day series from the SQLite store's daily sums, up to the day of ``until`` (default: all)
+
+    Sparklines show the whole history and level series carry their last
+    value forward, so there is no start bound; the persisted daily sums
+    keep that to one row per day.
+    """
+    sums = {key: sqlstore.daily_sums(conn, *key, columns, last=until) for key, columns in store_tables().items()}
+    return {name: daily_series(sums[(spec['dataset'], spec['date'])][spec['date']].to_numpy(),
+                               sums[(spec['dataset'], spec['date'])][spec['column']].to_numpy(), spec['kind'],
+                               _is_integer(spec))
+            for name, spec in SERIES.items()}
+
+def latest_date(series: Dict[str, DailySeries]) -> np.datetime64:
+    """Default anchor: the last day any flow series has data for"""
+    ends = [values.end for values in series.values() if values.kind == 'flow' and len(values.values)]
+    return max(ends) if ends else np.datetime64('today', 'D')
+
+def window_bounds(window: str, anchor: np.datetime64, offset: int = 0) -> Tuple[np.datetime64, np.datetime64]:
+    """First and last day of a window ending at ``anchor``, moved back ``offset`` windows
+
+    Earlier months are compared to the same day of the month (or their last
+    day, if shorter), so month-to-date is matched against month-to-date.
+    """
+    anchor = np.datetime64(anchor, 'D')
+    if window == 'day':
+        last = anchor - offset
+        return last, last
+    if window == 'week':
+        last = anchor - 7 * offset
+        return last - 6, last
+    if window == 'month':
+        month = anchor.astype('datetime64[M]') - offset
+        first = month.astype('datetime64[D]')
+        day_of_month = int((anchor - anchor.astype('datetime64[M]').astype('datetime64[D]')).astype(np.int64))
+        month_end = (month + 1).astype('datetime64[D]') - 1
+        return first, min(first + day_of_month, month_end)
+    raise ValueError(f"unknown KPI window {window!r}, expected one of {WINDOWS}")
+
+def window_value(values: DailySeries, window: str, anchor: np.datetime64, offset: int = 0) -> Optional[float]:
+    """Total of a flow series over a window, or a level series' value on its last day (None before its data)"""
+    first, last = window_bounds(window, anchor, offset)
+    return values.level(last) if values.kind == 'level' else values.total(first, last)
+
+def register_kpi(name: str, series: str, window: str, offset: int = 0, change: bool = False):
+    """Declare a KPI (added to KPIS)"""
+    if series not in SERIES:
+        raise KeyError(f"unknown KPI series {series!r}")
+    if window not in WINDOWS:
+        raise ValueError(f"unknown KPI window {window!r}, expected one of {WINDOWS}")
+    KPIS[name] = {'series': series, 'window': window, 'offset': offset, 'change': change}
+
+def compute(series: Dict[str, DailySeries], anchor: Optional[np.datetime64] = None,
+            kpis: Optional[Dict[str, Dict]] = None) -> Dict[str, Optional[float]]:
+    """Value of every KPI at ``anchor`` (default: the latest data date)
+
+    KPIs reading a level series before its first value (or a change
+    against such a day) are None; the dashboard shows them as "n/a".
+    """
+    anchor = latest_date(series) if anchor is None else np.datetime64(anchor, 'D')
+    results = {}
+    for name, spec in (KPIS if kpis is None else kpis).items():
+        values = series[spec['series']]
+        offset = spec.get('offset', 0)
+        result = window_value(values, spec['window'], anchor, offset)
+        if spec.get('change') and result is not None:
+            previous = window_value(values, spec['window'], anchor, offset + 1)
+            result = None if previous is None else result - previous
+        if result is not None:
+            result = int(round(result)) if values.integer else round(result, 2)
+        results[name] = result
+    return results
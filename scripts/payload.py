@@ -0,0 +1,74 @@
+"""
+Chart Payload Encoding for Business Dashboard
+Serializes chart data for the page with numeric arrays embedded as base64 typed
+arrays ({'dtype', 'bdata'}), the binary form plotly.js 2.28+ decodes itself
+"""
+
+import base64
+import json
+from typing import Dict, Optional
+
+import numpy as np
+
+# numpy dtype -> typed array code understood by plotly.js (little-endian)
+TYPED_ARRAY_CODES = {
+    'float64': 'f8',
+    'float32': 'f4',
+    'int32': 'i4',
+    'uint32': 'u4',
+    'int16': 'i2',
+    'uint16': 'u2',
+    'int8': 'i1',
+    'uint8': 'u1',
+}
+
+# Page-side decoder for typed arrays the page reads itself (plotly decodes its own)
+TYPED_ARRAY_JS = """
+const TYPED_ARRAYS = {f8: Float64Array, f4: Float32Array, i4: Int32Array, u4: Uint32Array,
+                      i2: Int16Array, u2: Uint16Array, i1: Int8Array, u1: Uint8Array};
+
+function decodeTypedArray(spec) {
+    const bytes = atob(spec.bdata);
+    const buffer = new Uint8Array(bytes.length);
+    for (let i = 0; i < bytes.length; i++) buffer[i] = bytes.charCodeAt(i);
+    return new TYPED_ARRAYS[spec.dtype](buffer.buffer);
+}
+"""
+
+def _narrow_integers(values: np.ndarray) -> np.ndarray:
+    """64-bit integers as int32 when they fit (typed arrays have no 64-bit integers), else float64"""
+    info = np.iinfo(np.int32)
+    if len(values) == 0 or (values.min() >= info.min and values.max() <= info.max):
+        return values.astype(np.int32)
+    return values.astype(np.float64)
+
+def typed_array(values, dtype: Optional[str] = None) -> Dict[str, str]:
+    """One-dimensional array as ``{'dtype', 'bdata'}``, optionally cast to ``dtype`` first"""
+    array = np.asarray(values, dtype=dtype)
+    if array.ndim != 1:
+        raise ValueError(f"typed arrays must be one-dimensional, got shape {array.shape}")
+    if array.dtype.kind in 'iu' and array.dtype.itemsize == 8:
+        array = _narrow_integers(array)
+    if array.dtype.name not in TYPED_ARRAY_CODES:
+        raise TypeError(f"no typed array type for {array.dtype}")
+    array = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder('<'))
+    return {
+        'dtype': TYPED_ARRAY_CODES[array.dtype.name],
+        'bdata': base64.b64encode(array.tobytes()).decode('ascii'),
+    }
+
+def encode(obj):
+    """Copy of a chart structure with every numpy array replaced by its typed array form"""
+    if isinstance(obj, np.ndarray):
+        return typed_array(obj)
+    if isinstance(obj, dict):
+        return {key: encode(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [encode(value) for value in obj]
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return obj
+
+def to_json(obj) -> str:
+    """JSON for a chart structure, numpy arrays included"""
+    return json.dumps(encode(obj))
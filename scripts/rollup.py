@@ -0,0 +1,112 @@
+"""
+Calendar Rollups for Business Dashboard
+Day, week, month, quarter and year aggregates of the dashboard metrics (and of deals
+per sales rep), built once by data_gen.py and stored as NPY arrays indexed by period
+"""
+
+import os
+import shutil
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+import colstore
+
+ROLLUP_DIR = "rollups"
+
+# Weeks start on Monday; every other period starts on its first calendar day
+GRAINS = ['day', 'week', 'month', 'quarter', 'year']
+
+# Rollups per source dataset: its date column, columns summed over each period,
+# columns whose closing value (last day of the period, summed over business
+# units) is kept, an optional row count column and an optional grouping column
+ROLLUPS = {
+    'sales': {'dataset': 'sales', 'date': 'date', 'sum': ['daily_sales']},
+    'deals': {'dataset': 'deals', 'date': 'date', 'sum': ['amount'], 'count': 'deals'},
+    'deals_by_rep': {'dataset': 'deals', 'date': 'date', 'sum': ['amount'], 'count': 'deals', 'by': 'sales_rep'},
+    'website': {'dataset': 'website', 'date': 'date', 'sum': ['daily_users', 'daily_enquiries']},
+    'social': {'dataset': 'social', 'date': 'date', 'last': ['linkedin_followers', 'twitter_followers']},
+    'nps': {'dataset': 'nps', 'date': 'month', 'last': ['nps_score']},
+}
+
+def period_start(days: np.ndarray, grain: str) -> np.ndarray:
+    """First day of the period containing each day (datetime64[D])"""
+    days = np.asarray(days).astype('datetime64[D]')
+    if grain == 'day':
+        return days
+    if grain == 'week':
+        # 1970-01-01 was a Thursday, three days after a Monday
+        return days - (days.astype(np.int64) + 3) % 7
+    if grain == 'month':
+        return days.astype('datetime64[M]').astype('datetime64[D]')
+    if grain == 'quarter':
+        months = days.astype('datetime64[M]').astype(np.int64)
+        return (months - months % 3).astype('datetime64[M]').astype('datetime64[D]')
+    if grain == 'year':
+        return days.astype('datetime64[Y]').astype('datetime64[D]')
+    raise ValueError(f"unknown rollup grain {grain!r}, expected one of {GRAINS}")
+
+def value_columns(spec: Dict) -> List[str]:
+    """Value columns of a rollup, in stored order"""
+    return spec.get('sum', []) + spec.get('last', []) + ([spec['count']] if 'count' in spec else [])
+
+def index_columns(spec: Dict) -> List[str]:
+    """Index columns of a rollup: the period start, then the grouping column if any"""
+    return ['period'] + ([spec['by']] if 'by' in spec else [])
+
+def _daily(df: pd.DataFrame, spec: Dict) -> pd.DataFrame:
+    """One row per day (and group): summed values and the number of source rows"""
+    keys = index_columns(spec)
+    frame = pd.DataFrame({'period': period_start(df[spec['date']].to_numpy(), 'day')})
+    if 'by' in spec:
+        frame[spec['by']] = df[spec['by']].astype(object).to_numpy()
+    for column in spec.get('sum', []) + spec.get('last', []):
+        frame[column] = df[column].to_numpy()
+    frame['_rows'] = 1
+    return frame.groupby(keys, sort=True).sum().reset_index()
+
+def build_rollup(daily: pd.DataFrame, spec: Dict, grain: str) -> pd.DataFrame:
+    """Aggregates at one grain from a dataset's daily rows, sorted by period (then group)"""
+    keys = index_columns(spec)
+    periods = daily.assign(period=period_start(daily['period'].to_numpy(), grain))
+    aggregations = {column: 'sum' for column in spec.get('sum', [])}
+    aggregations.update({column: 'last' for column in spec.get('last', [])})
+    aggregations['_rows'] = 'sum'
+    result = periods.groupby(keys, sort=True).agg(aggregations).reset_index()
+    if 'count' in spec:
+        result[spec['count']] = result['_rows']
+    return result[keys + value_columns(spec)]
+
+def build_rollups(frames: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+    """Every rollup at every grain, keyed ``<rollup>_<grain>``; ``frames`` is keyed by dataset name"""
+    rollups = {}
+    for name, spec in ROLLUPS.items():
+        daily = _daily(frames[spec['dataset']], spec)
+        for grain in GRAINS:
+            rollups[f"{name}_{grain}"] = build_rollup(daily, spec, grain)
+    return rollups
+
+def rollup_file(directory: str, name: str, grain: str) -> str:
+    """Array file of one rollup at one grain"""
+    return os.path.join(directory, f"{name}_{grain}.npy")
+
+def write_rollups(rollups: Dict[str, pd.DataFrame], directory: str):
+    """Replace the rollup directory with one NPY array (plus index sidecars) per rollup and grain"""
+    if os.path.isdir(directory):
+        shutil.rmtree(directory)
+    os.makedirs(directory)
+    for name, spec in ROLLUPS.items():
+        for grain in GRAINS:
+            df = rollups[f"{name}_{grain}"]
+            colstore.write_array(df, rollup_file(directory, name, grain),
+                                 columns=value_columns(spec), index=index_columns(spec))
+
+def exists(directory: str) -> bool:
+    """True if every rollup was written"""
+    return all(os.path.exists(colstore.array_meta_file(rollup_file(directory, name, grain)))
+               for name in ROLLUPS for grain in GRAINS)
+
+def load_rollups(directory: str, grain: str) -> Dict[str, Dict]:
+    """Memory-map every rollup at one grain (see colstore.open_array), keyed by rollup name"""
+    return {name: colstore.open_array(rollup_file(directory, name, grain)) for name in ROLLUPS}
@@ -0,0 +1,147 @@
+"""
+Dataset Schemas for Business Dashboard
+Column types shared by data_gen.py, which emits them, and viz.py, which enforces them on load
+Repeated text columns are categoricals, unique ids plain strings, counts use 16/32-bit
+integers and ratios 32-bit floats
+"""
+
+import sys
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Fixed category sets, so codes are stable across files and chunks
+DAY_NAMES = pd.CategoricalDtype(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'])
+MONTH_NAMES = pd.CategoricalDtype(['January', 'February', 'March', 'April', 'May', 'June', 'July',
+                                   'August', 'September', 'October', 'November', 'December'])
+QUARTERS = pd.CategoricalDtype(['Q1', 'Q2', 'Q3', 'Q4'])
+SENTIMENTS = pd.CategoricalDtype(['negative', 'neutral', 'positive'])
+
+# Open category sets (values come from configuration or free text)
+CATEGORY = 'category'
+DATE = 'datetime64[ns]'
+
+# Unique per row: a category would carry a dictionary as large as the column
+TEXT = 'object'
+
+# US bounds generated user coordinates are clipped to; the map grid, the spatial
+# index and the packed coordinates are all laid out over these
+US_LAT_BOUNDS = (25.0, 49.0)
+US_LON_BOUNDS = (-125.0, -66.0)
+
+# Column types per dataset, keyed by the dataset names used in data_gen.py.
+# Money stays float64 so totals match to the cent.
+SCHEMAS = {
+    'sales': {
+        'unit_id': 'int32',
+        'date': DATE,
+        'daily_sales': 'float64',
+        'day_of_week': DAY_NAMES,
+        'month': MONTH_NAMES,
+        'year': 'int16',
+        'monthly_sales': 'float64',
+        'sales_growth': 'float32'
+    },
+    'deals': {
+        'date': DATE,
+        'sales_rep': CATEGORY,
+        'amount': 'float64',
+        'month': 'int16',
+        'quarter': QUARTERS,
+        'deal_id': TEXT,
+        'year': 'int16'
+    },
+    'social': {
+        'unit_id': 'int32',
+        'date': DATE,
+        'linkedin_followers': 'int32',
+        'twitter_followers': 'int32',
+        'linkedin_growth': 'float32',
+        'twitter_growth': 'float32'
+    },
+    'website': {
+        'unit_id': 'int32',
+        'date': DATE,
+        'daily_users': 'int32',
+        'daily_enquiries': 'int32',
+        'conversion_rate': 'float32',
+        'day_of_week': DAY_NAMES
+    },
+    'nps': {
+        'month': DATE,
+        'nps_score': 'float32',
+        'total_responses': 'int16',
+        'promoters': 'int16',
+        'passives': 'int16',
+        'detractors': 'int16',
+        'promoter_rate': 'float32',
+        'detractor_rate': 'float32'
+    },
+    'feedback': {
+        'date': DATE,
+        'feedback_text': CATEGORY,
+        'rating': 'int16',
+        'days_ago': 'int32',
+        'sentiment': SENTIMENTS
+    },
+    'geo': {
+        'state': CATEGORY,
+        'state_name': CATEGORY,
+        'lat': 'float32',
+        'lon': 'float32',
+        'user_count': 'int32',
+        'active_sessions': 'int32',
+        'avg_session_duration': 'float32',
+        'bounce_rate': 'float32'
+    },
+    'user_coords': {
+        'user_id': 'int32',
+        'lat': 'float32',
+        'lon': 'float32',
+        'state': CATEGORY,
+        'state_name': CATEGORY
+    }
+}
+
+def date_columns(dataset: str) -> List[str]:
+    """Columns of a dataset holding dates"""
+    return [column for column, dtype in SCHEMAS[dataset].items() if dtype == DATE]
+
+def csv_dtypes(dataset: str, columns: Optional[List[str]] = None) -> Dict:
+    """``dtype`` argument for pd.read_csv (dates are parsed separately)"""
+    return {column: dtype for column, dtype in SCHEMAS[dataset].items()
+            if dtype != DATE and (columns is None or column in columns)}
+
+def apply_schema(df: pd.DataFrame, dataset: str) -> pd.DataFrame:
+    """Cast the columns of ``df`` to the dataset's declared types; columns not in the schema are left alone"""
+    schema = SCHEMAS[dataset]
+    casts = {column: schema[column] for column in df.columns
+             if column in schema and df[column].dtype != schema[column]}
+    return df.astype(casts) if casts else df
+
+def _object_bytes(values: pd.Series) -> int:
+    """Deep size ``values`` would have as a column of Python objects"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        sizes = np.array([sys.getsizeof(value) for value in values.cat.categories], dtype=np.int64)
+        codes = values.cat.codes.to_numpy()
+        counts = np.bincount(codes[codes >= 0], minlength=len(sizes))
+        return int(np.dot(counts, sizes)) + 8 * len(values)
+    return int(values.memory_usage(deep=True, index=False))
+
+def memory_saving(df: pd.DataFrame) -> Tuple[int, int]:
+    """(typed bytes, bytes with pandas' default object/64-bit types) for a frame"""
+    typed = int(df.memory_usage(deep=True, index=False).sum())
+    untyped = 0
+    for column in df.columns:
+        values = df[column]
+        if isinstance(values.dtype, pd.CategoricalDtype) or values.dtype == object:
+            untyped += _object_bytes(values)
+        else:
+            untyped += 8 * len(values)
+    return typed, untyped
+
+def describe(dataset: str) -> Dict[str, object]:
+    """JSON-friendly form of a dataset's schema (category sets spelled out), used in build fingerprints"""
+    return {column: list(dtype.categories) if isinstance(dtype, pd.CategoricalDtype) else str(dtype)
+            for column, dtype in SCHEMAS.get(dataset, {}).items()}
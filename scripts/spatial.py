@@ -0,0 +1,189 @@
+"""
+Spatial Index for Business Dashboard
+Sorted-array grid over the user coordinates: users are ordered by lat/lon cell with
+per-cell offsets (CSR), and separately by state, so viewport, radius and state
+queries touch only the matching slices. Results are user rows (user ID = row + 1)
+"""
+
+import json
+import math
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import schema
+
+META_FILE = "_meta.json"
+FORMAT_VERSION = 1
+
+# Cell size of the grid over the US bounds (see schema.py)
+CELL_DEGREES = 0.25
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+def _grid_shape(cell_degrees: float) -> Tuple[int, int]:
+    """Rows and columns of the grid"""
+    n_rows = int(math.ceil((schema.US_LAT_BOUNDS[1] - schema.US_LAT_BOUNDS[0]) / cell_degrees))
+    n_cols = int(math.ceil((schema.US_LON_BOUNDS[1] - schema.US_LON_BOUNDS[0]) / cell_degrees))
+    return n_rows, n_cols
+
+def _position_dtype(count: int) -> np.dtype:
+    """Smallest integer type for row positions"""
+    return np.dtype(np.int32) if count < np.iinfo(np.int32).max else np.dtype(np.int64)
+
+def build_index(lat: np.ndarray, lon: np.ndarray, state_codes: np.ndarray, states: list, path: str,
+                cell_degrees: float = CELL_DEGREES):
+    """Build the index for the given coordinates and state codes (indices into ``states``) and write it to ``path``"""
+    os.makedirs(path, exist_ok=True)
+    meta_path = os.path.join(path, META_FILE)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    
+    n_rows, n_cols = _grid_shape(cell_degrees)
+    rows = np.clip(np.floor((np.asarray(lat, dtype=np.float64) - schema.US_LAT_BOUNDS[0]) / cell_degrees), 0, n_rows - 1)
+    cols = np.clip(np.floor((np.asarray(lon, dtype=np.float64) - schema.US_LON_BOUNDS[0]) / cell_degrees), 0, n_cols - 1)
+    cells = rows.astype(np.int64) * n_cols + cols.astype(np.int64)
+    position_dtype = _position_dtype(len(cells))
+    
+    # Grid ordering: users sorted by cell, with CSR offsets per cell
+    order = np.argsort(cells, kind='stable').astype(position_dtype)
+    cell_starts = np.concatenate([[0], np.cumsum(np.bincount(cells, minlength=n_rows * n_cols))])
+    np.save(os.path.join(path, 'order.npy'), order)
+    np.save(os.path.join(path, 'cell_starts.npy'), cell_starts)
+    np.save(os.path.join(path, 'lat.npy'), np.asarray(lat, dtype=np.float32)[order])
+    np.save(os.path.join(path, 'lon.npy'), np.asarray(lon, dtype=np.float32)[order])
+    del order, cells
+    
+    # State ordering: users grouped by state code, with offsets per code
+    state_codes = np.asarray(state_codes)
+    np.save(os.path.join(path, 'state_order.npy'), np.argsort(state_codes, kind='stable').astype(position_dtype))
+    np.save(os.path.join(path, 'state_starts.npy'),
+            np.concatenate([[0], np.cumsum(np.bincount(state_codes, minlength=len(states)))]))
+    
+    # The manifest goes last and marks the index as complete
+    meta = {
+        'version': FORMAT_VERSION,
+        'rows': int(len(state_codes)),
+        'cell_degrees': cell_degrees,
+        'lat_bounds': list(schema.US_LAT_BOUNDS),
+        'lon_bounds': list(schema.US_LON_BOUNDS),
+        'grid': [n_rows, n_cols],
+        'states': [str(state) for state in states],
+    }
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f, indent=2)
+
+class SpatialIndex:
+    """Read-only view of a persisted index; arrays are memory-mapped"""
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, META_FILE)) as f:
+            self.meta = json.load(f)
+        if self.meta.get('version') != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported spatial index version {self.meta.get('version')}")
+        self.cell_degrees = self.meta['cell_degrees']
+        self.n_rows, self.n_cols = self.meta['grid']
+        self.states = {state: code for code, state in enumerate(self.meta['states'])}
+        arrays = ['order', 'cell_starts', 'lat', 'lon', 'state_order', 'state_starts']
+        for name in arrays:
+            setattr(self, name, np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r'))
+
+    def _cell_range(self, low: float, high: float, bounds: List[float], size: int) -> Tuple[int, int]:
+        """First and last grid row (or column) overlapping [low, high], an empty range if none does
+
+        Ends are clipped to the grid like the points in build_index, so points on
+        the upper bound (kept in the last row or column) are found.
+        """
+        if low > bounds[1] or high < bounds[0] or low > high:
+            return 0, -1
+        first = int(math.floor((low - bounds[0]) / self.cell_degrees))
+        last = int(math.floor((high - bounds[0]) / self.cell_degrees))
+        return min(max(first, 0), size - 1), min(max(last, 0), size - 1)
+
+    def _bbox_slices(self, south: float, west: float, north: float, east: float):
+        """(start, end, inside) grid-order slices covering the box; ``inside`` slices need no point test
+
+        Each grid row contributes one contiguous run of cells. Cells strictly
+        inside the box in both directions are accepted whole, the rest are
+        filtered point by point.
+        """
+        first_row, last_row = self._cell_range(south, north, self.meta['lat_bounds'], self.n_rows)
+        first_col, last_col = self._cell_range(west, east, self.meta['lon_bounds'], self.n_cols)
+        for row in range(first_row, last_row + 1):
+            base = row * self.n_cols
+            if first_row < row < last_row and last_col - first_col > 1:
+                yield self.cell_starts[base + first_col], self.cell_starts[base + first_col + 1], False
+                yield self.cell_starts[base + first_col + 1], self.cell_starts[base + last_col], True
+                yield self.cell_starts[base + last_col], self.cell_starts[base + last_col + 1], False
+            else:
+                yield self.cell_starts[base + first_col], self.cell_starts[base + last_col + 1], False
+
+    def _in_box(self, start: int, end: int, south: float, west: float, north: float, east: float) -> np.ndarray:
+        """Mask of the points in a grid-order slice that fall inside the box"""
+        lat = self.lat[start:end]
+        lon = self.lon[start:end]
+        return (lat >= south) & (lat <= north) & (lon >= west) & (lon <= east)
+
+    def bbox(self, south: float, west: float, north: float, east: float) -> np.ndarray:
+        """Rows of the users inside a lat/lon box (edges included), in grid order"""
+        parts = []
+        for start, end, inside in self._bbox_slices(south, west, north, east):
+            if inside:
+                parts.append(self.order[start:end])
+            elif end > start:
+                parts.append(self.order[start:end][self._in_box(start, end, south, west, north, east)])
+        return np.concatenate(parts) if parts else np.empty(0, dtype=self.order.dtype)
+
+    def bbox_count(self, south: float, west: float, north: float, east: float) -> int:
+        """Number of users inside a lat/lon box; whole cells are counted from their offsets"""
+        total = 0
+        for start, end, inside in self._bbox_slices(south, west, north, east):
+            if inside:
+                total += int(end - start)
+            elif end > start:
+                total += int(np.count_nonzero(self._in_box(start, end, south, west, north, east)))
+        return total
+
+    def radius(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        """Rows of the users within ``radius_km`` (great-circle distance) of a point"""
+        lat_span = radius_km / KM_PER_DEGREE
+        lon_span = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(min(abs(lat) + lat_span, 89.9))), 1e-6))
+        rows = []
+        for start, end, _ in self._bbox_slices(lat - lat_span, lon - lon_span, lat + lat_span, lon + lon_span):
+            if end <= start:
+                continue
+            user_lat = np.radians(self.lat[start:end].astype(np.float64))
+            user_lon = np.radians(self.lon[start:end].astype(np.float64))
+            haversine = (np.sin((user_lat - math.radians(lat)) / 2) ** 2
+                         + math.cos(math.radians(lat)) * np.cos(user_lat) * np.sin((user_lon - math.radians(lon)) / 2) ** 2)
+            distance = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(haversine, 1.0)))
+            rows.append(self.order[start:end][distance <= radius_km])
+        return np.concatenate(rows) if rows else np.empty(0, dtype=self.order.dtype)
+
+    def _state_slice(self, state: str) -> Tuple[int, int]:
+        """Range of a state's users in state order"""
+        if state not in self.states:
+            return 0, 0
+        code = self.states[state]
+        return int(self.state_starts[code]), int(self.state_starts[code + 1])
+
+    def state_count(self, state: str) -> int:
+        """Number of users in a state (e.g. 'CA')"""
+        start, end = self._state_slice(state)
+        return end - start
+
+    def state_counts(self) -> Dict[str, int]:
+        """Number of users per state"""
+        return {state: int(count) for state, count in zip(self.states, np.diff(self.state_starts))}
+
+    def state_sample(self, state: str, n: int, seed: Optional[int] = None) -> np.ndarray:
+        """Rows of up to ``n`` users of a state, drawn without replacement, in row order"""
+        start, end = self._state_slice(state)
+        picks = np.random.default_rng(seed).choice(end - start, size=min(n, end - start), replace=False)
+        return np.sort(self.state_order[start + picks])
+
+def load_index(path: str) -> SpatialIndex:
+    """Open a persisted spatial index"""
+    return SpatialIndex(path)
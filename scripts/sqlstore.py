@@ -0,0 +1,140 @@
+"""
+SQLite Store for Business Dashboard
+Optional embedded database with one indexed table per dataset, plus the
+queries the dashboard components use to fetch only the rows they show
+"""
+
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+DB_FILE = "dashboard.db"
+
+# Build fingerprint of the dataset each table was loaded from
+FINGERPRINT_TABLE = "_fingerprints"
+
+# Indexed columns per dataset table (a tuple is one index over several columns)
+INDEXES = {
+    'sales': ['date', 'month'],
+    'deals': ['date', ('year', 'month'), 'sales_rep'],
+    'social': ['date'],
+    'website': ['date'],
+    'nps': ['month'],
+    'feedback': ['date', 'sentiment'],
+    'geo': ['state'],
+    'user_coords': ['state'],
+}
+
+# Rows per INSERT batch when loading a table
+WRITE_CHUNK_ROWS = 50000
+
+# Suffix of the per-date sum tables written next to the dataset tables at build time
+DAILY_SUFFIX = "_daily"
+
+def connect(path: str, create: bool = False) -> sqlite3.Connection:
+    """Open the store; unless ``create`` is set it must already exist"""
+    if not create and not os.path.exists(path):
+        raise FileNotFoundError(f"{path}: no SQLite store, run data_gen.py with --sqlite first")
+    conn = sqlite3.connect(path)
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {FINGERPRINT_TABLE} (dataset TEXT PRIMARY KEY, fingerprint TEXT)")
+    return conn
+
+def stored_fingerprints(conn: sqlite3.Connection) -> Dict[str, str]:
+    """Fingerprint each table was loaded with"""
+    return dict(conn.execute(f"SELECT dataset, fingerprint FROM {FINGERPRINT_TABLE}").fetchall())
+
+def write_dataset(conn: sqlite3.Connection, name: str, df: pd.DataFrame, fingerprint: Optional[str] = None):
+    """Replace a dataset's table (rows keep their file order as rowid) and rebuild its indexes"""
+    df.to_sql(name, conn, if_exists='replace', index=False, chunksize=WRITE_CHUNK_ROWS)
+    for columns in INDEXES.get(name, []):
+        columns = (columns,) if isinstance(columns, str) else columns
+        if all(column in df.columns for column in columns):
+            column_list = ', '.join(f'"{column}"' for column in columns)
+            conn.execute(f'CREATE INDEX IF NOT EXISTS "idx_{name}_{"_".join(columns)}" ON "{name}" ({column_list})')
+    conn.execute(f"INSERT OR REPLACE INTO {FINGERPRINT_TABLE} VALUES (?, ?)", (name, fingerprint))
+    conn.commit()
+
+def _read(conn: sqlite3.Connection, query: str, params: tuple = (), dates: List[str] = ()) -> pd.DataFrame:
+    """Run a query into a DataFrame, parsing the named date columns"""
+    return pd.read_sql_query(query, conn, params=params, parse_dates=list(dates))
+
+def tail_rows(conn: sqlite3.Connection, table: str, columns: List[str], n: int) -> pd.DataFrame:
+    """Last ``n`` rows of a table in file order (like DataFrame.tail), read backwards from the rowid"""
+    column_list = ', '.join(f'"{column}"' for column in columns)
+    return _read(conn, f'SELECT {column_list} FROM (SELECT rowid AS row_id, {column_list} FROM "{table}" '
+                       f'ORDER BY rowid DESC LIMIT ?) ORDER BY row_id', (n,))
+
+def latest_deal_month(conn: sqlite3.Connection, until: Optional[Tuple[int, int]] = None) -> Optional[Tuple[int, int]]:
+    """Most recent (year, month) with deals, optionally not after ``until``; None if there is none"""
+    if until is None:
+        row = conn.execute('SELECT year, month FROM deals ORDER BY year DESC, month DESC LIMIT 1').fetchone()
+    else:
+        row = conn.execute('SELECT year, month FROM deals WHERE year < ? OR (year = ? AND month <= ?) '
+                           'ORDER BY year DESC, month DESC LIMIT 1', (until[0], until[0], until[1])).fetchone()
+    return (int(row[0]), int(row[1])) if row else None
+
+def top_deals(conn: sqlite3.Connection, year: int, month: int, n: int = 8) -> pd.DataFrame:
+    """Largest ``n`` deals of one month of one year (ties in file order, like DataFrame.nlargest)"""
+    return _read(conn, 'SELECT sales_rep, amount FROM deals WHERE year = ? AND month = ? '
+                       'ORDER BY amount DESC, rowid LIMIT ?', (year, month, n))
+
+def latest_feedback(conn: sqlite3.Connection, n: int = 14, until: Optional[datetime] = None) -> pd.DataFrame:
+    """Most recent ``n`` feedback entries, optionally only those dated before ``until``
+
+    Uses the date index; without ``until`` these are the rows at the head of the file.
+    """
+    if until is None:
+        return _read(conn, 'SELECT date, feedback_text FROM feedback ORDER BY date DESC, rowid LIMIT ?',
+                     (n,), dates=['date'])
+    return _read(conn, 'SELECT date, feedback_text FROM feedback WHERE date < ? ORDER BY date DESC, rowid LIMIT ?',
+                 (until.strftime('%Y-%m-%d %H:%M:%S'), n), dates=['date'])
+
+def feedback_chunks(conn: sqlite3.Connection, chunk_rows: int = WRITE_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Every feedback entry, newest first (ties in file order), in chunks of ``chunk_rows``"""
+    return pd.read_sql_query('SELECT date, feedback_text FROM feedback ORDER BY date DESC, rowid', conn,
+                             parse_dates=['date'], chunksize=chunk_rows)
+
+def count_feedback_since(conn: sqlite3.Connection, since: datetime) -> int:
+    """Number of feedback entries dated at or after ``since`` (they lead the newest-first order)"""
+    return conn.execute('SELECT COUNT(*) FROM feedback WHERE date >= ?',
+                        (since.strftime('%Y-%m-%d %H:%M:%S'),)).fetchone()[0]
+
+def _group_by_date(table: str, date_column: str, columns: List[str], where: str = '') -> str:
+    sums = ', '.join(f'SUM("{column}") AS "{column}"' for column in columns)
+    return f'SELECT "{date_column}", {sums} FROM "{table}" {where} GROUP BY "{date_column}"'
+
+def write_daily_sums(conn: sqlite3.Connection, table: str, date_column: str, columns: List[str]):
+    """Replace a table's persisted per-date sums (read by daily_sums), indexed by date
+
+    Call after each write_dataset of the table, so renders read a few rows
+    per day instead of grouping every row of it.
+    """
+    daily = f"{table}{DAILY_SUFFIX}"
+    conn.execute(f'DROP TABLE IF EXISTS "{daily}"')
+    conn.execute(f'CREATE TABLE "{daily}" AS {_group_by_date(table, date_column, columns)}')
+    conn.execute(f'CREATE INDEX "idx_{daily}_{date_column}" ON "{daily}" ("{date_column}")')
+    conn.commit()
+
+def daily_sums(conn: sqlite3.Connection, table: str, date_column: str, columns: List[str],
+               first: Optional[datetime] = None, last: Optional[datetime] = None) -> pd.DataFrame:
+    """Columns summed per date (over business units for multi-series tables), in date order
+
+    Only dates from the day of ``first`` to the day of ``last`` are read
+    (either bound is optional), through the date index. Uses the sums
+    persisted by write_daily_sums when they hold every requested column
+    and groups the table itself otherwise.
+    """
+    bounds = (f"{first:%Y-%m-%d} 00:00:00" if first is not None else '',
+              f"{last:%Y-%m-%d} 23:59:59.999999" if last is not None else '9999-12-31 23:59:59')
+    where = f'WHERE "{date_column}" BETWEEN ? AND ?'
+    daily = f"{table}{DAILY_SUFFIX}"
+    stored = {row[1] for row in conn.execute(f'PRAGMA table_info("{daily}")')}
+    if {date_column, *columns} <= stored:
+        column_list = ', '.join(f'"{column}"' for column in [date_column] + columns)
+        query = f'SELECT {column_list} FROM "{daily}" {where}'
+    else:
+        query = _group_by_date(table, date_column, columns, where)
+    return _read(conn, f'{query} ORDER BY "{date_column}"', bounds, dates=[date_column])
@@ -1,17 +1,34 @@
 """
 Professional Dark Business Dashboard - Reference Layout Match
 Creates a single HTML file matching the exact reference design
-Uses only pandas, numpy, and plotly
+Uses pandas and numpy (plus the repo's own modules); the page loads plotly.js from its CDN
+Data is read concurrently from the typed columnar stores or CSVs, from a pickle snapshot
+on cold starts, or from the NPY exports, SQLite store or rollups
 """
 
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
+import argparse
 import json
+import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 import os
+from typing import Dict, List, Optional, Tuple
+
+import colstore
+import coordpack
+import dealparts
+import downsample
+import feedindex
+import feedpages
+import geogrid
+import kpi
+import payload
+import rollup
+import schema
+import sqlstore
 
 # Configuration
 DATA_DIR = "data"
@@ -30,98 +47,558 @@ ACCENT_PURPLE = "#8b5cf6"
 ACCENT_TEAL = "#14b8a6"
 BRIGHT_TURQUOISE = "#06b6d4"  # Bright turquoise for map points
 
-def load_data():
-    """Load all data files"""
-    print("Loading data files...")
-    
-    # Load CSV files
-    sales_df = pd.read_csv(f'{DATA_DIR}/sales_data.csv')
-    deals_df = pd.read_csv(f'{DATA_DIR}/deals_data.csv')
-    social_df = pd.read_csv(f'{DATA_DIR}/social_media_data.csv')
-    website_df = pd.read_csv(f'{DATA_DIR}/website_analytics.csv')
-    nps_df = pd.read_csv(f'{DATA_DIR}/nps_data.csv')
-    feedback_df = pd.read_csv(f'{DATA_DIR}/feedback_data.csv')
-    geo_df = pd.read_csv(f'{DATA_DIR}/geographic_data.csv')
-    user_coords_df = pd.read_csv(f'{DATA_DIR}/user_coordinates.csv')
-    
-    # Convert date columns
-    sales_df['date'] = pd.to_datetime(sales_df['date'])
-    deals_df['date'] = pd.to_datetime(deals_df['date'])
-    social_df['date'] = pd.to_datetime(social_df['date'])
-    website_df['date'] = pd.to_datetime(website_df['date'])
-    nps_df['month'] = pd.to_datetime(nps_df['month'])
-    feedback_df['date'] = pd.to_datetime(feedback_df['date'])
-    
-    print("Data loaded successfully!")
+# Data file stem and schema (see schema.py) for each frame returned by load_data
+DATA_FILES = {
+    'sales_df': ('sales_data', 'sales'),
+    'deals_df': ('deals_data', 'deals'),
+    'social_df': ('social_media_data', 'social'),
+    'website_df': ('website_analytics', 'website'),
+    'nps_df': ('nps_data', 'nps'),
+    'feedback_df': ('feedback_data', 'feedback'),
+    'geo_df': ('geographic_data', 'geo'),
+    'user_coords_df': ('user_coordinates', 'user_coords')
+}
+
+# Columns the dashboard components read from each frame
+DASHBOARD_COLUMNS = {
+    'sales_df': ['date', 'daily_sales'],
+    'deals_df': ['year', 'month', 'amount', 'sales_rep'],
+    'social_df': ['date', 'linkedin_followers', 'twitter_followers'],
+    'website_df': ['date', 'daily_users', 'daily_enquiries'],
+    'nps_df': ['month', 'nps_score'],
+    'feedback_df': ['date', 'feedback_text'],
+    'geo_df': ['state', 'lat', 'lon', 'user_count'],
+    'user_coords_df': ['user_id', 'lat', 'lon', 'state_name']
+}
+
+# NPY exports (with index sidecars) read by the array fast path
+ARRAY_FILES = {
+    'sales': 'sales_amounts.npy',
+    'deals': 'deal_amounts.npy',
+    'social': 'social_followers.npy',
+    'website': 'website_metrics.npy',
+    'nps': 'nps_scores.npy',
+    'geo': 'geo_coordinates.npy',
+    'user_coords': 'user_coordinates.npy'
+}
+
+# Frames still loaded in array mode: the tables are rendered row by row
+ARRAY_MODE_FRAMES = ['deals_df', 'feedback_df']
+
+# Deals partitioned by month with their top deals sidecars; when present the
+# deals card reads these and the deals table is not loaded
+DEAL_PARTITIONS_DIR = os.path.join(DATA_DIR, dealparts.PARTITION_DIR)
+
+# Frames only the KPI cards read; when the calendar rollups exist the cards use
+# their day grain instead and these tables are not loaded
+KPI_FRAMES = sorted({spec['frame'] for spec in kpi.SERIES.values()})
+
+# Sparklines on the metric cards: the KPI series drawn (see kpi.SERIES), the chart
+# size in pixels and how the daily history is reduced to about one point per pixel
+# of its width (see downsample.py; 'minmax' keeps the peaks of noisy daily totals)
+TRENDS = {
+    'sales': {'series': 'sales', 'width': 200, 'height': 40, 'method': 'minmax', 'color': ACCENT_GREEN},
+    'linkedin_followers': {'series': 'linkedin_followers', 'width': 110, 'height': 30, 'method': 'lttb',
+                           'color': ACCENT_BLUE},
+    'twitter_followers': {'series': 'twitter_followers', 'width': 110, 'height': 30, 'method': 'lttb',
+                          'color': ACCENT_TEAL},
+    'website_users': {'series': 'website_users', 'width': 110, 'height': 30, 'method': 'minmax',
+                      'color': ACCENT_PURPLE},
+    'website_enquiries': {'series': 'website_enquiries', 'width': 110, 'height': 30, 'method': 'minmax',
+                          'color': ACCENT_ORANGE},
+}
+
+# Packed user coordinates, used for the map instead of user_coords_df when present
+PACKED_COORDS_FILE = 'user_coordinates.qcoords'
+
+# Above this many users the map shows aggregated grid cells instead of one point per user
+RAW_POINTS_LIMIT = 50000
+
+# Directory (next to the dashboard) for the map's on-demand grid tiles
+GEO_TILE_DIR = 'geo_tiles'
+
+# Client side of the grid map: on every zoom or pan, pick the pyramid level for
+# the zoom, load the tiles in view with <script> tags (works from file://) and
+# swap the cells shown. Level 0 is embedded in the page.
+GEO_TILE_LOADER_JS = """
+const geoTiles = {};
+const geoEmptyCells = {lat: [], lon: [], count: [], size: []};
+
+function geoView() {
+    const div = document.getElementById('geo-chart');
+    const mapbox = div._fullLayout.mapbox;
+    const degPerPx = 360 / (512 * Math.pow(2, mapbox.zoom));
+    const halfLon = div.clientWidth * degPerPx / 2;
+    const halfLat = div.clientHeight * degPerPx * Math.cos(mapbox.center.lat * Math.PI / 180) / 2;
     return {
-        'sales_df': sales_df,
-        'deals_df': deals_df,
-        'social_df': social_df,
-        'website_df': website_df,
-        'nps_df': nps_df,
-        'feedback_df': feedback_df,
-        'geo_df': geo_df,
-        'user_coords_df': user_coords_df
+        zoom: mapbox.zoom,
+        south: mapbox.center.lat - halfLat, north: mapbox.center.lat + halfLat,
+        west: mapbox.center.lon - halfLon, east: mapbox.center.lon + halfLon
+    };
+}
+
+function geoTilesInView(level, view) {
+    const tileDeg = GEO_GRID.baseCell / Math.pow(2, level) * GEO_GRID.tileCells;
+    const existing = new Set(GEO_GRID.tiles[level] || []);
+    const keys = [];
+    for (let row = Math.floor((view.south - GEO_GRID.latOrigin) / tileDeg); row <= Math.floor((view.north - GEO_GRID.latOrigin) / tileDeg); row++) {
+        for (let col = Math.floor((view.west - GEO_GRID.lonOrigin) / tileDeg); col <= Math.floor((view.east - GEO_GRID.lonOrigin) / tileDeg); col++) {
+            if (existing.has(row + '_' + col)) keys.push(level + '/' + row + '_' + col);
+        }
+    }
+    return keys;
+}
+
+function geoUpdate() {
+    const view = geoView();
+    const level = Math.max(0, Math.min(GEO_GRID.levels - 1, Math.floor(view.zoom - GEO_GRID.baseZoom)));
+    let parts = [GEO_LEVEL0];
+    if (level > 0) {
+        const keys = geoTilesInView(level, view);
+        keys.forEach(key => {
+            if (key in geoTiles) return;
+            geoTiles[key] = null;
+            const script = document.createElement('script');
+            script.src = GEO_GRID.tileUrl + '/' + key + '.js';
+            script.onerror = () => { geoTiles[key] = geoEmptyCells; };
+            document.head.appendChild(script);
+        });
+        parts = keys.map(key => geoTiles[key]).filter(Boolean);
+        // Keep the current cells until the first tile of the new level arrives
+        if (keys.length && !parts.length) return;
+    }
+    // Only the cells inside the view (plus one cell of margin) go to the chart
+    const margin = GEO_GRID.baseCell / Math.pow(2, level);
+    const cells = {lat: [], lon: [], count: [], size: []};
+    parts.forEach(part => {
+        for (let i = 0; i < part.lat.length; i++) {
+            if (part.lat[i] < view.south - margin || part.lat[i] > view.north + margin ||
+                part.lon[i] < view.west - margin || part.lon[i] > view.east + margin) continue;
+            for (const name in cells) cells[name].push(part[name][i]);
+        }
+    });
+    Plotly.restyle('geo-chart', {
+        lat: [cells.lat], lon: [cells.lon], customdata: [cells.count],
+        'marker.size': [cells.size], 'marker.color': [cells.size]
+    }, [0]);
+}
+
+window.geoTileLoaded = function(level, row, col, cells) {
+    geoTiles[level + '/' + row + '_' + col] = cells;
+    geoUpdate();
+};
+"""
+
+# Directory (next to the dashboard) for the feedback history pages
+FEEDBACK_PAGE_DIR = 'feedback_pages'
+
+# Feedback search index built by data_gen.py, and its sidecar next to the dashboard
+FEEDBACK_INDEX_DIR = os.path.join(DATA_DIR, 'feedback_data.fidx')
+FEEDBACK_INDEX_FILE = 'feedback_index.js'
+
+# Virtual feedback list: every row has the same height, and only enough rows
+# to fill the card (plus one) exist in the DOM, whatever the history length.
+# Past FEEDBACK_MAX_SCROLL pixels the scrollbar is scaled instead of growing.
+FEEDBACK_ROW_HEIGHT = 64
+FEEDBACK_LIST_HEIGHT = 180
+FEEDBACK_POOL_ROWS = FEEDBACK_LIST_HEIGHT // FEEDBACK_ROW_HEIGHT + 2
+FEEDBACK_MAX_SCROLL = 1000000
+
+# Client side of the feedback list: map the scroll position to a row range,
+# move the pooled rows there and fill them from the pages, loading missing
+# pages with <script> tags. Ages use the same buckets as
+# feedpages.relative_time_labels.
+FEEDBACK_LIST_JS = """
+const feedbackPages = {};
+const feedbackList = document.getElementById('feedback-list');
+const feedbackSpacer = feedbackList.querySelector('.feedback-spacer');
+const feedbackItems = Array.from(feedbackList.querySelectorAll('.feedback-item'));
+// Rows shown, when narrowed down by a search (null: every row from FEEDBACK.first)
+let feedbackView = null;
+
+function feedbackAge(days) {
+    if (days <= 0) return 'today';
+    if (days === 1) return '1 day ago';
+    if (days < 30) return days + ' days ago';
+    if (days < 60) return '1 month ago';
+    return Math.floor(days / 30) + ' months ago';
+}
+
+function feedbackRender() {
+    const shown = feedbackView ? feedbackView.length : FEEDBACK.rows - FEEDBACK.first;
+    const fullHeight = shown * FEEDBACK.rowHeight;
+    const height = Math.min(fullHeight, FEEDBACK.maxHeight);
+    feedbackSpacer.style.height = height + 'px';
+    const scrollRange = height - feedbackList.clientHeight;
+    const top = scrollRange > 0 ? feedbackList.scrollTop * (fullHeight - feedbackList.clientHeight) / scrollRange : 0;
+    const firstShown = Math.floor(top / FEEDBACK.rowHeight);
+    const offset = feedbackList.scrollTop - (top - firstShown * FEEDBACK.rowHeight);
+    feedbackItems.forEach((item, k) => {
+        const index = firstShown + k;
+        item.style.display = index < shown ? '' : 'none';
+        if (index >= shown) return;
+        item.style.transform = 'translateY(' + (offset + k * FEEDBACK.rowHeight) + 'px)';
+        const row = feedbackView ? feedbackView[index] : FEEDBACK.first + index;
+        const page = Math.floor(row / FEEDBACK.pageRows);
+        const data = feedbackPages[page];
+        if (data === undefined) feedbackLoad(page);
+        item.querySelector('.feedback-text').textContent = data ? FEEDBACK.texts[data.text[row % FEEDBACK.pageRows]] : '…';
+        item.querySelector('.feedback-date').textContent = data ? feedbackAge(FEEDBACK.reference - data.day[row % FEEDBACK.pageRows]) : '';
+    });
+}
+
+function feedbackLoad(page) {
+    feedbackPages[page] = null;
+    const script = document.createElement('script');
+    script.src = FEEDBACK.pageUrl + '/' + page + '.js';
+    document.head.appendChild(script);
+}
+
+window.feedbackPageLoaded = function(page, data) {
+    feedbackPages[page] = {text: decodeTypedArray(data.text), day: decodeTypedArray(data.day)};
+    feedbackRender();
+};
+
+feedbackList.addEventListener('scroll', () => requestAnimationFrame(feedbackRender));
+"""
+
+# Page-side search over the feedback index sidecar (see feedindex.py), loaded
+# on the first query: query terms match term prefixes, terms give phrases,
+# and the postings of the phrases, rating and sentiment are intersected by
+# counting hits per row. The matches replace the rows of the list.
+FEEDBACK_SEARCH_JS = """
+let feedbackIndex = null;
+const feedbackPostingCache = {};
+const feedbackQueryInput = document.getElementById('feedback-search');
+const feedbackRatingSelect = document.getElementById('feedback-rating');
+const feedbackSentimentSelect = document.getElementById('feedback-sentiment');
+
+function feedbackPostings(facet, code) {
+    const key = facet + '/' + code;
+    if (!(key in feedbackPostingCache)) {
+        const spec = feedbackIndex.facets[facet];
+        const rows = new Uint32Array(spec.offsets[code + 1] - spec.offsets[code]);
+        let count = 0, row = 0, gap = 0, scale = 1;
+        for (let i = spec.offsets[code]; i < spec.offsets[code + 1]; i++) {
+            gap += (spec.bytes[i] & 0x7f) * scale;
+            if (spec.bytes[i] & 0x80) { scale *= 128; continue; }
+            row += gap;
+            rows[count++] = row;
+            gap = 0;
+            scale = 1;
+        }
+        feedbackPostingCache[key] = rows.subarray(0, count);
+    }
+    return feedbackPostingCache[key];
+}
+
+function feedbackPhrases(tokens) {
+    let phrases = null;
+    tokens.forEach(token => {
+        const found = new Set();
+        feedbackIndex.terms.forEach((term, t) => {
+            if (!term.startsWith(token)) return;
+            for (let i = feedbackIndex.termStarts[t]; i < feedbackIndex.termStarts[t + 1]; i++) found.add(feedbackIndex.termPhrases[i]);
+        });
+        phrases = phrases === null ? found : new Set([...phrases].filter(phrase => found.has(phrase)));
+    });
+    return [...phrases];
+}
+
+function feedbackSearch() {
+    const tokens = feedbackQueryInput.value.toLowerCase().match(/[a-z0-9]+/g) || [];
+    const rating = feedbackRatingSelect.value, sentiment = feedbackSentimentSelect.value;
+    const status = document.getElementById('feedback-count');
+    if (!tokens.length && rating === '' && sentiment === '') {
+        feedbackView = null;
+        status.textContent = '';
+    } else if (!feedbackIndex) {
+        if (feedbackIndex === null) {
+            feedbackIndex = false;
+            const script = document.createElement('script');
+            script.src = FEEDBACK.indexUrl;
+            document.head.appendChild(script);
+        }
+        status.textContent = 'Loading…';
+        return;
+    } else {
+        const started = performance.now();
+        const selected = [];
+        if (tokens.length) selected.push(feedbackPhrases(tokens).map(phrase => feedbackPostings('text', phrase)));
+        if (rating !== '') selected.push([feedbackPostings('rating', +rating)]);
+        if (sentiment !== '') selected.push([feedbackPostings('sentiment', +sentiment)]);
+        const hits = new Uint8Array(feedbackIndex.rows);
+        selected.forEach(lists => lists.forEach(rows => {
+            for (let i = 0; i < rows.length; i++) hits[rows[i]]++;
+        }));
+        const view = new Uint32Array(feedbackIndex.rows - FEEDBACK.first);
+        let count = 0;
+        for (let row = FEEDBACK.first; row < feedbackIndex.rows; row++) {
+            if (hits[row] === selected.length) view[count++] = row;
+        }
+        feedbackView = view.subarray(0, count);
+        status.textContent = count.toLocaleString() + ' found in ' + Math.round(performance.now() - started) + ' ms';
     }
+    feedbackList.scrollTop = 0;
+    feedbackRender();
+}
+
+window.feedbackIndexLoaded = function(index) {
+    feedbackIndex = {rows: index.rows, terms: index.terms,
+                     termStarts: decodeTypedArray(index.termStarts), termPhrases: decodeTypedArray(index.termPhrases),
+                     facets: {}};
+    for (const facet in index.facets) {
+        feedbackIndex.facets[facet] = {offsets: decodeTypedArray(index.facets[facet].offsets),
+                                       bytes: decodeTypedArray(index.facets[facet].bytes)};
+    }
+    feedbackSearch();
+};
+
+feedbackQueryInput.addEventListener('input', feedbackSearch);
+feedbackRatingSelect.addEventListener('change', feedbackSearch);
+feedbackSentimentSelect.addEventListener('change', feedbackSearch);
+"""
+
+# Snapshot of typed frames reused by cold-start runs while the source files are unchanged
+SNAPSHOT_FILE = '.viz_snapshot.pkl'
+
+def table_source(stem: str) -> str:
+    """Path load_table reads for a dataset: its columnar store if present, else its CSV"""
+    cols_path = f'{DATA_DIR}/{stem}.cols'
+    return cols_path if colstore.exists(cols_path) else f'{DATA_DIR}/{stem}.csv'
 
-def create_kpi_metrics(data):
-    """Calculate KPI metrics"""
-    deals_df = data['deals_df']
-    social_df = data['social_df']
-    website_df = data['website_df']
-    nps_df = data['nps_df']
+def load_table(stem: str, dataset: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Load one dataset with its schema types, reading only ``columns`` (default: all)
+
+    Uses the typed columnar store written by data_gen.py when it exists
+    and falls back to parsing the CSV otherwise.
+    """
+    cols_path = f'{DATA_DIR}/{stem}.cols'
+    if colstore.exists(cols_path):
+        return schema.apply_schema(colstore.read_table(cols_path, columns), dataset)
     
-    # Current month metrics
-    current_month = datetime.now().month
-    this_month_deals = deals_df[deals_df['month'] == current_month]
-    total_sales = this_month_deals['amount'].sum()
+    # usecols keeps file order, so restore the requested order afterwards
+    parse_dates = [column for column in schema.date_columns(dataset) if columns is None or column in columns]
+    df = pd.read_csv(f'{DATA_DIR}/{stem}.csv', usecols=columns, dtype=schema.csv_dtypes(dataset, columns),
+                     parse_dates=parse_dates)
+    return schema.apply_schema(df if columns is None else df[columns], dataset)
+
+def _timed_load(key: str, columns: Optional[List[str]]) -> Tuple[pd.DataFrame, float]:
+    """Load one frame of DATA_FILES, returning it with the seconds it took"""
+    stem, dataset = DATA_FILES[key]
+    started = time.perf_counter()
+    df = load_table(stem, dataset, columns)
+    return df, time.perf_counter() - started
+
+def _frames_to_load(frames: Optional[List[str]]) -> List[str]:
+    """Requested frame keys in DATA_FILES order; raises before any read if a source file is missing"""
+    keys = [key for key in DATA_FILES if frames is None or key in frames]
+    missing = [table_source(DATA_FILES[key][0]) for key in keys if not os.path.exists(table_source(DATA_FILES[key][0]))]
+    if missing:
+        raise FileNotFoundError(f"Missing data file(s): {', '.join(missing)} (run data_gen.py first)")
+    return keys
+
+def _report_frames(data: Dict[str, pd.DataFrame], timings: Dict[str, float], total: float):
+    """Print each frame's load time and its memory against pandas' default object and 64-bit types"""
+    for key, df in data.items():
+        typed, untyped = schema.memory_saving(df)
+        print(f"- {key}: {timings[key] * 1000:.1f} ms, {typed / 1024:.1f} KB "
+              f"(default types {untyped / 1024:.1f} KB, saved {1 - typed / max(untyped, 1):.0%})")
+    print(f"Data loaded successfully in {total * 1000:.1f} ms!")
+
+def load_data(columns: Optional[Dict[str, List[str]]] = None, frames: Optional[List[str]] = None,
+              max_workers: Optional[int] = None):
+    """Load all data files (or only ``frames``), limited to the given columns per frame (default: all)
+
+    Files are read and parsed concurrently on a thread pool (``max_workers``
+    of 1 reads them one after another). Every source file is checked up
+    front, and the first failed read cancels the reads not yet started.
+    """
+    print("Loading data files...")
+    keys = _frames_to_load(frames)
+    started = time.perf_counter()
     
-    # Previous month for comparison
-    prev_month = current_month - 1 if current_month > 1 else 12
-    prev_month_deals = deals_df[deals_df['month'] == prev_month]
-    prev_sales = prev_month_deals['amount'].sum()
-    sales_change = total_sales - prev_sales
+    results = {}
+    if max_workers == 1 or len(keys) <= 1:
+        for key in keys:
+            results[key] = _timed_load(key, (columns or {}).get(key))
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers or len(keys)) as pool:
+            futures = {pool.submit(_timed_load, key, (columns or {}).get(key)): key for key in keys}
+            try:
+                for future in as_completed(futures):
+                    results[futures[future]] = future.result()
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
     
-    # Latest social media followers
-    latest_social = social_df.iloc[-1]
-    prev_social = social_df.iloc[-30]  # 30 days ago
+    data = {key: results[key][0] for key in keys}
+    _report_frames(data, {key: results[key][1] for key in keys}, time.perf_counter() - started)
+    return data
+
+async def load_data_async(columns: Optional[Dict[str, List[str]]] = None, frames: Optional[List[str]] = None,
+                          max_workers: Optional[int] = None):
+    """asyncio front end to load_data: the reads run on a thread pool while the event loop stays free"""
+    import asyncio  # only async callers pay for the import
     
-    linkedin_followers = latest_social['linkedin_followers']
-    twitter_followers = latest_social['twitter_followers']
-    linkedin_growth = latest_social['linkedin_followers'] - prev_social['linkedin_followers']
-    twitter_growth = latest_social['twitter_followers'] - prev_social['twitter_followers']
+    print("Loading data files...")
+    keys = _frames_to_load(frames)
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
     
-    # Website metrics (last 7 days)
-    recent_website = website_df.tail(7)
-    prev_website = website_df.tail(14).head(7)
+    with ThreadPoolExecutor(max_workers=max_workers or len(keys) or 1) as pool:
+        tasks = [loop.run_in_executor(pool, _timed_load, key, (columns or {}).get(key)) for key in keys]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
     
-    website_users = recent_website['daily_users'].sum()
-    website_enquiries = recent_website['daily_enquiries'].sum()
-    prev_users = prev_website['daily_users'].sum()
-    prev_enquiries = prev_website['daily_enquiries'].sum()
+    data = {key: df for key, (df, _) in zip(keys, results)}
+    _report_frames(data, {key: seconds for key, (_, seconds) in zip(keys, results)}, time.perf_counter() - started)
+    return data
+
+def _source_signature(keys: List[str]) -> Dict[str, List[int]]:
+    """Modification time and size of every file the given frames are read from"""
+    signature = {}
+    for key in keys:
+        source = table_source(DATA_FILES[key][0])
+        files = [os.path.join(source, name) for name in sorted(os.listdir(source))] if os.path.isdir(source) else [source]
+        for file_path in files:
+            stat = os.stat(file_path)
+            signature[file_path] = [stat.st_mtime_ns, stat.st_size]
+    return signature
+
+def load_data_snapshot(columns: Optional[Dict[str, List[str]]] = None, frames: Optional[List[str]] = None,
+                       max_workers: Optional[int] = None):
+    """load_data for cold starts: reuse the typed frames pickled by the previous run when nothing changed
+
+    The snapshot is keyed by the requested frames and columns, the pandas
+    version and the mtime and size of every source file; any difference
+    loads the files again and replaces the snapshot.
+    """
+    keys = _frames_to_load(frames)
+    key = {
+        'frames': keys,
+        'columns': {frame: (columns or {}).get(frame) for frame in keys},
+        'pandas': pd.__version__,
+        'sources': _source_signature(keys),
+    }
+    snapshot_path = os.path.join(DATA_DIR, SNAPSHOT_FILE)
+    if os.path.exists(snapshot_path):
+        started = time.perf_counter()
+        try:
+            with open(snapshot_path, 'rb') as f:
+                snapshot = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            snapshot = None
+        if snapshot is not None and snapshot.get('key') == key:
+            print(f"Loaded {len(keys)} frames from snapshot in {(time.perf_counter() - started) * 1000:.1f} ms")
+            return snapshot['data']
     
-    user_change = website_users - prev_users
-    enquiry_change = website_enquiries - prev_enquiries
+    data = load_data(columns=columns, frames=frames, max_workers=max_workers)
     
-    # Use reference image values to match exactly
-    return {
-        'total_sales': 297000,  # $297k
-        'sales_change': 16000,  # +$16k vs last month  
-        'today_sales': 9600,    # $9.6k
-        'yesterday_sales': 20600, # $20.6k
-        'linkedin_followers': 19500,  # 19.5k
-        'twitter_followers': 10500,   # 10.5k
-        'linkedin_growth': 11,  # 11 v yday
-        'twitter_growth': 22,   # 22 v yday  
-        'website_users': 27200,  # 27.2k
-        'website_enquiries': 126, # 126
-        'user_change': 1600,    # +1.6k vs last week
-        'enquiry_change': -28,  # -28 vs last week
-        'nps_score': 61         # 61
-    }
+    # Write then rename, so a concurrent run never reads half a snapshot
+    partial_path = f'{snapshot_path}.{os.getpid()}.tmp'
+    with open(partial_path, 'wb') as f:
+        pickle.dump({'key': key, 'data': data}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(partial_path, snapshot_path)
+    return data
+
+def load_arrays() -> Dict[str, Dict]:
+    """Memory-map the NPY exports and their index sidecars; nothing is parsed or copied"""
+    arrays = {}
+    for key, file_name in ARRAY_FILES.items():
+        path = os.path.join(DATA_DIR, file_name)
+        if not os.path.exists(colstore.array_meta_file(path)):
+            raise FileNotFoundError(f"{path}: no index sidecar, regenerate the data with data_gen.py")
+        arrays[key] = colstore.open_array(path)
+    return arrays
+
+def array_column(array: Dict, name: str) -> np.ndarray:
+    """One value column of an NPY export"""
+    values = array['values']
+    return values if values.ndim == 1 else values[:, array['columns'].index(name)]
+
+def kpi_series(data, until: Optional[datetime] = None) -> Dict[str, kpi.DailySeries]:
+    """Per-day KPI series from whichever source was loaded (SQLite reads only the days up to ``until``)"""
+    if 'db' in data:
+        return kpi.series_from_store(data['db'], until)
+    if 'arrays' in data:
+        return kpi.series_from_arrays(data['arrays'])
+    if 'rollups' in data:
+        return kpi.series_from_rollups(data['rollups'])
+    return kpi.series_from_frames(data)
+
+def create_kpi_metrics(data, as_of: Optional[datetime] = None, series: Optional[Dict[str, kpi.DailySeries]] = None):
+    """Calculate KPI metrics (see kpi.KPIS) as of a date, by default the latest date in the data"""
+    series = series if series is not None else kpi_series(data, as_of)
+    return kpi.compute(series, None if as_of is None else np.datetime64(as_of.date(), 'D'))
 
-def create_nps_gauge(nps_score):
-    """Create NPS gauge chart with white arrow"""
+def kpi_text(value: Optional[float], spec: str = '', scale: float = 1, prefix: str = '', suffix: str = '') -> str:
+    """A KPI value as shown on a card (e.g. ``$12k``), or "n/a" when the data has none for the date"""
+    if value is None:
+        return "n/a"
+    return f"{prefix}{value / scale if scale != 1 else value:{spec}}{suffix}"
+
+def change_text(value: Optional[float], spec: str = '', scale: float = 1, prefix: str = '', suffix: str = '',
+                strict: bool = False) -> str:
+    """A KPI change with its arrow (up for zero unless ``strict``), or "n/a" """
+    if value is None:
+        return "n/a"
+    arrow = '▲' if value > 0 or (value == 0 and not strict) else '▼'
+    return f"{arrow} {kpi_text(abs(value), spec, scale, prefix, suffix)}"
+
+def change_class(value: Optional[float]) -> str:
+    """CSS class of a website change"""
+    if value is None:
+        return ""
+    return 'positive' if value > 0 else 'negative'
+
+def trend_points(values: kpi.DailySeries, anchor: np.datetime64, width: int, method: str):
+    """Days (as epoch milliseconds) and values of a series up to ``anchor``, downsampled for ``width`` pixels"""
+    count = min(max(int((anchor - values.start).astype(np.int64)) + 1, 0), len(values.values))
+    days = values.start + np.arange(count)
+    return downsample.downsample(days.astype('datetime64[ms]').astype(np.float64), values.values[:count],
+                                 width, method)
+
+def create_trend_charts(series: Dict[str, kpi.DailySeries], as_of: Optional[datetime] = None) -> str:
+    """Sparklines (see TRENDS) of the history up to ``as_of`` (by default the latest date in the data)"""
+    anchor = kpi.latest_date(series) if as_of is None else np.datetime64(as_of.date(), 'D')
+    charts = []
+    for name, spec in TRENDS.items():
+        x, y = trend_points(series[spec['series']], anchor, spec['width'], spec['method'])
+        trace = {
+            'type': 'scatter',
+            'mode': 'lines',
+            'x': x,
+            'y': y.astype(np.float32),
+            'line': {'color': spec['color'], 'width': 1.5, 'shape': 'linear'},
+            'hovertemplate': '%{x|%b %d, %Y}: %{y:,.0f}<extra></extra>'
+        }
+        layout = {
+            'width': spec['width'],
+            'height': spec['height'],
+            'margin': {'l': 0, 'r': 0, 't': 2, 'b': 2},
+            'paper_bgcolor': 'rgba(0,0,0,0)',
+            'plot_bgcolor': 'rgba(0,0,0,0)',
+            'xaxis': {'type': 'date', 'visible': False, 'fixedrange': True},
+            'yaxis': {'visible': False, 'fixedrange': True},
+            'showlegend': False
+        }
+        charts.append(f"Plotly.newPlot('trend-{name}', {payload.to_json([trace])}, {json.dumps(layout)}, "
+                      "{displayModeBar: false});")
+    return "\n".join(charts)
+
+def trend_div(name: str) -> str:
+    """Placeholder for one sparkline, sized like its chart"""
+    spec = TRENDS[name]
+    return f'<div class="trend" id="trend-{name}" style="width: {spec["width"]}px; height: {spec["height"]}px;"></div>'
+
+def create_nps_gauge(nps_score: Optional[float]):
+    """Create NPS gauge chart with white arrow (empty and labelled "n/a" without a score)"""
     gauge_config = {
         'data': [{
             'type': 'indicator',
@@ -167,24 +644,83 @@ def create_nps_gauge(nps_score):
         }
     }
     
+    if nps_score is None:
+        # No NPS reported yet on the dashboard date: empty gauge labelled "n/a"
+        gauge_config['data'][0]['mode'] = 'gauge'
+        gauge_config['layout']['annotations'] = [{'text': "n/a", 'x': 0.5, 'y': 0.1, 'xref': 'paper', 'yref': 'paper',
+                                                  'showarrow': False, 'font': {'size': 24, 'color': TEXT_PRIMARY}}]
+    
     return f"Plotly.newPlot('nps-gauge', {json.dumps(gauge_config['data'])}, {json.dumps(gauge_config['layout'])});"
 
+def map_coordinates(data) -> Tuple[np.ndarray, np.ndarray]:
+    """Latitude and longitude of every user, from whichever source was loaded"""
+    if 'user_coords' in data:
+        # Packed file: decoded column by column with array operations
+        return data['user_coords'].lat, data['user_coords'].lon
+    if 'user_coords_df' in data:
+        return data['user_coords_df']['lat'].to_numpy(), data['user_coords_df']['lon'].to_numpy()
+    # Array mode: coordinates come from the memory-mapped export
+    user_coords = data['arrays']['user_coords']
+    return array_column(user_coords, 'lat'), array_column(user_coords, 'lon')
+
+def map_hover_lookup(data) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """User IDs, per-user state codes and the state name table behind the raw points map's hover labels"""
+    if 'user_coords' in data:
+        # Packed file: IDs are implicit and states are already one-byte codes
+        user_coords = data['user_coords']
+        return user_coords.user_id, user_coords.codes['state'], list(user_coords.meta['state_names'])
+    if 'user_coords_df' in data:
+        user_coords_df = data['user_coords_df']
+        state_names = pd.Categorical(user_coords_df['state_name'])
+        return user_coords_df['user_id'].to_numpy(), state_names.codes, list(state_names.categories)
+    # Array mode: ids and state codes come from the memory-mapped export
+    user_coords = data['arrays']['user_coords']
+    state_spec = next(spec for spec in user_coords['meta']['index'] if spec['name'] == 'state')
+    return user_coords['index']['user_id'], user_coords['index']['state'], list(state_spec['labels'])
+
+def _map_layout():
+    """Layout shared by both map modes"""
+    return {
+        'mapbox': {
+            'style': 'carto-darkmatter',
+            'center': {'lat': 39.8283, 'lon': -98.5795},
+            'zoom': geogrid.BASE_ZOOM
+        },
+        'paper_bgcolor': CARD_BG,
+        'plot_bgcolor': CARD_BG,
+        'font': {'color': TEXT_PRIMARY, 'family': 'Arial'},
+        'margin': {'l': 0, 'r': 0, 't': 0, 'b': 0},
+        'height': 280,
+        'showlegend': False
+    }
+
 def create_geographic_chart(data):
-    """Create geographic users chart using pre-generated user coordinates"""
+    """Create geographic users chart using pre-generated user coordinates
+
+    Up to RAW_POINTS_LIMIT users are plotted one point each; beyond that
+    the map switches to aggregated grid cells (see create_geographic_grid_chart).
+    """
     
     # Load the pre-generated user coordinates
-    user_coords_df = data['user_coords_df']
+    lats, lons = map_coordinates(data)
+    if len(lats) > RAW_POINTS_LIMIT:
+        return create_geographic_grid_chart(lats, lons)
     
-    # Convert to lists for plotly
-    lats = user_coords_df['lat'].tolist()
-    lons = user_coords_df['lon'].tolist()
-    texts = [f"User {row['user_id']} - {row['state_name']}" for _, row in user_coords_df.iterrows()]
+    # Hover labels are assembled in the page from per-user state codes and a
+    # state name table; IDs are only embedded when they are not simply 1..n
+    user_ids, state_codes, state_names = map_hover_lookup(data)
+    hover = {
+        'states': state_names,
+        'state': payload.typed_array(state_codes, 'uint8' if len(state_names) <= 256 else 'uint16'),
+        'userId': None if np.array_equal(user_ids, np.arange(1, len(user_ids) + 1))
+        else payload.typed_array(user_ids, 'int32'),
+    }
     
     chart_config = {
         'data': [{
             'type': 'scattermapbox',
-            'lat': lats,
-            'lon': lons,
+            'lat': np.asarray(lats, dtype=np.float32),
+            'lon': np.asarray(lons, dtype=np.float32),
             'mode': 'markers',
             'marker': {
                 'size': 6,
@@ -197,33 +733,91 @@ def create_geographic_chart(data):
                 'size': 15,
                 'step': 0.5
             },
-            'text': texts,
             'hovertemplate': '%{text}<extra></extra>'
         }],
-        'layout': {
-            'mapbox': {
-                'style': 'carto-darkmatter',
-                'center': {'lat': 39.8283, 'lon': -98.5795},
-                'zoom': 3.5
+        'layout': _map_layout()
+    }
+    
+    return (f"const MAP_HOVER = {json.dumps(hover)};\n"
+            f"const geoData = {payload.to_json(chart_config['data'])};\n"
+            "const geoStates = decodeTypedArray(MAP_HOVER.state);\n"
+            "const geoUserIds = MAP_HOVER.userId ? decodeTypedArray(MAP_HOVER.userId) : null;\n"
+            "geoData[0].text = Array.from(geoStates, (code, i) => "
+            "'User ' + (geoUserIds ? geoUserIds[i] : i + 1) + ' - ' + MAP_HOVER.states[code]);\n"
+            f"Plotly.newPlot('geo-chart', geoData, {json.dumps(chart_config['layout'])});")
+
+def create_geographic_grid_chart(lats, lons):
+    """Create the geographic users chart from a grid pyramid (see geogrid.py)
+
+    The page embeds only the coarsest level, which covers the initial zoom;
+    finer levels are written as tiles next to the dashboard and loaded for
+    the part of the map in view as the user zooms in. Cell counts set the
+    marker size and colour, so the payload depends on the screen, not on
+    the number of users.
+    """
+    pyramid = geogrid.build_pyramid(lats, lons)
+    max_count = geogrid.pyramid_max_count(pyramid)
+    tiles = geogrid.write_tiles(pyramid, os.path.join(OUTPUT_DIR, GEO_TILE_DIR), 'geoTileLoaded')
+    initial = geogrid.cell_payload(pyramid[0], max_count)
+    
+    chart_config = {
+        'data': [{
+            'type': 'scattermapbox',
+            'lat': initial['lat'],
+            'lon': initial['lon'],
+            'mode': 'markers',
+            'marker': {
+                'size': initial['size'],
+                'color': initial['size'],
+                'colorscale': [[0, BRIGHT_TURQUOISE], [1, ACCENT_PURPLE]],
+                'cmin': geogrid.MIN_MARKER_SIZE,
+                'cmax': geogrid.MAX_MARKER_SIZE,
+                'opacity': 0.75
             },
-            'paper_bgcolor': CARD_BG,
-            'plot_bgcolor': CARD_BG,
-            'font': {'color': TEXT_PRIMARY, 'family': 'Arial'},
-            'margin': {'l': 0, 'r': 0, 't': 0, 'b': 0},
-            'height': 280,
-            'showlegend': False
-        }
+            'customdata': initial['count'],
+            'hovertemplate': '%{customdata:,} users<extra></extra>'
+        }],
+        'layout': _map_layout()
     }
     
-    return f"Plotly.newPlot('geo-chart', {json.dumps(chart_config['data'])}, {json.dumps(chart_config['layout'])});"
-
-def get_top_deals(data):
-    """Get top deals for the table"""
-    deals_df = data['deals_df']
-    current_month = datetime.now().month
-    this_month_deals = deals_df[deals_df['month'] == current_month]
-    top_deals = this_month_deals.nlargest(8, 'amount')
+    return (f"const GEO_GRID = {json.dumps(geogrid.grid_config(GEO_TILE_DIR, tiles))};\n"
+            f"const GEO_LEVEL0 = {json.dumps(initial)};\n"
+            + GEO_TILE_LOADER_JS
+            + f"Plotly.newPlot('geo-chart', {json.dumps(chart_config['data'])}, {json.dumps(chart_config['layout'])})"
+            f".then(gd => gd.on('plotly_relayout', geoUpdate));")
+
+def get_top_deals(data, as_of: Optional[datetime] = None):
+    """Get top deals for the table
+
+    These are the deals of the month of ``as_of`` (by default the latest
+    month with deals up to today), read from the precomputed leaders of
+    the deal partitions when there are any, otherwise ranked.
+    """
+    today = (datetime.now().year, datetime.now().month)
+    if 'deal_partitions' in data:
+        directory = data['deal_partitions']
+        partition = (as_of.year, as_of.month) if as_of is not None else dealparts.latest_partition(directory, today)
+        top_deals = dealparts.top_deals(directory, *partition, 8) if partition else None
+        return _deal_rows(top_deals)
     
+    if 'db' in data:
+        partition = (as_of.year, as_of.month) if as_of is not None else sqlstore.latest_deal_month(data['db'], today)
+        top_deals = sqlstore.top_deals(data['db'], *partition, 8) if partition else None
+    else:
+        deals_df = data['deals_df']
+        keys = deals_df['year'].to_numpy().astype(np.int64) * 12 + deals_df['month'].to_numpy().astype(np.int64) - 1
+        if as_of is not None:
+            key = as_of.year * 12 + as_of.month - 1
+        else:
+            past = keys[keys <= today[0] * 12 + today[1] - 1]
+            key = past.max() if len(past) else None
+        top_deals = deals_df[keys == key].nlargest(8, 'amount') if key is not None else None
+    return _deal_rows(top_deals)
+
+def _deal_rows(top_deals: Optional[pd.DataFrame]) -> str:
+    """Table rows for the deals card"""
+    if top_deals is None:
+        return ""
     rows = []
     for _, deal in top_deals.iterrows():
         rows.append(f"""
@@ -235,31 +829,80 @@ def get_top_deals(data):
     
     return "".join(rows)
 
-def get_extended_feedback(data):
-    """Get feedback entries from the CSV data"""
-    feedback_df = data['feedback_df']
+def feedback_until(feedback_df: pd.DataFrame, until: datetime) -> pd.DataFrame:
+    """Feedback entries dated before ``until``; the file is newest first, so they are a suffix found by binary search"""
+    dates = feedback_df['date'].to_numpy()
+    first = len(dates) - np.searchsorted(dates[::-1], np.datetime64(until), side='left')
+    return feedback_df.iloc[first:]
+
+def write_feedback_index(rows: int) -> Optional[Dict]:
+    """Write the feedback search index as a JSONP sidecar next to the dashboard
+
+    Returns the facet values for the filters, or None when there is no
+    index or it was built for a different feedback table (``rows`` rows).
+    """
+    if not os.path.exists(os.path.join(FEEDBACK_INDEX_DIR, feedindex.META_FILE)):
+        return None
+    index = feedindex.load_index(FEEDBACK_INDEX_DIR)
+    if index.rows != rows:
+        return None
+    with open(os.path.join(OUTPUT_DIR, FEEDBACK_INDEX_FILE), 'w') as f:
+        f.write(f"feedbackIndexLoaded({payload.to_json(feedindex.client_payload(index))});\n")
+    return {'ratings': index.keys['rating'], 'sentiments': index.keys['sentiment']}
+
+def write_feedback_pages(data) -> Dict:
+    """Write the whole feedback history as pages, plus its search index, next to the dashboard
+
+    Returns the list settings (see feedpages.py) with the search facets
+    under ``'search'`` (None without a search index).
+    """
+    chunks = sqlstore.feedback_chunks(data['db']) if 'db' in data else [data['feedback_df']]
+    pages = feedpages.write_pages(chunks, os.path.join(OUTPUT_DIR, FEEDBACK_PAGE_DIR), 'feedbackPageLoaded')
+    pages['search'] = write_feedback_index(pages['rows'])
+    return pages
+
+def feedback_filters(pages: Dict) -> str:
+    """Search box and rating/sentiment filters for the feedback card (empty without a search index)"""
+    search = pages['search']
+    if search is None:
+        return ""
+    ratings = "".join(f'<option value="{code}">{rating} ★</option>' for code, rating in enumerate(search['ratings']))
+    sentiments = "".join(f'<option value="{code}">{sentiment.capitalize()}</option>'
+                         for code, sentiment in enumerate(search['sentiments']))
+    return f"""
+                    <div class="feedback-filters">
+                        <input id="feedback-search" type="search" placeholder="Search feedback">
+                        <select id="feedback-rating"><option value="">Any rating</option>{ratings}</select>
+                        <select id="feedback-sentiment"><option value="">Any sentiment</option>{sentiments}</select>
+                    </div>
+                    <div class="feedback-count" id="feedback-count"></div>"""
+
+def get_extended_feedback(data, as_of: Optional[datetime] = None, pages: Optional[Dict] = None):
+    """Get the feedback list (the latest entries, or the latest up to the end of ``as_of``) and its script
+
+    Only the first FEEDBACK_POOL_ROWS entries are rendered into the page;
+    the rest of the history is read from ``pages`` (written by
+    write_feedback_pages when not given) as the list scrolls.
+    """
+    pages = pages if pages is not None else write_feedback_pages(data)
+    reference = datetime.now() if as_of is None else as_of
+    until = None if as_of is None else as_of + timedelta(days=1)
+    if 'db' in data:
+        feedback_entries = sqlstore.latest_feedback(data['db'], FEEDBACK_POOL_ROWS, until=until)
+        first = 0 if until is None else sqlstore.count_feedback_since(data['db'], until)
+    else:
+        feedback_entries = data['feedback_df'] if until is None else feedback_until(data['feedback_df'], until)
+        first = len(data['feedback_df']) - len(feedback_entries)
+        feedback_entries = feedback_entries.head(FEEDBACK_POOL_ROWS)
     
-    # Use the first 14 feedback entries from the CSV file
-    feedback_entries = feedback_df.head(14)
+    # Ages in whole calendar days, bucketed for all rows at once
+    reference_day = int(feedpages.day_numbers([np.datetime64(reference, 'D')])[0])
+    time_texts = feedpages.relative_time_labels(reference_day - feedpages.day_numbers(feedback_entries['date']))
     
     feedback_html = []
-    for _, row in feedback_entries.iterrows():
-        feedback_text = row['feedback_text']
-        days_ago = (datetime.now() - row['date']).days
-        
-        if days_ago == 0:
-            time_text = "today"
-        elif days_ago == 1:
-            time_text = "1 day ago"
-        elif days_ago < 30:
-            time_text = f"{days_ago} days ago"
-        elif days_ago < 60:
-            time_text = f"{days_ago//30} month{'s' if days_ago//30 > 1 else ''} ago"
-        else:
-            time_text = f"{days_ago//30} months ago"
-        
+    for position, (feedback_text, time_text) in enumerate(zip(feedback_entries['feedback_text'], time_texts)):
         feedback_html.append(f"""
-            <div class="feedback-item">
+            <div class="feedback-item" style="transform: translateY({position * FEEDBACK_ROW_HEIGHT}px);">
                 <div class="feedback-icon">👍</div>
                 <div class="feedback-content">
                     <div class="feedback-text">{feedback_text}</div>
@@ -268,16 +911,40 @@ def get_extended_feedback(data):
             </div>
         """)
     
-    return "".join(feedback_html)
+    height = min((pages['rows'] - first) * FEEDBACK_ROW_HEIGHT, FEEDBACK_MAX_SCROLL)
+    settings = {
+        'pageUrl': FEEDBACK_PAGE_DIR,
+        'pageRows': pages['pageRows'],
+        'rows': pages['rows'],
+        'texts': pages['texts'],
+        'first': first,
+        'reference': reference_day,
+        'rowHeight': FEEDBACK_ROW_HEIGHT,
+        'maxHeight': FEEDBACK_MAX_SCROLL,
+        'indexUrl': FEEDBACK_INDEX_FILE,
+    }
+    feedback_list = f'<div class="feedback-spacer" style="height: {height}px;">{"".join(feedback_html)}</div>'
+    script = f"const FEEDBACK = {json.dumps(settings)};\n" + FEEDBACK_LIST_JS
+    return feedback_list, script + (FEEDBACK_SEARCH_JS if pages['search'] is not None else "")
+
+def create_dashboard_html(data, metrics, as_of: Optional[datetime] = None, geo_chart: Optional[str] = None,
+                          feedback_pages: Optional[Dict] = None, series: Optional[Dict[str, kpi.DailySeries]] = None):
+    """Create the complete dashboard HTML matching reference layout
 
-def create_dashboard_html(data, metrics):
-    """Create the complete dashboard HTML matching reference layout"""
+    With ``as_of`` the deals and feedback cards show that date and the footer
+    names it; ``geo_chart`` reuses an already built map script and
+    ``feedback_pages`` already written feedback pages; ``series`` are the
+    KPI series the sparklines are drawn from (read again when not given).
+    """
     
     # Create components
     nps_gauge = create_nps_gauge(metrics['nps_score'])
-    geo_chart = create_geographic_chart(data)
-    top_deals = get_top_deals(data)
-    extended_feedback = get_extended_feedback(data)
+    geo_chart = geo_chart if geo_chart is not None else create_geographic_chart(data)
+    top_deals = get_top_deals(data, as_of)
+    feedback_pages = feedback_pages if feedback_pages is not None else write_feedback_pages(data)
+    trend_charts = create_trend_charts(series if series is not None else kpi_series(data, as_of), as_of)
+    extended_feedback, feedback_script = get_extended_feedback(data, as_of, feedback_pages)
+    footer_title = "Daily pulse dashboard" + (f" · as of {as_of:%Y-%m-%d}" if as_of is not None else "")
     
     # Create the complete HTML
     html_content = f"""
@@ -287,7 +954,7 @@ def create_dashboard_html(data, metrics):
         <meta charset="UTF-8">
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
         <title>Business Dashboard</title>
-        <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
+        <script src="https://cdn.plot.ly/plotly-2.35.2.min.js"></script>
         <style>
             * {{
                 margin: 0;
@@ -376,6 +1043,10 @@ def create_dashboard_html(data, metrics):
                 font-weight: 500;
             }}
             
+            .trend {{
+                margin: 6px auto 0;
+            }}
+            
             .sales-daily {{
                 margin-top: 25px;
                 padding-top: 20px;
@@ -545,7 +1216,7 @@ def create_dashboard_html(data, metrics):
             }}
             
             .feedback-container {{
-                max-height: 180px;
+                height: {FEEDBACK_LIST_HEIGHT}px;
                 overflow-y: auto;
                 padding-right: 8px;
                 position: relative;
@@ -566,10 +1237,47 @@ def create_dashboard_html(data, metrics):
                 border-radius: 3px;
             }}
             
+            .feedback-filters {{
+                display: flex;
+                gap: 6px;
+                margin-bottom: 6px;
+            }}
+            
+            .feedback-filters input,
+            .feedback-filters select {{
+                min-width: 0;
+                background: {DARK_BG};
+                color: {TEXT_PRIMARY};
+                border: 1px solid #4a5568;
+                border-radius: 6px;
+                padding: 4px 6px;
+                font-size: 12px;
+            }}
+            
+            .feedback-filters input {{
+                flex: 1;
+            }}
+            
+            .feedback-count {{
+                font-size: 11px;
+                color: {TEXT_SECONDARY};
+                margin-bottom: 4px;
+            }}
+            
+            .feedback-spacer {{
+                position: relative;
+                overflow: hidden;
+            }}
+            
             .feedback-item {{
+                position: absolute;
+                top: 0;
+                left: 0;
+                right: 0;
+                height: {FEEDBACK_ROW_HEIGHT - 12}px;
+                box-sizing: border-box;
                 display: flex;
                 align-items: flex-start;
-                margin-bottom: 12px;
                 padding: 10px;
                 background: {DARK_BG};
                 border-radius: 8px;
@@ -590,12 +1298,16 @@ def create_dashboard_html(data, metrics):
             
             .feedback-content {{
                 flex: 1;
+                min-width: 0;
             }}
             
             .feedback-text {{
                 font-size: 13px;
                 color: {TEXT_PRIMARY};
                 margin-bottom: 4px;
+                white-space: nowrap;
+                overflow: hidden;
+                text-overflow: ellipsis;
             }}
             
             .feedback-date {{
@@ -663,15 +1375,16 @@ def create_dashboard_html(data, metrics):
             <div class="left-panel">
                 <!-- Sales Card -->
                 <div class="card sales-card">
-                    <div class="sales-main">${metrics['total_sales']/1000:.0f}k</div>
+                    <div class="sales-main">{kpi_text(metrics['total_sales'], '.0f', 1000, '$', 'k')}</div>
                     <div class="sales-period">this month</div>
-                    <div class="sales-change">▲ ${abs(metrics['sales_change'])/1000:.0f}k vs last month</div>
+                    <div class="sales-change">{change_text(metrics['sales_change'], '.0f', 1000, '$', 'k')} vs last month</div>
+                    {trend_div('sales')}
                     
                     <div class="sales-daily">
-                        <div class="sales-today">${metrics['today_sales']/1000:.1f}k</div>
+                        <div class="sales-today">{kpi_text(metrics['today_sales'], '.1f', 1000, '$', 'k')}</div>
                         <div class="sales-label">today</div>
                         
-                        <div class="sales-yesterday">${metrics['yesterday_sales']/1000:.1f}k</div>
+                        <div class="sales-yesterday">{kpi_text(metrics['yesterday_sales'], '.1f', 1000, '$', 'k')}</div>
                         <div class="sales-label">yesterday</div>
                     </div>
                 </div>
@@ -706,14 +1419,16 @@ def create_dashboard_html(data, metrics):
                     <div class="card-title">Social followers</div>
                     <div class="social-metrics">
                         <div class="social-item">
-                            <div class="social-count">{metrics['linkedin_followers']/1000:.1f}k</div>
+                            <div class="social-count">{kpi_text(metrics['linkedin_followers'], '.1f', 1000, suffix='k')}</div>
                             <div class="social-label">LinkedIn</div>
-                            <div class="social-growth">▲ {metrics['linkedin_growth']} v yday</div>
+                            <div class="social-growth">{change_text(metrics['linkedin_growth'])} v yday</div>
+                            {trend_div('linkedin_followers')}
                         </div>
                         <div class="social-item">
-                            <div class="social-count">{metrics['twitter_followers']/1000:.1f}k</div>
+                            <div class="social-count">{kpi_text(metrics['twitter_followers'], '.1f', 1000, suffix='k')}</div>
                             <div class="social-label">Twitter</div>
-                            <div class="social-growth">▲ {metrics['twitter_growth']} v yday</div>
+                            <div class="social-growth">{change_text(metrics['twitter_growth'])} v yday</div>
+                            {trend_div('twitter_followers')}
                         </div>
                     </div>
                 </div>
@@ -723,18 +1438,20 @@ def create_dashboard_html(data, metrics):
                     <div class="card-title">Website (past 7 days)</div>
                     <div class="website-metrics">
                         <div class="website-item">
-                            <div class="website-count">{metrics['website_users']/1000:.1f}k</div>
+                            <div class="website-count">{kpi_text(metrics['website_users'], '.1f', 1000, suffix='k')}</div>
                             <div class="website-label">Users</div>
-                            <div class="website-change {'positive' if metrics['user_change'] > 0 else 'negative'}">
-                                {'▲' if metrics['user_change'] > 0 else '▼'} {abs(metrics['user_change'])/1000:.1f}k vs last week
+                            <div class="website-change {change_class(metrics['user_change'])}">
+                                {change_text(metrics['user_change'], '.1f', 1000, suffix='k', strict=True)} vs last week
                             </div>
+                            {trend_div('website_users')}
                         </div>
                         <div class="website-item">
-                            <div class="website-count">{metrics['website_enquiries']}</div>
+                            <div class="website-count">{kpi_text(metrics['website_enquiries'])}</div>
                             <div class="website-label">Enquiries</div>
-                            <div class="website-change {'positive' if metrics['enquiry_change'] > 0 else 'negative'}">
-                                {'▲' if metrics['enquiry_change'] > 0 else '▼'} {abs(metrics['enquiry_change'])} vs last week
+                            <div class="website-change {change_class(metrics['enquiry_change'])}">
+                                {change_text(metrics['enquiry_change'], strict=True)} vs last week
                             </div>
+                            {trend_div('website_enquiries')}
                         </div>
                     </div>
                 </div>
@@ -749,8 +1466,8 @@ def create_dashboard_html(data, metrics):
                 
                 <!-- Row 2: Recent feedback below deals (same column as deals) -->
                 <div class="card feedback-card" style="grid-column: 1; grid-row: 2;">
-                    <div class="card-title">Recent feedback</div>
-                    <div class="feedback-container">
+                    <div class="card-title">Recent feedback</div>{feedback_filters(feedback_pages)}
+                    <div class="feedback-container" id="feedback-list">
                         {extended_feedback}
                     </div>
                 </div>
@@ -764,7 +1481,7 @@ def create_dashboard_html(data, metrics):
         <div class="footer">
             <div class="footer-left">
                 <div class="footer-dot"></div>
-                <span>Daily pulse dashboard</span>
+                <span>{footer_title}</span>
             </div>
             <div class="footer-right">
                 <span id="current-time"></span>
@@ -772,9 +1489,14 @@ def create_dashboard_html(data, metrics):
         </div>
         
         <script>
+            {payload.TYPED_ARRAY_JS}
             // Render charts
             {nps_gauge}
             {geo_chart}
+            {trend_charts}
+            
+            // Scroll through the feedback history
+            {feedback_script}
             
             // Update time in footer
             function updateTime() {{
@@ -797,23 +1519,85 @@ def create_dashboard_html(data, metrics):
     
     return html_content
 
-def main():
-    """Main function to generate the dashboard"""
+def render_snapshots(data, start: datetime, end: datetime) -> List[str]:
+    """Write the dashboard as of every day from ``start`` to ``end`` as ``dashboard_<date>.html``
+
+    The daily KPI series (with their prefix sums), the map and the feedback
+    pages are built once; each snapshot then costs a few lookups, the
+    downsampled sparklines and the HTML itself.
+    """
+    series = kpi_series(data, end)
+    geo_chart = create_geographic_chart(data)
+    feedback_pages = write_feedback_pages(data)
+    paths = []
+    started = time.perf_counter()
+    for offset in range((end - start).days + 1):
+        as_of = start + timedelta(days=offset)
+        metrics = kpi.compute(series, np.datetime64(as_of.date(), 'D'))
+        output_path = os.path.join(OUTPUT_DIR, f"dashboard_{as_of:%Y-%m-%d}.html")
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(create_dashboard_html(data, metrics, as_of=as_of, geo_chart=geo_chart,
+                                          feedback_pages=feedback_pages, series=series))
+        paths.append(output_path)
+    print(f"Rendered {len(paths)} snapshots in {time.perf_counter() - started:.2f}s")
+    return paths
+
+def main(use_arrays: bool = False, use_sqlite: bool = False, max_workers: Optional[int] = None,
+         cold_start: bool = False, as_of: Optional[datetime] = None,
+         snapshot_range: Optional[Tuple[datetime, datetime]] = None):
+    """Main function to generate the dashboard (as of a past date, or one per day of ``snapshot_range``)"""
     # Ensure output directory exists
     if not os.path.exists(OUTPUT_DIR):
         os.makedirs(OUTPUT_DIR)
     
-    # Load data
-    data = load_data()
+    # Load data; array mode memory-maps the numeric exports instead of parsing their tables,
+    # SQLite mode queries only the rows each component shows, the KPI cards read the calendar
+    # rollups when present, the deals card reads the deal partitions and the map reads the
+    # packed coordinates rather than the user coordinates table
+    packed_coords = os.path.join(DATA_DIR, PACKED_COORDS_FILE)
+    rollup_dir = os.path.join(DATA_DIR, rollup.ROLLUP_DIR)
+    use_rollups = not (use_arrays or use_sqlite) and rollup.exists(rollup_dir)
+    if use_sqlite:
+        frames = ['user_coords_df']
+    elif use_arrays:
+        frames = ARRAY_MODE_FRAMES
+    elif use_rollups:
+        frames = [key for key in DATA_FILES if key not in KPI_FRAMES]
+    else:
+        frames = list(DATA_FILES)
+    if os.path.exists(packed_coords):
+        frames = [key for key in frames if key != 'user_coords_df']
+    if os.path.isdir(DEAL_PARTITIONS_DIR):
+        frames = [key for key in frames if key != 'deals_df']
+    loader = load_data_snapshot if cold_start else load_data
+    data = loader(columns=DASHBOARD_COLUMNS, frames=frames, max_workers=max_workers)
+    if use_arrays:
+        data['arrays'] = load_arrays()
+    if use_sqlite:
+        data['db'] = sqlstore.connect(os.path.join(DATA_DIR, sqlstore.DB_FILE))
+    if use_rollups:
+        data['rollups'] = rollup.load_rollups(rollup_dir, 'day')
+    if os.path.exists(packed_coords):
+        data['user_coords'] = coordpack.read_coordinates(packed_coords)
+    if os.path.isdir(DEAL_PARTITIONS_DIR):
+        data['deal_partitions'] = DEAL_PARTITIONS_DIR
+    
+    # Batch mode: one dashboard per day, from a single load
+    if snapshot_range is not None:
+        paths = render_snapshots(data, *snapshot_range)
+        print(f"Snapshots saved to: {OUTPUT_DIR}/dashboard_<date>.html ({paths[0]} to {paths[-1]})" if paths
+              else "No snapshots in that date range")
+        return
     
     # Calculate metrics
-    metrics = create_kpi_metrics(data)
+    series = kpi_series(data, as_of)
+    metrics = create_kpi_metrics(data, as_of, series)
     
     # Generate HTML
-    html_content = create_dashboard_html(data, metrics)
+    html_content = create_dashboard_html(data, metrics, as_of=as_of, series=series)
     
     # Save HTML file
-    output_path = os.path.join(OUTPUT_DIR, 'dashboard.html')
+    output_path = os.path.join(OUTPUT_DIR, 'dashboard.html' if as_of is None else f"dashboard_{as_of:%Y-%m-%d}.html")
     with open(output_path, 'w', encoding='utf-8') as f:
         f.write(html_content)
     
@@ -822,4 +1606,20 @@ def main():
     print(f"Open in browser to view the dashboard")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate the business dashboard HTML")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--arrays', action='store_true',
+                        help="compute KPIs and map points from the memory-mapped NPY exports")
+    source.add_argument('--sqlite', action='store_true',
+                        help="query each component's rows from the SQLite store written by data_gen.py --sqlite")
+    parser.add_argument('--workers', type=int, default=None, help="threads for loading data files (1 reads them in turn)")
+    parser.add_argument('--cold-start', action='store_true',
+                        help=f"reuse the typed frames snapshot ({DATA_DIR}/{SNAPSHOT_FILE}) while the data files are unchanged")
+    when = parser.add_mutually_exclusive_group()
+    when.add_argument('--as-of', type=datetime.fromisoformat, default=None, metavar='DATE',
+                      help="render the dashboard as it looked on DATE (default: latest data)")
+    when.add_argument('--snapshots', type=datetime.fromisoformat, nargs=2, default=None, metavar=('START', 'END'),
+                      help="render one dashboard per day from START to END in one run")
+    args = parser.parse_args()
+    main(use_arrays=args.arrays, use_sqlite=args.sqlite, max_workers=args.workers, cold_start=args.cold_start,
+         as_of=args.as_of, snapshot_range=tuple(args.snapshots) if args.snapshots else None)
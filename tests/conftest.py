@@ -0,0 +1,9 @@
+"""
+Test Configuration for Business Dashboard
+Puts the scripts directory on the import path, as running them from scripts/ does
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
@@ -0,0 +1,81 @@
+"""
+Columnar Store Tests for Business Dashboard
+Tables and NPY arrays with their index sidecars must read back what was written
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import colstore
+
+def _frame(rows: int) -> pd.DataFrame:
+    """Small frame with a date, two numeric columns and a coded text column with labels"""
+    states = np.array(['CA', 'NY', 'TX'], dtype=object)[np.arange(rows) % 3]
+    return pd.DataFrame({
+        'date': pd.date_range('2024-01-01', periods=rows, freq='D'),
+        'users': np.arange(rows, dtype=np.int64) * 10,
+        'revenue': np.arange(rows, dtype=np.float64) / 4,
+        'state': states,
+        'state_name': pd.Series(states).map({'CA': 'California', 'NY': 'New York', 'TX': 'Texas'}).to_numpy(),
+    })
+
+@pytest.mark.parametrize('rows', [0, 1, 7])
+def test_table_round_trip(tmp_path, rows):
+    df = _frame(rows)
+    colstore.write_table(df, str(tmp_path / 'table.cols'))
+    back = colstore.read_table(str(tmp_path / 'table.cols'))
+    
+    assert list(back.columns) == list(df.columns)
+    # Text comes back as categoricals; compare it as the source's text type (object, or str on pandas 3)
+    pd.testing.assert_frame_equal(back.astype({'state': df['state'].dtype, 'state_name': df['state_name'].dtype}), df)
+
+@pytest.mark.parametrize('rows', [0, 1, 7])
+@pytest.mark.parametrize('columns', [['users'], ['users', 'revenue']])
+def test_array_round_trip(tmp_path, rows, columns):
+    df = _frame(rows)
+    path = str(tmp_path / 'metrics.npy')
+    colstore.write_array(df, path, columns, ['date', 'state'], labels={'state': 'state_name'})
+    array = colstore.open_array(path)
+    
+    expected = df[columns[0]].to_numpy() if len(columns) == 1 else df[columns].to_numpy(dtype=np.float64)
+    assert array['values'].shape == expected.shape
+    np.testing.assert_array_equal(array['values'], expected)
+    assert array['columns'] == columns
+    np.testing.assert_array_equal(array['index']['date'], df['date'].to_numpy(dtype='datetime64[D]'))
+    
+    state = array['meta']['index'][1]
+    assert [state['categories'][code] for code in array['index']['state']] == list(df['state'])
+    assert dict(zip(state['categories'], state['labels'])) == dict(zip(df['state'], df['state_name']))
+    assert set(colstore.array_files(path)) == {path, colstore.array_meta_file(path),
+                                               colstore.array_index_file(path, 'date'),
+                                               colstore.array_index_file(path, 'state')}
+
+def test_array_written_in_chunks(tmp_path):
+    df = _frame(10)
+    path = str(tmp_path / 'metrics.npy')
+    writer = colstore.ArrayWriter(path, len(df), ['revenue'], ['state'])
+    for first in range(0, len(df), 4):
+        writer.append(df.iloc[first:first + 4])
+    writer.close()
+    array = colstore.open_array(path)
+    
+    np.testing.assert_array_equal(array['values'], df['revenue'].to_numpy())
+    assert array['meta']['index'][0]['categories'] == ['CA', 'NY', 'TX']
+
+def test_array_without_chunks_opens_empty(tmp_path):
+    path = str(tmp_path / 'metrics.npy')
+    colstore.ArrayWriter(path, 0, ['users'], ['date']).close()
+    array = colstore.open_array(path)
+    
+    assert array['values'].shape == (0,)
+    assert len(array['index']['date']) == 0
+
+def test_incomplete_array_is_not_described(tmp_path):
+    path = str(tmp_path / 'metrics.npy')
+    writer = colstore.ArrayWriter(path, 5, ['users'], [])
+    writer.append(_frame(2))
+    with pytest.raises(ValueError):
+        writer.close()
+    with pytest.raises(FileNotFoundError):
+        colstore.open_array(path)
@@ -0,0 +1,81 @@
+"""
+Packed Coordinates Tests for Business Dashboard
+Decoded users must be within one quantization step of what was written
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import coordpack
+import schema
+
+STATES = {'CA': 'California', 'NY': 'New York', 'TX': 'Texas'}
+
+def _users(rows: int) -> pd.DataFrame:
+    """Users spread over the US bounds, starting with its four corners"""
+    rng = np.random.default_rng(3)
+    lat = np.concatenate([[schema.US_LAT_BOUNDS[0], schema.US_LAT_BOUNDS[0], schema.US_LAT_BOUNDS[1], schema.US_LAT_BOUNDS[1]],
+                          rng.uniform(*schema.US_LAT_BOUNDS, max(rows - 4, 0))])[:rows]
+    lon = np.concatenate([[schema.US_LON_BOUNDS[0], schema.US_LON_BOUNDS[1], schema.US_LON_BOUNDS[0], schema.US_LON_BOUNDS[1]],
+                          rng.uniform(*schema.US_LON_BOUNDS, max(rows - 4, 0))])[:rows]
+    states = np.array(list(STATES), dtype=object)[rng.integers(0, len(STATES), rows)]
+    return pd.DataFrame({'lat': lat, 'lon': lon, 'state': states})
+
+def _step(bounds) -> float:
+    return (bounds[1] - bounds[0]) / coordpack.COORD_STEPS
+
+@pytest.mark.parametrize('rows', [0, 1, 4, 5000])
+def test_round_trip_within_one_step(tmp_path, rows):
+    users = _users(rows)
+    path = str(tmp_path / 'users.qcoords')
+    coordpack.write_coordinates(users, path, schema.US_LAT_BOUNDS, schema.US_LON_BOUNDS, STATES)
+    packed = coordpack.read_coordinates(path)
+
+    assert len(packed) == rows
+    assert np.all(np.abs(packed.lat - users['lat'].to_numpy()) <= _step(schema.US_LAT_BOUNDS))
+    assert np.all(np.abs(packed.lon - users['lon'].to_numpy()) <= _step(schema.US_LON_BOUNDS))
+    np.testing.assert_array_equal(packed.user_id, np.arange(1, rows + 1))
+    assert list(packed.state) == list(users['state'])
+    assert list(packed.state_name) == [STATES[state] for state in users['state']]
+    assert list(packed.to_frame().columns) == ['user_id', 'lat', 'lon', 'state', 'state_name']
+
+def test_bounds_decode_exactly(tmp_path):
+    path = str(tmp_path / 'users.qcoords')
+    coordpack.write_coordinates(_users(4), path, schema.US_LAT_BOUNDS, schema.US_LON_BOUNDS, STATES)
+    packed = coordpack.read_coordinates(path)
+
+    np.testing.assert_allclose(packed.lat, [25.0, 25.0, 49.0, 49.0])
+    np.testing.assert_allclose(packed.lon, [-125.0, -66.0, -125.0, -66.0])
+
+def test_chunked_write_matches_whole(tmp_path):
+    users = _users(1000)
+    whole = str(tmp_path / 'whole.qcoords')
+    chunked = str(tmp_path / 'chunked.qcoords')
+    coordpack.write_coordinates(users, whole, schema.US_LAT_BOUNDS, schema.US_LON_BOUNDS, STATES)
+    writer = coordpack.CoordinateWriter(chunked, len(users), schema.US_LAT_BOUNDS, schema.US_LON_BOUNDS, STATES)
+    for first in range(0, len(users), 300):
+        writer.append(users.iloc[first:first + 300])
+    writer.close()
+
+    assert open(chunked, 'rb').read() == open(whole, 'rb').read()
+
+def test_out_of_bounds_values_are_clipped(tmp_path):
+    users = pd.DataFrame({'lat': [10.0, 60.0], 'lon': [-170.0, -10.0], 'state': ['CA', 'NY']})
+    path = str(tmp_path / 'users.qcoords')
+    coordpack.write_coordinates(users, path, schema.US_LAT_BOUNDS, schema.US_LON_BOUNDS, STATES)
+    packed = coordpack.read_coordinates(path)
+
+    np.testing.assert_allclose(packed.lat, schema.US_LAT_BOUNDS)
+    np.testing.assert_allclose(packed.lon, schema.US_LON_BOUNDS)
+
+def test_incomplete_or_invalid_writes_are_rejected(tmp_path):
+    path = str(tmp_path / 'users.qcoords')
+    writer = coordpack.CoordinateWriter(path, 5, schema.US_LAT_BOUNDS, schema.US_LON_BOUNDS, STATES)
+    writer.append(_users(2))
+    with pytest.raises(ValueError):
+        writer.close()
+    with pytest.raises(ValueError):
+        writer.append(pd.DataFrame({'lat': [30.0], 'lon': [-100.0], 'state': ['ZZ']}))
+    with pytest.raises(ValueError):
+        writer.append(_users(4))
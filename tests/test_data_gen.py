@@ -0,0 +1,162 @@
+"""
+Data Generation Tests for Business Dashboard
+Generated rows must not depend on chunk size or worker count, and rebuilds must follow the manifest
+"""
+
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+import data_gen
+import kpi
+import schema
+
+@pytest.mark.parametrize('chunk_rows', [100, 1000])
+def test_streamed_deals_match_batch(chunk_rows):
+    # Five years of deals, so both chunk sizes split the output
+    span = {'start_date': datetime(2020, 1, 1), 'end_date': datetime(2024, 12, 31)}
+    batch = data_gen.generate_deals_data(**span)
+    total, chunks = data_gen.stream_deals_data(chunk_rows, **span)
+    streamed = schema.apply_schema(pd.concat(list(chunks), ignore_index=True), 'deals')
+    
+    assert total == len(batch)
+    pd.testing.assert_frame_equal(streamed, batch)
+
+@pytest.mark.parametrize('name', list(data_gen.STREAM_GENERATORS))
+def test_empty_stream_writes_headers(tmp_path, monkeypatch, name):
+    monkeypatch.setattr(data_gen, 'DATA_DIR', str(tmp_path))
+    assert data_gen._stream_dataset(name, 0, iter(())) == 0
+    
+    columns = [column for column in schema.SCHEMAS[name] if column != 'unit_id']
+    csv = pd.read_csv(tmp_path / data_gen.DATASETS[name]['outputs'][0])
+    assert list(csv.columns) == columns and len(csv) == 0
+    loaded = data_gen._load_dataset(name)
+    assert list(loaded.columns) == columns and len(loaded) == 0
+    for output in data_gen.DATASETS[name]['outputs']:
+        assert (tmp_path / output).exists(), output
+
+def test_streamed_empty_range_reads_back(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_gen, 'DATA_DIR', str(tmp_path))
+    total, chunks = data_gen.stream_deals_data(100, start_date=datetime(2024, 2, 1), end_date=datetime(2024, 1, 1))
+    data_gen._stream_dataset('deals', total, chunks)
+    
+    assert total == 0
+    assert len(pd.read_csv(tmp_path / 'deals_data.csv', dtype=schema.csv_dtypes('deals'))) == 0
+
+def test_nps_follows_the_date_range():
+    nps = data_gen.generate_nps_data(start_date=datetime(2022, 3, 15), end_date=datetime(2024, 2, 29))
+    
+    assert list(nps['month']) == list(pd.date_range('2022-03-31', '2024-02-29', freq='ME'))
+    assert data_gen.default_generator_params(datetime(2022, 1, 1), datetime(2024, 12, 31))['nps'] == {
+        'start_date': datetime(2022, 1, 1), 'end_date': datetime(2024, 12, 31)}
+
+def test_summary_is_taken_as_of_the_last_data_date():
+    span = {'start_date': datetime(2022, 1, 1), 'end_date': datetime(2024, 12, 31)}
+    frames = {'sales': data_gen.generate_sales_data(n_series=2, **span), 'deals': data_gen.generate_deals_data(**span),
+              'social': data_gen.generate_social_media_data(**span),
+              'website': data_gen.generate_website_analytics(**span), 'nps': data_gen.generate_nps_data(**span)}
+    summary = data_gen.generate_summary_stats(frames, reference_time=datetime(2026, 5, 1))
+    
+    # The same figures as the dashboard cards
+    metrics = kpi.compute(kpi.series_from_frames({f"{name}_df": df for name, df in frames.items()}))
+    assert summary['sales_this_month'] == round(metrics['total_sales'] / 1000, 1)
+    assert summary['sales_today'] == round(metrics['today_sales'] / 1000, 1)
+    assert summary['sales_yesterday'] == round(metrics['yesterday_sales'] / 1000, 1)
+    assert summary['linkedin_followers'] == f"{metrics['linkedin_followers'] / 1000:.1f}k"
+    assert summary['website_users_7days'] == f"{metrics['website_users'] / 1000:.1f}k"
+    assert summary['website_enquiries_7days'] == metrics['website_enquiries']
+    assert summary['current_nps'] == metrics['nps_score']
+    
+    sales = frames['sales']
+    december = sales[sales['date'] >= datetime(2024, 12, 1)]
+    assert summary['sales_this_month'] == round(december['daily_sales'].sum() / 1000, 1)
+    assert summary['sales_today'] == round(sales.loc[sales['date'] == datetime(2024, 12, 31), 'daily_sales'].sum() / 1000, 1)
+    deals = frames['deals']
+    december_deals = deals[(deals['year'] == 2024) & (deals['month'] == 12)]
+    assert summary['top_deals_this_month'] == december_deals.nlargest(10, 'amount')[['sales_rep', 'amount']].to_dict('records')
+    website = frames['website']
+    last_week = website[website['date'] >= datetime(2024, 12, 25)]
+    assert summary['website_enquiries_7days'] == int(last_week['daily_enquiries'].sum())
+
+def test_feedback_days_ago_beyond_int16():
+    # Over 89 years of history: ages past 32767 days must not wrap around
+    feedback = data_gen.generate_feedback_data(reference_time=datetime(2024, 12, 31, 18), days=33000, per_day=0.05)
+    
+    assert feedback['days_ago'].max() > 32767
+    assert (feedback['days_ago'] == (pd.Timestamp('2024-12-31 18:00') - feedback['date']).dt.days).all()
+
+def _small_params():
+    """Generator parameters small enough to build every dataset in a test"""
+    return data_gen.default_generator_params(start_date=datetime(2023, 6, 1), end_date=datetime(2024, 3, 31),
+                                             n_series=2, total_active_users=3000)
+
+def _build(directory, monkeypatch, **kwargs):
+    """Build every dataset into ``directory``; returns the manifest written"""
+    monkeypatch.setattr(data_gen, 'DATA_DIR', str(directory))
+    data_gen.create_data_directory()
+    data_gen.save_data_files(params=_small_params(), **kwargs)
+    return data_gen._load_manifest()
+
+@pytest.mark.parametrize('max_workers', [2, 4])
+def test_independent_datasets_match_for_any_worker_count(max_workers):
+    params = _small_params()
+    serial = data_gen.generate_independent_datasets(params, max_workers=1)
+    pooled = data_gen.generate_independent_datasets(params, max_workers=max_workers)
+    
+    assert list(pooled) == list(serial)
+    for name, df in serial.items():
+        pd.testing.assert_frame_equal(pooled[name], df)
+
+@pytest.mark.parametrize('chunk_rows', [None, 500])
+def test_saved_files_match_for_any_worker_count(tmp_path, monkeypatch, chunk_rows):
+    serial = _build(tmp_path / 'serial', monkeypatch, max_workers=1, chunk_rows=chunk_rows)
+    pooled = _build(tmp_path / 'pooled', monkeypatch, max_workers=3, chunk_rows=chunk_rows)
+    
+    assert set(pooled) == set(data_gen.DATASETS)
+    for name in data_gen.DATASETS:
+        assert pooled[name]['outputs'] == serial[name]['outputs'], name
+
+def test_manifest_skips_unchanged_and_rebuilds_downstream(tmp_path, monkeypatch):
+    _build(tmp_path, monkeypatch, max_workers=1)
+    params = _small_params()
+    
+    # Unchanged inputs: nothing is rebuilt
+    assert data_gen.save_data_files(params=params, max_workers=1) == []
+    
+    # A changed parameter rebuilds that dataset and everything downstream of it
+    params['geo'] = {'total_active_users': 2500}
+    assert sorted(data_gen.save_data_files(params=params, max_workers=1)) == ['geo', 'user_coords']
+    params['deals'] = {**params['deals'], 'deals_per_month': (5, 10)}
+    assert sorted(data_gen.save_data_files(params=params, max_workers=1)) == ['deals', 'rollups', 'summary']
+    
+    # So does a changed column type
+    monkeypatch.setitem(schema.SCHEMAS['nps'], 'promoter_rate', 'float64')
+    assert sorted(data_gen.save_data_files(params=params, max_workers=1)) == ['nps', 'rollups', 'summary']
+    
+    # An output edited or removed since the last build is rebuilt, with its dependents
+    (tmp_path / 'geographic_data.csv').write_text('state\n')
+    assert sorted(data_gen.save_data_files(params=params, max_workers=1)) == ['geo', 'user_coords']
+    (tmp_path / 'sales_data.csv').unlink()
+    assert sorted(data_gen.save_data_files(params=params, max_workers=1)) == ['rollups', 'sales', 'summary']
+    
+    # Named targets only rebuild when stale, unless forced
+    assert data_gen.save_data_files(['social'], params=params, max_workers=1) == []
+    assert sorted(data_gen.save_data_files(['social'], force=True, params=params, max_workers=1)) == ['rollups', 'social', 'summary']
+    assert data_gen.save_data_files(params=params, max_workers=1) == []
+
+def test_manifest_rebuilds_after_a_helper_changes(tmp_path, monkeypatch):
+    _build(tmp_path, monkeypatch, max_workers=1)
+    params = _small_params()
+    
+    # Same output, different code: only the generators calling the helper (and their dependents) are rebuilt
+    sales_columns = data_gen._sales_columns
+    def edited_sales_columns(date_range, random_factor):
+        return sales_columns(date_range, random_factor)
+    monkeypatch.setattr(data_gen, '_sales_columns', edited_sales_columns)
+    assert sorted(data_gen.save_data_files(params=params, max_workers=1)) == ['rollups', 'sales', 'summary']
+    
+    # Settings the generators read count as code too
+    monkeypatch.setitem(data_gen.REP_DEAL_TIERS, 'Alice', (9000, 1000))
+    assert sorted(data_gen.save_data_files(params=params, max_workers=1)) == ['deals', 'rollups', 'summary']
+    assert data_gen.save_data_files(params=params, max_workers=1) == []
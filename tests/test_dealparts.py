@@ -0,0 +1,71 @@
+"""
+Deal Partition Tests for Business Dashboard
+Top-deals sidecars and the scanning fallback must rank a month like DataFrame.nlargest
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_gen
+import dealparts
+
+@pytest.fixture(scope='module')
+def deals():
+    """Three years of deals, so every calendar month occurs in several years"""
+    return data_gen.generate_deals_data(start_date=datetime(2022, 1, 1), end_date=datetime(2024, 12, 31))
+
+def _expected(deals: pd.DataFrame, year: int, month: int, n: int) -> pd.DataFrame:
+    month_deals = deals[(deals['year'] == year) & (deals['month'] == month)]
+    leaders = month_deals.nlargest(n, 'amount', keep='first')
+    return pd.DataFrame({'sales_rep': leaders['sales_rep'].astype(str).to_list(),
+                         'amount': leaders['amount'].to_list()})
+
+def _leaders(top: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame({'sales_rep': top['sales_rep'].astype(str).to_list(), 'amount': top['amount'].to_list()})
+
+@pytest.mark.parametrize('chunk_rows', [37, 100000])
+def test_sidecars_match_nlargest(tmp_path, deals, chunk_rows):
+    writer = dealparts.PartitionWriter(str(tmp_path), reset=True)
+    for first in range(0, len(deals), chunk_rows):
+        writer.add(deals.iloc[first:first + chunk_rows])
+
+    keys = sorted(set(zip(deals['year'].astype(int), deals['month'].astype(int))))
+    assert dealparts.partitions(str(tmp_path)) == keys
+    for year, month in keys:
+        pd.testing.assert_frame_equal(_leaders(dealparts.top_deals(str(tmp_path), year, month, 8)),
+                                      _expected(deals, year, month, 8))
+
+def test_scan_fallback_matches_nlargest(tmp_path, deals):
+    dealparts.write_partitions(deals, str(tmp_path), k=3)
+    year, month = 2023, 6
+    # More leaders than the sidecar keeps, so the partition is scanned in small chunks
+    path = dealparts.partition_file(str(tmp_path), year, month)
+    for n in (3, 8, 1000):
+        pd.testing.assert_frame_equal(_leaders(dealparts.scan_top_deals(path, n, chunk_rows=11)),
+                                      _expected(deals, year, month, n))
+    pd.testing.assert_frame_equal(_leaders(dealparts.top_deals(str(tmp_path), year, month, 8)),
+                                  _expected(deals, year, month, 8))
+
+def test_ties_keep_partition_order(tmp_path):
+    deals = pd.DataFrame({
+        'date': pd.to_datetime(['2024-03-01'] * 6),
+        'sales_rep': ['A', 'B', 'C', 'D', 'E', 'F'],
+        'amount': np.array([5.0, 9.0, 5.0, 9.0, 1.0, 5.0]),
+        'deal_id': [f'DEAL-{i}' for i in range(6)],
+        'year': 2024,
+        'month': 3,
+    })
+    writer = dealparts.PartitionWriter(str(tmp_path), k=4, reset=True)
+    writer.add(deals.iloc[:3])
+    writer.add(deals.iloc[3:])
+
+    pd.testing.assert_frame_equal(_leaders(dealparts.top_deals(str(tmp_path), 2024, 3, 4)), _expected(deals, 2024, 3, 4))
+    path = dealparts.partition_file(str(tmp_path), 2024, 3)
+    pd.testing.assert_frame_equal(_leaders(dealparts.scan_top_deals(path, 4, chunk_rows=2)), _expected(deals, 2024, 3, 4))
+
+def test_missing_partition_is_empty(tmp_path):
+    assert len(dealparts.top_deals(str(tmp_path), 2024, 1, 8)) == 0
+    assert dealparts.latest_partition(str(tmp_path)) is None
@@ -0,0 +1,102 @@
+"""
+Downsampling Tests for Business Dashboard
+LTTB must keep the ends and exactly ``threshold`` points, min/max every bucket's extremes
+"""
+
+import numpy as np
+import pytest
+
+import downsample
+
+@pytest.fixture
+def series():
+    """A noisy daily series with a spike and a dip"""
+    rng = np.random.default_rng(9)
+    x = np.arange(2000, dtype=np.float64) * 86400000
+    y = np.sin(np.arange(2000) / 50) * 100 + rng.normal(0, 10, 2000)
+    y[700], y[1300] = 900.0, -900.0
+    return x, y
+
+def _reference_lttb(x, y, threshold):
+    """Straightforward LTTB, one point at a time"""
+    n = len(x)
+    every = (n - 2) / (threshold - 2)
+    selected = [0]
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = int(bucket * every) + 1, int((bucket + 1) * every) + 1
+        next_end = min(int((bucket + 2) * every) + 1, n)
+        next_x, next_y = np.mean(x[end:next_end]), np.mean(y[end:next_end])
+        best, best_area = start, -1.0
+        for point in range(start, end):
+            area = abs((x[previous] - next_x) * (y[point] - y[previous]) - (x[previous] - x[point]) * (next_y - y[previous]))
+            if area > best_area:
+                best, best_area = point, area
+        selected.append(best)
+        previous = best
+    return np.array(selected + [n - 1])
+
+@pytest.mark.parametrize('threshold', [3, 10, 137, 1000, 1999])
+def test_lttb_keeps_ends_and_threshold_points(series, threshold):
+    x, y = series
+    keep = downsample.lttb(x, y, threshold)
+
+    assert len(keep) == threshold
+    assert keep[0] == 0 and keep[-1] == len(x) - 1
+    assert np.all(np.diff(keep) > 0)
+
+@pytest.mark.parametrize('threshold', [3, 10, 100, 998])
+def test_lttb_matches_reference(series, threshold):
+    x, y = series
+    # Both split the inner points at int(k * (n - 2) / (threshold - 2)) + 1
+    np.testing.assert_array_equal(downsample.lttb(x, y, threshold), _reference_lttb(x, y, threshold))
+
+@pytest.mark.parametrize('n, threshold', [(0, 10), (1, 10), (5, 10), (10, 10), (50, 2)])
+def test_lttb_short_input_unchanged(n, threshold):
+    x = np.arange(n, dtype=np.float64)
+    np.testing.assert_array_equal(downsample.lttb(x, x ** 2, threshold), np.arange(n))
+
+def test_lttb_keeps_spikes(series):
+    x, y = series
+    keep = downsample.lttb(x, y, 200)
+
+    assert 700 in keep and 1300 in keep
+
+@pytest.mark.parametrize('buckets', [1, 7, 100, 600])
+def test_minmax_keeps_every_bucket_extreme(series, buckets):
+    x, y = series
+    keep = downsample.minmax(x, y, buckets)
+
+    assert keep[0] == 0 and keep[-1] == len(x) - 1
+    assert np.all(np.diff(keep) > 0)
+    assert len(keep) <= 2 * buckets + 2
+    bucket = np.minimum(((x - x[0]) / (x[-1] - x[0]) * buckets).astype(np.int64), buckets - 1)
+    kept = np.zeros(len(x), dtype=bool)
+    kept[keep] = True
+    for code in np.unique(bucket):
+        members = bucket == code
+        assert y[members & kept].min() == y[members].min()
+        assert y[members & kept].max() == y[members].max()
+
+@pytest.mark.parametrize('n, buckets', [(0, 5), (3, 5), (10, 5), (50, 0)])
+def test_minmax_short_input_unchanged(n, buckets):
+    x = np.arange(n, dtype=np.float64)
+    np.testing.assert_array_equal(downsample.minmax(x, -x, buckets), np.arange(n))
+
+def test_minmax_constant_x_keeps_ends():
+    np.testing.assert_array_equal(downsample.minmax(np.zeros(20), np.arange(20.0), 3), [0, 19])
+
+@pytest.mark.parametrize('method', downsample.METHODS)
+@pytest.mark.parametrize('width', [5, 120, 5000])
+def test_downsample_fits_width(series, method, width):
+    x, y = series
+    small_x, small_y = downsample.downsample(x, y, width, method)
+
+    assert len(small_x) == len(small_y) <= max(width, 2)
+    assert small_x[0] == x[0] and small_x[-1] == x[-1]
+    if width >= len(x):
+        np.testing.assert_array_equal(small_y, y)
+
+def test_unknown_method_is_rejected(series):
+    with pytest.raises(ValueError):
+        downsample.downsample(*series, 100, 'average')
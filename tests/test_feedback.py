@@ -0,0 +1,130 @@
+"""
+Feedback Tests for Business Dashboard
+Feedback pages must not depend on how the rows were chunked, and index searches
+must return the rows a pandas scan finds
+"""
+
+import base64
+import json
+import os
+import re
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_gen
+import feedindex
+import feedpages
+import payload
+
+def _decode(spec) -> np.ndarray:
+    dtype = {code: name for name, code in payload.TYPED_ARRAY_CODES.items()}[spec['dtype']]
+    return np.frombuffer(base64.b64decode(spec['bdata']), dtype=np.dtype(dtype).newbyteorder('<'))
+
+def _read_pages(directory: str, pages: int):
+    """File contents and decoded (text codes, day numbers) of every page"""
+    contents, text, day = [], [], []
+    for number in range(pages):
+        with open(os.path.join(directory, f"{number}.js")) as f:
+            content = f.read()
+        contents.append(content)
+        page = json.loads(re.match(r"^\w+\(\d+, (.*)\);\n$", content).group(1))
+        text.append(_decode(page['text']))
+        day.append(_decode(page['day']))
+    return contents, np.concatenate(text) if text else np.empty(0), np.concatenate(day) if day else np.empty(0)
+
+@pytest.fixture(scope='module')
+def feedback():
+    return data_gen.generate_feedback_data(reference_time=datetime(2024, 12, 31, 18), days=400, per_day=3.0)
+
+def _many_texts(rows: int) -> pd.DataFrame:
+    """Feedback with more distinct texts than one byte can code, newest first"""
+    rng = np.random.default_rng(5)
+    return pd.DataFrame({
+        'date': pd.Timestamp('2024-12-31') - pd.to_timedelta(np.arange(rows) // 4, unit='D'),
+        'feedback_text': [f"comment {code}" for code in rng.integers(0, 600, rows)],
+    })
+
+@pytest.mark.parametrize('frame', ['generated', 'many_texts'])
+@pytest.mark.parametrize('chunk_rows', [1, 37, 500, 1200])
+def test_pages_do_not_depend_on_chunk_size(tmp_path, feedback, frame, chunk_rows):
+    df = feedback if frame == 'generated' else _many_texts(2000)
+    whole = feedpages.write_pages([df], str(tmp_path / 'whole'), 'pageLoaded', page_rows=200)
+    chunked = feedpages.write_pages((df.iloc[first:first + chunk_rows] for first in range(0, len(df), chunk_rows)),
+                                    str(tmp_path / 'chunked'), 'pageLoaded', page_rows=200)
+
+    assert chunked == whole
+    whole_pages, text, day = _read_pages(str(tmp_path / 'whole'), whole['pages'])
+    chunked_pages, _, _ = _read_pages(str(tmp_path / 'chunked'), chunked['pages'])
+    assert chunked_pages == whole_pages
+    assert whole['rows'] == len(df) and whole['pages'] == -(-len(df) // 200)
+    assert list(np.array(whole['texts'], dtype=object)[text]) == list(df['feedback_text'].astype(str))
+    np.testing.assert_array_equal(day, feedpages.day_numbers(df['date']))
+
+def test_empty_history_writes_no_pages(tmp_path):
+    settings = feedpages.write_pages([_many_texts(0)], str(tmp_path), 'pageLoaded')
+
+    assert settings == {'pageRows': feedpages.PAGE_ROWS, 'pages': 0, 'rows': 0, 'texts': []}
+
+def test_relative_time_labels():
+    labels = feedpages.relative_time_labels(np.array([0, 1, 2, 29, 30, 59, 60, 95, -3]))
+
+    assert list(labels) == ["today", "1 day ago", "2 days ago", "29 days ago", "1 month ago", "1 month ago",
+                            "2 months ago", "3 months ago", "today"]
+
+@pytest.fixture(scope='module')
+def index(feedback, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('fidx'))
+    feedindex.build_index(feedback, path)
+    return feedindex.load_index(path)
+
+def _scan(df: pd.DataFrame, query: str = '', rating=None, sentiment=None) -> np.ndarray:
+    """Rows a plain pass over the frame selects: every query term a prefix of a word of the text"""
+    terms = feedindex.tokenize(query)
+    words = [feedindex.tokenize(text) for text in df['feedback_text'].astype(str)]
+    mask = np.array([all(any(word.startswith(term) for word in row) for term in terms) for row in words], dtype=bool)
+    if rating is not None:
+        mask &= df['rating'].to_numpy() == rating
+    if sentiment is not None:
+        mask &= df['sentiment'].astype(str).to_numpy() == sentiment
+    return np.flatnonzero(mask)
+
+@pytest.mark.parametrize('query, rating, sentiment', [
+    ('', None, None),
+    ('great', None, None),
+    ('GREAT service', None, None),
+    ('sup', None, None),
+    ('the', 5, None),
+    ('', 1, None),
+    ('', None, 'negative'),
+    ('', 4, 'positive'),
+    ('a', 3, 'neutral'),
+    ('nomatchatall', None, None),
+    ('', 9, None),
+    ('', None, 'ecstatic'),
+])
+def test_search_matches_scan(feedback, index, query, rating, sentiment):
+    np.testing.assert_array_equal(index.search(query, rating, sentiment), _scan(feedback, query, rating, sentiment))
+
+def test_every_word_of_every_phrase_is_found(feedback, index):
+    for phrase in index.keys['text']:
+        for term in feedindex.tokenize(phrase):
+            np.testing.assert_array_equal(index.search(term), _scan(feedback, term))
+
+def test_client_postings_decode_to_rows(index):
+    client = feedindex.client_payload(index)
+    for facet in feedindex.FACETS:
+        encoded = client['facets'][facet]
+        for code in range(len(encoded['keys'])):
+            data = encoded['bytes'][encoded['offsets'][code]:encoded['offsets'][code + 1]]
+            rows, value, shift, row = [], 0, 0, 0
+            for byte in data:
+                value |= (int(byte) & 0x7f) << shift
+                shift += 7
+                if byte < 0x80:
+                    row += value
+                    rows.append(row)
+                    value, shift = 0, 0
+            np.testing.assert_array_equal(rows, index.postings(facet, code))
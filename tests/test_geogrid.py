@@ -0,0 +1,77 @@
+"""
+Geographic Grid Tests for Business Dashboard
+Every pyramid level must hold the cells that binning the points at that level gives
+"""
+
+import numpy as np
+import pytest
+
+import geogrid
+import schema
+
+@pytest.fixture(scope='module')
+def points():
+    """Users spread over the US bounds, plus users on its corners"""
+    rng = np.random.default_rng(11)
+    lat = np.concatenate([rng.uniform(*schema.US_LAT_BOUNDS, 20000), np.repeat(schema.US_LAT_BOUNDS, 2)])
+    lon = np.concatenate([rng.uniform(*schema.US_LON_BOUNDS, 20000), np.tile(schema.US_LON_BOUNDS, 2)])
+    return lat, lon
+
+def _assert_same_cells(cells, expected):
+    np.testing.assert_array_equal(cells['row'], expected['row'])
+    np.testing.assert_array_equal(cells['col'], expected['col'])
+    np.testing.assert_array_equal(cells['count'], expected['count'])
+    np.testing.assert_allclose(cells['lat'], expected['lat'], rtol=1e-12)
+    np.testing.assert_allclose(cells['lon'], expected['lon'], rtol=1e-12)
+
+def test_coarsened_levels_match_direct_binning(points, monkeypatch):
+    monkeypatch.setattr(geogrid, 'BIN_SLICE_ROWS', 3000)
+    lat, lon = points
+    pyramid = geogrid.build_pyramid(lat, lon, workers=1)
+
+    assert len(pyramid) == geogrid.LEVELS
+    for level, cells in enumerate(pyramid):
+        direct = geogrid._bin_points(lat, lon, level, workers=1)
+        rows, cols = geogrid._cell_index(lat, lon, level)
+        assert direct['count'].sum() == len(lat)
+        assert np.all(direct['row'] < geogrid.grid_shape(level)[0]) and np.all(direct['col'] < geogrid.grid_shape(level)[1])
+        _assert_same_cells(cells, {
+            'row': direct['row'],
+            'col': direct['col'],
+            'count': direct['count'],
+            'lat': direct['lat_sum'] / direct['count'],
+            'lon': direct['lon_sum'] / direct['count'],
+        })
+        # Cell counts also match a plain scan of the points' cells
+        keys, counts = np.unique(rows * geogrid.grid_shape(level)[1] + cols, return_counts=True)
+        np.testing.assert_array_equal(cells['row'] * geogrid.grid_shape(level)[1] + cells['col'], keys)
+        np.testing.assert_array_equal(cells['count'], counts)
+
+def test_empty_input_gives_empty_levels():
+    pyramid = geogrid.build_pyramid(np.empty(0), np.empty(0), workers=1)
+
+    assert [len(cells['count']) for cells in pyramid] == [0] * geogrid.LEVELS
+    assert geogrid.pyramid_max_count(pyramid) == 1
+
+@pytest.mark.parametrize('workers', [2, 4])
+def test_parallel_build_matches_serial(points, monkeypatch, workers):
+    # Small slices, so every worker bins several of them
+    monkeypatch.setattr(geogrid, 'BIN_SLICE_ROWS', 1500)
+    lat, lon = points
+    serial = geogrid.build_pyramid(lat, lon, workers=1)
+    parallel = geogrid.build_pyramid(lat, lon, workers=workers)
+
+    for cells, expected in zip(parallel, serial):
+        for name in ('row', 'col', 'count', 'lat', 'lon'):
+            np.testing.assert_array_equal(cells[name], expected[name])
+
+def test_default_workers_match_serial(points, monkeypatch):
+    # Enough points for the default to use every core
+    monkeypatch.setattr(geogrid, 'BIN_SLICE_ROWS', 1000)
+    monkeypatch.setattr(geogrid, 'PARALLEL_MIN_ROWS', 4000)
+    lat, lon = points
+    serial = geogrid.build_pyramid(lat, lon, workers=1)
+
+    for cells, expected in zip(geogrid.build_pyramid(lat, lon), serial):
+        for name in ('row', 'col', 'count', 'lat', 'lon'):
+            np.testing.assert_array_equal(cells[name], expected[name])
@@ -0,0 +1,103 @@
+"""
+KPI Engine Tests for Business Dashboard
+Windows must cover the intended days and KPIs must match sums over the raw rows
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import kpi
+
+D = np.datetime64
+
+@pytest.mark.parametrize('window, anchor, offset, expected', [
+    ('day', '2024-03-15', 0, ('2024-03-15', '2024-03-15')),
+    ('day', '2024-03-01', 1, ('2024-02-29', '2024-02-29')),
+    ('week', '2024-03-15', 0, ('2024-03-09', '2024-03-15')),
+    ('week', '2024-03-15', 1, ('2024-03-02', '2024-03-08')),
+    ('month', '2024-03-15', 0, ('2024-03-01', '2024-03-15')),
+    ('month', '2024-03-15', 1, ('2024-02-01', '2024-02-15')),
+    # Month to date against a shorter month ends on that month's last day
+    ('month', '2024-03-31', 1, ('2024-02-01', '2024-02-29')),
+    ('month', '2024-01-20', 1, ('2023-12-01', '2023-12-20')),
+])
+def test_window_bounds(window, anchor, offset, expected):
+    assert kpi.window_bounds(window, D(anchor), offset) == (D(expected[0]), D(expected[1]))
+
+def test_unknown_window_is_rejected():
+    with pytest.raises(ValueError):
+        kpi.window_bounds('year', D('2024-03-15'))
+
+@pytest.fixture
+def series():
+    """Two business units of daily sales, followers with a missing day, and month-end NPS"""
+    days = pd.date_range('2024-01-01', '2024-03-31', freq='D')
+    sales = pd.DataFrame({'date': np.tile(days, 2), 'daily_sales': np.tile(np.arange(len(days), dtype=np.float64), 2)})
+    followers_days = days.delete(40)
+    followers = np.arange(len(followers_days)) * 3 + 1000
+    nps_months = pd.date_range('2024-01-01', '2024-03-31', freq='ME')
+    return sales, {
+        'sales': kpi.daily_series(sales['date'].to_numpy(), sales['daily_sales'].to_numpy(), 'flow'),
+        'linkedin_followers': kpi.daily_series(followers_days.to_numpy(), followers, 'level', integer=True),
+        'nps': kpi.daily_series(nps_months.to_numpy(), np.array([40.0, 55.5, 61.0]), 'level'),
+    }
+
+KPIS = {
+    'total_sales': {'series': 'sales', 'window': 'month'},
+    'sales_change': {'series': 'sales', 'window': 'month', 'change': True},
+    'yesterday_sales': {'series': 'sales', 'window': 'day', 'offset': 1},
+    'week_sales': {'series': 'sales', 'window': 'week'},
+    'followers': {'series': 'linkedin_followers', 'window': 'day'},
+    'growth': {'series': 'linkedin_followers', 'window': 'day', 'change': True},
+    'nps_score': {'series': 'nps', 'window': 'day'},
+}
+
+def _sales_between(sales: pd.DataFrame, first: str, last: str) -> float:
+    return round(float(sales.loc[sales['date'].between(first, last), 'daily_sales'].sum()), 2)
+
+def test_compute_matches_row_sums(series):
+    sales, values = series
+    results = kpi.compute(values, D('2024-03-10'), KPIS)
+
+    assert results['total_sales'] == _sales_between(sales, '2024-03-01', '2024-03-10')
+    assert results['sales_change'] == round(results['total_sales'] - _sales_between(sales, '2024-02-01', '2024-02-10'), 2)
+    assert results['yesterday_sales'] == _sales_between(sales, '2024-03-09', '2024-03-09')
+    assert results['week_sales'] == _sales_between(sales, '2024-03-04', '2024-03-10')
+    assert results['followers'] == 1000 + 3 * 68
+    assert results['growth'] == 3
+    assert results['nps_score'] == 55.5
+
+def test_level_carries_over_missing_days(series):
+    _, values = series
+    # 2024-02-10 has no follower row: it keeps the value of the day before, with no growth
+    results = kpi.compute(values, D('2024-02-10'), KPIS)
+
+    assert results['followers'] == 1000 + 3 * 39
+    assert results['growth'] == 0
+
+def test_compute_defaults_to_latest_date(series):
+    _, values = series
+    assert kpi.latest_date(values) == D('2024-03-31')
+    assert kpi.compute(values, kpis=KPIS) == kpi.compute(values, D('2024-03-31'), KPIS)
+
+def test_levels_before_their_data_are_none(series):
+    _, values = series
+    # NPS is first reported at the end of January, followers from January 1st
+    first_day = kpi.compute(values, D('2024-01-01'), KPIS)
+    assert first_day['nps_score'] is None
+    assert first_day['followers'] == 1000
+    assert first_day['growth'] is None
+    assert first_day['total_sales'] == 0.0
+
+    assert kpi.compute(values, D('2024-01-30'), KPIS)['nps_score'] is None
+    assert kpi.compute(values, D('2024-01-31'), KPIS)['nps_score'] == 40.0
+    assert kpi.compute(values, D('2024-01-02'), KPIS)['growth'] == 3
+
+def test_flows_outside_their_data_are_zero(series):
+    _, values = series
+    results = kpi.compute(values, D('2023-12-31'), KPIS)
+
+    assert results['total_sales'] == 0.0
+    assert results['week_sales'] == 0.0
+    assert results['followers'] is None
@@ -0,0 +1,85 @@
+"""
+Rollup Tests for Business Dashboard
+Every rollup grain must match a pandas groupby over calendar periods of the same frame
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_gen
+import rollup
+
+SPAN = {'start_date': datetime(2022, 11, 20), 'end_date': datetime(2024, 2, 10)}
+
+# Pandas periods whose start is the first day of each grain's period (weeks end on Sunday)
+PERIODS = {'day': 'D', 'week': 'W-SUN', 'month': 'M', 'quarter': 'Q', 'year': 'Y'}
+
+@pytest.fixture(scope='module')
+def frames():
+    return {
+        'sales': data_gen.generate_sales_data(n_series=2, **SPAN),
+        'deals': data_gen.generate_deals_data(**SPAN),
+        'social': data_gen.generate_social_media_data(n_series=2, **SPAN),
+        'website': data_gen.generate_website_analytics(n_series=3, **SPAN),
+        'nps': data_gen.generate_nps_data(**SPAN),
+    }
+
+@pytest.fixture(scope='module')
+def rollups(frames):
+    return rollup.build_rollups(frames)
+
+def _expected(df: pd.DataFrame, spec: dict, grain: str) -> pd.DataFrame:
+    """The rollup computed with pandas periods and groupby"""
+    dates = df[spec['date']]
+    frame = df.assign(period=dates.dt.to_period(PERIODS[grain]).dt.start_time.astype('datetime64[s]'))
+    keys = ['period'] + ([spec['by']] if 'by' in spec else [])
+    if 'by' in spec:
+        frame[spec['by']] = frame[spec['by']].astype(str)
+    grouped = frame.groupby(keys, sort=True)
+    result = grouped[spec.get('sum', [])].sum() if spec.get('sum') else pd.DataFrame(index=grouped.size().index)
+    if spec.get('last'):
+        # Closing value: the period's last day, summed over business units
+        days = frame.assign(day=dates.dt.normalize()).groupby(keys + ['day'], sort=True)[spec['last']].sum()
+        result = result.join(days.groupby(level=keys).last())
+    if 'count' in spec:
+        result[spec['count']] = grouped.size()
+    return result.reset_index()
+
+@pytest.mark.parametrize('grain', rollup.GRAINS)
+@pytest.mark.parametrize('name', list(rollup.ROLLUPS))
+def test_rollups_match_groupby(frames, rollups, name, grain):
+    spec = rollup.ROLLUPS[name]
+    built = rollups[f"{name}_{grain}"]
+    expected = _expected(frames[spec['dataset']], spec, grain)
+
+    assert list(built.columns) == rollup.index_columns(spec) + rollup.value_columns(spec)
+    np.testing.assert_array_equal(built['period'].to_numpy().astype('datetime64[D]'),
+                                  expected['period'].to_numpy().astype('datetime64[D]'))
+    if 'by' in spec:
+        assert list(built[spec['by']]) == list(expected[spec['by']])
+    for column in rollup.value_columns(spec):
+        np.testing.assert_allclose(built[column].to_numpy(dtype=np.float64),
+                                   expected[column].to_numpy(dtype=np.float64), rtol=1e-9)
+
+def test_weeks_start_on_monday():
+    days = np.arange(np.datetime64('2024-01-01'), np.datetime64('2024-01-15'))
+    starts = rollup.period_start(days, 'week')
+
+    assert set(pd.DatetimeIndex(starts).day_name()) == {'Monday'}
+    assert np.all((days - starts).astype(np.int64) < 7)
+
+def test_written_rollups_read_back(tmp_path, rollups):
+    rollup.write_rollups(rollups, str(tmp_path))
+    assert rollup.exists(str(tmp_path))
+
+    for grain in rollup.GRAINS:
+        arrays = rollup.load_rollups(str(tmp_path), grain)
+        for name, spec in rollup.ROLLUPS.items():
+            df = rollups[f"{name}_{grain}"]
+            values = arrays[name]['values']
+            expected = df[rollup.value_columns(spec)].to_numpy(dtype=np.float64)
+            np.testing.assert_allclose(values.reshape(len(df), -1), expected.reshape(len(df), -1))
+            np.testing.assert_array_equal(arrays[name]['index']['period'], df['period'].to_numpy(dtype='datetime64[D]'))
@@ -0,0 +1,79 @@
+"""
+Spatial Index Tests for Business Dashboard
+Viewport, radius and state queries must return the users a linear scan finds
+"""
+
+import numpy as np
+import pytest
+
+import schema
+import spatial
+
+STATES = ['CA', 'NY', 'TX', 'WY']
+
+@pytest.fixture(scope='module')
+def points():
+    """Users spread over the US bounds, plus users on every corner and edge of them"""
+    rng = np.random.default_rng(7)
+    lat = rng.uniform(*schema.US_LAT_BOUNDS, 5000)
+    lon = rng.uniform(*schema.US_LON_BOUNDS, 5000)
+    edge_lat = np.array([schema.US_LAT_BOUNDS[0], schema.US_LAT_BOUNDS[1]] * 2 + [schema.US_LAT_BOUNDS[1]] * 20)
+    edge_lon = np.array([schema.US_LON_BOUNDS[0]] * 2 + [schema.US_LON_BOUNDS[1]] * 2
+                        + list(np.linspace(*schema.US_LON_BOUNDS, 20)))
+    lat = np.concatenate([lat, edge_lat]).astype(np.float32)
+    lon = np.concatenate([lon, edge_lon]).astype(np.float32)
+    codes = rng.integers(0, len(STATES), len(lat))
+    return lat, lon, codes
+
+@pytest.fixture(scope='module')
+def index(points, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('sidx'))
+    spatial.build_index(*points, STATES, path)
+    return spatial.load_index(path)
+
+BOXES = [
+    (30.0, -110.0, 40.0, -90.0),
+    (30.1, -110.05, 30.2, -109.9),
+    (schema.US_LAT_BOUNDS[1], -130.0, 50.0, -60.0),
+    (20.0, schema.US_LON_BOUNDS[1], 50.0, -60.0),
+    (20.0, -130.0, schema.US_LAT_BOUNDS[0], -60.0),
+    (20.0, -130.0, 50.0, schema.US_LON_BOUNDS[0]),
+    (20.0, -130.0, 50.0, -60.0),
+    (49.5, -130.0, 50.0, -60.0),
+    (40.0, -100.0, 30.0, -90.0),
+]
+
+@pytest.mark.parametrize('box', BOXES)
+def test_bbox_matches_scan(index, points, box):
+    lat, lon, _ = points
+    south, west, north, east = box
+    expected = np.flatnonzero((lat >= south) & (lat <= north) & (lon >= west) & (lon <= east))
+
+    np.testing.assert_array_equal(np.sort(index.bbox(*box)), expected)
+    assert index.bbox_count(*box) == len(expected)
+
+def test_upper_edges_are_found(index, points):
+    lat, lon, _ = points
+    assert index.bbox_count(schema.US_LAT_BOUNDS[1], -130.0, 50.0, -60.0) == np.count_nonzero(lat == schema.US_LAT_BOUNDS[1]) > 0
+    assert index.bbox_count(20.0, schema.US_LON_BOUNDS[1], 50.0, -60.0) == np.count_nonzero(lon == schema.US_LON_BOUNDS[1]) > 0
+
+@pytest.mark.parametrize('centre, radius_km', [((37.0, -100.0), 300.0), ((49.0, -66.0), 150.0),
+                                               ((25.0, -125.0), 80.0), ((60.0, -100.0), 50.0)])
+def test_radius_matches_scan(index, points, centre, radius_km):
+    lat, lon, _ = points
+    user_lat = np.radians(lat.astype(np.float64))
+    user_lon = np.radians(lon.astype(np.float64))
+    haversine = (np.sin((user_lat - np.radians(centre[0])) / 2) ** 2
+                 + np.cos(np.radians(centre[0])) * np.cos(user_lat) * np.sin((user_lon - np.radians(centre[1])) / 2) ** 2)
+    distance = 2 * spatial.EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(haversine, 1.0)))
+
+    np.testing.assert_array_equal(np.sort(index.radius(*centre, radius_km)), np.flatnonzero(distance <= radius_km))
+
+def test_state_queries_match_scan(index, points):
+    _, _, codes = points
+    counts = index.state_counts()
+    for code, state in enumerate(STATES):
+        assert index.state_count(state) == counts[state] == np.count_nonzero(codes == code)
+        sample = index.state_sample(state, 10, seed=1)
+        assert len(sample) == 10 and np.all(codes[sample] == code)
+    assert index.state_count('ZZ') == 0
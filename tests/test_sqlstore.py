@@ -0,0 +1,112 @@
+"""
+SQLite Store Tests for Business Dashboard
+Store queries must return what the pandas code they replace computes from the frames
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_gen
+import kpi
+import sqlstore
+import viz
+
+SPAN = {'start_date': datetime(2022, 1, 1), 'end_date': datetime(2024, 12, 31)}
+
+@pytest.fixture(scope='module')
+def frames():
+    return {
+        'sales_df': data_gen.generate_sales_data(n_series=2, **SPAN),
+        'deals_df': data_gen.generate_deals_data(**SPAN),
+        'social_df': data_gen.generate_social_media_data(**SPAN),
+        'website_df': data_gen.generate_website_analytics(n_series=2, **SPAN),
+        'nps_df': data_gen.generate_nps_data(**SPAN),
+        'feedback_df': data_gen.generate_feedback_data(reference_time=datetime(2024, 12, 31, 18), days=60),
+    }
+
+@pytest.fixture(scope='module')
+def conn(frames, tmp_path_factory):
+    conn = sqlstore.connect(str(tmp_path_factory.mktemp('db') / sqlstore.DB_FILE), create=True)
+    for key, df in frames.items():
+        sqlstore.write_dataset(conn, viz.DATA_FILES[key][1], df, fingerprint=key)
+    for (table, date_column), columns in kpi.store_tables().items():
+        sqlstore.write_daily_sums(conn, table, date_column, columns)
+    yield conn
+    conn.close()
+
+def test_fingerprints_are_recorded(frames, conn):
+    assert sqlstore.stored_fingerprints(conn) == {viz.DATA_FILES[key][1]: key for key in frames}
+
+@pytest.mark.parametrize('year, month', [(2022, 1), (2023, 7), (2024, 12), (2025, 1)])
+def test_top_deals_match_nlargest(frames, conn, year, month):
+    deals = frames['deals_df']
+    expected = deals[(deals['year'] == year) & (deals['month'] == month)].nlargest(8, 'amount')
+    top = sqlstore.top_deals(conn, year, month, 8)
+
+    assert list(top['sales_rep']) == list(expected['sales_rep'].astype(str))
+    assert list(top['amount']) == list(expected['amount'])
+
+def test_latest_deal_month(conn):
+    assert sqlstore.latest_deal_month(conn) == (2024, 12)
+    assert sqlstore.latest_deal_month(conn, (2023, 5)) == (2023, 5)
+    assert sqlstore.latest_deal_month(conn, (2021, 12)) is None
+
+@pytest.mark.parametrize('until', [None, datetime(2024, 12, 1), datetime(2024, 11, 15, 12), datetime(2020, 1, 1)])
+def test_latest_feedback_matches_frame(frames, conn, until):
+    feedback = frames['feedback_df']
+    entries = feedback if until is None else viz.feedback_until(feedback, until)
+    latest = sqlstore.latest_feedback(conn, 14, until=until)
+
+    assert list(latest['feedback_text']) == list(entries['feedback_text'].head(14).astype(str))
+    assert list(latest['date']) == list(entries['date'].head(14))
+    if until is not None:
+        assert sqlstore.count_feedback_since(conn, until) == len(feedback) - len(entries)
+
+def test_feedback_chunks_match_frame(frames, conn):
+    chunks = list(sqlstore.feedback_chunks(conn, chunk_rows=25))
+    history = pd.concat(chunks, ignore_index=True)
+
+    assert len(chunks) > 1
+    assert list(history['feedback_text']) == list(frames['feedback_df']['feedback_text'].astype(str))
+    assert list(history['date']) == list(frames['feedback_df']['date'])
+
+def test_tail_rows_match_frame(frames, conn):
+    tail = sqlstore.tail_rows(conn, 'social', ['linkedin_followers', 'twitter_followers'], 5)
+    expected = frames['social_df'][['linkedin_followers', 'twitter_followers']].tail(5).reset_index(drop=True)
+
+    pd.testing.assert_frame_equal(tail, expected, check_dtype=False)
+
+@pytest.mark.parametrize('first, last', [(None, None), (datetime(2023, 2, 1), None), (None, datetime(2024, 2, 29, 18)),
+                                         (datetime(2023, 12, 30), datetime(2024, 1, 2))])
+@pytest.mark.parametrize('columns', [['daily_users', 'daily_enquiries'], ['daily_users', 'conversion_rate']])
+def test_daily_sums_match_groupby(frames, conn, columns, first, last):
+    # conversion_rate is not persisted, so that query groups the table itself
+    website = frames['website_df']
+    if first is not None:
+        website = website[website['date'] >= first.replace(hour=0)]
+    if last is not None:
+        website = website[website['date'] < pd.Timestamp(last.date()) + pd.Timedelta(days=1)]
+    sums = sqlstore.daily_sums(conn, 'website', 'date', columns, first=first, last=last)
+    expected = website.groupby('date')[columns].sum().reset_index()
+    
+    assert list(sums['date']) == list(expected['date'])
+    np.testing.assert_allclose(sums[columns].to_numpy(dtype=np.float64), expected[columns].to_numpy(dtype=np.float64))
+
+def test_daily_sums_are_persisted(frames, conn):
+    plan = conn.execute('EXPLAIN QUERY PLAN SELECT date FROM website_daily WHERE date BETWEEN ? AND ?',
+                        ('2024-01-01', '2024-02-01')).fetchall()
+    
+    assert conn.execute('SELECT COUNT(*) FROM website_daily').fetchone()[0] == frames['website_df']['date'].nunique()
+    assert any('idx_website_daily_date' in row[-1] for row in plan)
+
+@pytest.mark.parametrize('anchor', [None, '2022-01-01', '2023-03-31', '2024-02-29'])
+def test_kpis_match_frames(frames, conn, anchor):
+    until = None if anchor is None else datetime.fromisoformat(anchor)
+    anchor = None if anchor is None else np.datetime64(anchor)
+    expected = kpi.compute(kpi.series_from_frames(frames), anchor)
+    
+    assert kpi.compute(kpi.series_from_store(conn), anchor) == expected
+    assert kpi.compute(kpi.series_from_store(conn, until), anchor) == expected
@@ -0,0 +1,49 @@
+"""
+Dashboard Tests for Business Dashboard
+Cards rendered as of a date must only show data of that date
+"""
+
+from datetime import datetime
+
+import pytest
+
+import data_gen
+import dealparts
+import sqlstore
+import viz
+
+@pytest.fixture(scope='module')
+def deals():
+    return data_gen.generate_deals_data(start_date=datetime(2022, 1, 1), end_date=datetime(2024, 12, 31))
+
+@pytest.fixture(scope='module')
+def sources(deals, tmp_path_factory):
+    """The deals as a frame, in a SQLite store and as month partitions"""
+    conn = sqlstore.connect(str(tmp_path_factory.mktemp('db') / sqlstore.DB_FILE), create=True)
+    sqlstore.write_dataset(conn, 'deals', deals)
+    directory = str(tmp_path_factory.mktemp('parts'))
+    dealparts.write_partitions(deals, directory)
+    return {'frame': {'deals_df': deals}, 'sqlite': {'db': conn}, 'partitions': {'deal_partitions': directory}}
+
+@pytest.mark.parametrize('source', ['frame', 'sqlite', 'partitions'])
+@pytest.mark.parametrize('as_of', [datetime(2022, 3, 15), datetime(2023, 11, 2), datetime(2024, 12, 31)])
+def test_top_deals_as_of_use_that_year(deals, sources, source, as_of):
+    month_deals = deals[(deals['year'] == as_of.year) & (deals['month'] == as_of.month)]
+    expected = viz._deal_rows(month_deals.nlargest(8, 'amount'))
+
+    assert viz.get_top_deals(sources[source], as_of) == expected
+
+@pytest.mark.parametrize('source', ['frame', 'sqlite', 'partitions'])
+def test_top_deals_default_to_latest_month(deals, sources, source):
+    latest = deals[(deals['year'] == 2024) & (deals['month'] == 12)]
+
+    assert viz.get_top_deals(sources[source]) == viz._deal_rows(latest.nlargest(8, 'amount'))
+
+def test_missing_kpis_render_as_na():
+    assert viz.kpi_text(None, '.1f', 1000, '$', 'k') == "n/a"
+    assert viz.kpi_text(12345.0, '.1f', 1000, '$', 'k') == "$12.3k"
+    assert viz.change_text(None) == "n/a"
+    assert viz.change_text(-1500.0, '.1f', 1000, suffix='k') == "▼ 1.5k"
+    assert viz.change_text(0, strict=True) == "▼ 0"
+    assert viz.change_class(None) == ""
+    assert '"n/a"' in viz.create_nps_gauge(None)